@@ -0,0 +1,187 @@
+"""Sprite atlases: each game's sprites packed into one display-format surface.
+
+A game declares its sprites as {name: (size, placeholder color)}. The image
+file ASSET_DIR/<game>/<name>.png replaces a placeholder when it exists
+(scaled to the declared size). The sprites are packed into one sheet, and
+each is cut from it as a surface of its own. Once a display exists, sprites
+that use their alpha channel are converted with convert_alpha, which makes
+their blits several times faster. Converting opaque sprites to the display
+format does not reliably pay: depending on the driver's blitters and how
+many sprites are in play, a 24-bit or 32-bit copy can blit faster than a
+display-format one. So the atlas times its opaque sprites in each of the
+three formats, blitted the way a game would, and keeps them in whichever
+was fastest (`atlas.opaque_format`).
+
+The packed sheet and its layout are cached in CACHE_DIR, keyed on the
+declarations and the image files' sizes and modification times, so later
+starts load one PNG instead of loading and repacking every sprite. Within a
+process, load_atlas() returns the same Atlas for the same game.
+"""
+import hashlib
+import json
+import os
+from time import perf_counter
+
+import pygame
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+CACHE_DIR = os.path.join(ASSET_DIR, ".cache")
+SHEET_WIDTH = 1024  # Sprites are packed left to right in rows no wider than this
+PROBE_BLITS = 400  # Blits per timing round when choosing the opaque sprites' format
+
+_atlases = {}
+
+
+def display_format(surface, alpha=False):
+    """Returns `surface` converted to the display's pixel format, or as is while there is no display."""
+    if pygame.display.get_surface() is None:
+        return surface
+    return surface.convert_alpha() if alpha else surface.convert()
+
+
+class Atlas:
+    """One sheet holding every sprite of a game; `atlas[name]` is that sprite, cut out as its own surface."""
+
+    def __init__(self, sheet, rects, alpha):
+        self.sheet = sheet
+        self.rects = rects  # Sprite name -> Rect in the sheet
+        self.alpha = alpha
+        self.converted = False
+        self.opaque_format = None  # "display", "24-bit" or "32-bit" once converted
+        self.images = {name: sheet.subsurface(rect).copy() for name, rect in rects.items()}
+
+    def convert(self):
+        """Converts the sprites for the display once a display exists; returns whether they are converted."""
+        if not self.converted and pygame.display.get_surface() is not None:
+            opaque = []
+            for name, rect in self.rects.items():
+                image = self.sheet.subsurface(rect)
+                if self.alpha and pygame.mask.from_surface(image, 254).count() < rect.w * rect.h:
+                    self.images[name] = image.convert_alpha()
+                else:
+                    opaque.append(name)
+            if opaque:
+                self.opaque_format, template = fastest_format([self.sheet.subsurface(self.rects[n]) for n in opaque])
+                for name in opaque:
+                    self.images[name] = self.sheet.subsurface(self.rects[name]).convert(template)
+            self.converted = True
+        return self.converted
+
+    def __getitem__(self, name):
+        return self.images[name]
+
+
+def fastest_format(images):
+    """Returns (name, template surface) of the format opaque `images` blit fastest from onto the display.
+
+    Blits them in turn at spread-out positions onto a surface shaped like
+    the display, as a game would, since the working set matters as much as
+    the blitter: smaller 24-bit pixels can win on memory traffic alone.
+    """
+    display = pygame.display.get_surface()
+    target = pygame.Surface(display.get_size()).convert()
+    width, height = target.get_size()
+    positions = [((i * 37) % width, (i * 53) % height) for i in range(PROBE_BLITS)]
+    templates = {"display": display, "24-bit": pygame.Surface((1, 1), 0, 24), "32-bit": pygame.Surface((1, 1), 0, 32)}
+    seconds = {}
+    for name, template in templates.items():
+        candidates = [image.convert(template) for image in images]
+        best = float("inf")
+        for _ in range(3):
+            start = perf_counter()
+            for i, position in enumerate(positions):
+                target.blit(candidates[i % len(candidates)], position)
+            best = min(best, perf_counter() - start)
+        seconds[name] = best
+    name = min(seconds, key=seconds.get)
+    return name, templates[name]
+
+
+def pack(sizes):
+    """Shelf-packs {name: (w, h)} tallest first; returns ({name: Rect}, sheet size)."""
+    rects = {}
+    x = y = row_height = width = 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        if x and x + w > SHEET_WIDTH:
+            x, y, row_height = 0, y + row_height, 0
+        rects[name] = pygame.Rect(x, y, w, h)
+        x += w
+        row_height = max(row_height, h)
+        width = max(width, x)
+    return rects, (max(width, 1), max(y + row_height, 1))
+
+
+def _sprite_files(game, sprites, asset_dir):
+    return {name: os.path.join(asset_dir, game, f"{name}.png") for name in sprites}
+
+
+def _cache_key(sprites, files):
+    state = {name: [list(size), list(color)] for name, (size, color) in sprites.items()}
+    for name, path in files.items():
+        if os.path.exists(path):
+            stat = os.stat(path)
+            state[name].append([stat.st_size, stat.st_mtime_ns])
+    return hashlib.sha1(json.dumps(state, sort_keys=True).encode()).hexdigest()
+
+
+def _new_sheet(size, alpha):
+    return pygame.Surface(size, pygame.SRCALPHA if alpha else 0, 32)
+
+
+def _copy(image, sheet, dest, alpha):
+    # Adding onto a cleared sheet copies pixels exactly, alpha included
+    sheet.blit(image, dest, special_flags=pygame.BLEND_RGBA_ADD if alpha else 0)
+
+
+def build_sheet(sprites, files):
+    """Loads or draws every sprite and packs them; returns (sheet, rects, alpha)."""
+    images = {}
+    for name, (size, color) in sprites.items():
+        if os.path.exists(files[name]):
+            image = pygame.image.load(files[name])
+            if image.get_size() != tuple(size):
+                image = pygame.transform.scale(image, size)
+        else:
+            image = pygame.Surface(size)
+            image.fill(color)
+        images[name] = image
+    alpha = any(image.get_flags() & pygame.SRCALPHA for image in images.values())
+    rects, sheet_size = pack({name: image.get_size() for name, image in images.items()})
+    sheet = _new_sheet(sheet_size, alpha)
+    for name, image in images.items():
+        _copy(image, sheet, rects[name], alpha)
+    return sheet, rects, alpha
+
+
+def load_atlas(game, sprites, asset_dir=ASSET_DIR, cache_dir=CACHE_DIR):
+    """Returns the Atlas for `game`, from memory, the disk cache, or by packing `sprites`."""
+    atlas = _atlases.get(game)
+    if atlas is None:
+        files = _sprite_files(game, sprites, asset_dir)
+        key = _cache_key(sprites, files)
+        sheet_path = os.path.join(cache_dir, f"{game}.png")
+        index_path = os.path.join(cache_dir, f"{game}.json")
+        try:
+            with open(index_path) as f:
+                index = json.load(f)
+            if index["key"] != key:
+                raise ValueError("stale atlas cache")
+            saved = pygame.image.load(sheet_path)
+            # PNGs without alpha load as 24-bit; copy into a 32-bit sheet as built, for blits before a display exists
+            sheet = _new_sheet(saved.get_size(), index["alpha"])
+            _copy(saved, sheet, (0, 0), index["alpha"])
+            rects = {name: pygame.Rect(rect) for name, rect in index["rects"].items()}
+            atlas = Atlas(sheet, rects, index["alpha"])
+        except (OSError, ValueError, KeyError, pygame.error):
+            sheet, rects, alpha = build_sheet(sprites, files)
+            atlas = Atlas(sheet, rects, alpha)
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                pygame.image.save(sheet, sheet_path)
+                with open(index_path, "w") as f:
+                    json.dump({"key": key, "alpha": alpha, "rects": {n: list(r) for n, r in rects.items()}}, f)
+            except (OSError, pygame.error):
+                pass  # The cache only saves startup time
+        _atlases[game] = atlas
+    atlas.convert()
+    return atlas
@@ -0,0 +1,469 @@
+"""Autopilots that play gemini.py and claude.py for headless soak tests.
+
+Each tick an autopilot looks at the game and returns the keys to pass to its
+step(). It plans a path to food (gemini) or to a coin or mushroom (claude)
+with A* and then follows it; as long as the game is where the plan expected
+and the target is unchanged, it keeps following the same plan instead of
+searching again. Only eating, a new target or a surprise triggers a search.
+
+The snake's own body is treated as moving: a body segment blocks its cell
+only until the tail has passed it, so paths may run where the tail is now.
+Cells a planned path has just passed through are body too, for as many ticks
+as the snake is long.
+
+    gemini  A* over the wrapping grid around obstacles and the body.
+    claude  A* over the head's physics states (position, direction and jump
+            state), stepping them with claude.move_head and checking bricks,
+            the body and the enemies' predicted positions.
+
+When no target can be reached, the autopilot heads for the open area
+(gemini) or follows the longest path it found that stays alive (claude).
+Claude remembers goals that ran out of states, and while they stay the same
+it only searches depth-first for CLAUDE_SURVIVE ticks of survival.
+
+Every tick's planning time goes into PlanStats, which reports the mean, a
+histogram and the worst ticks together with their boards, to spot
+pathological layouts.
+
+Usage:
+    python autopilot.py gemini [--ticks N] [--seed S] [--worst N]
+    python autopilot.py claude [--ticks N] [--seed S] [--worst N]
+"""
+import argparse
+import heapq
+import random
+from collections import deque
+from time import perf_counter
+
+import pygame
+
+# Upper bucket edges in microseconds for the planning cost histogram
+COST_EDGES_US = (10, 30, 100, 300, 1000, 3000, 10000, float("inf"))
+
+
+class PlanStats:
+    """Per-tick planning cost, with the `worst` most expensive ticks and their boards."""
+
+    def __init__(self, worst=3):
+        self.ticks = 0
+        self.searches = 0
+        self.nodes = 0
+        self.total = 0.0
+        self.counts = [0] * len(COST_EDGES_US)
+        self.worst = []  # Heap of (seconds, tick, nodes, board)
+        self.keep = worst
+
+    def record(self, seconds, nodes, board):
+        """Adds one tick; `nodes` is 0 if the plan was reused, `board` a callable drawing it as text."""
+        self.ticks += 1
+        self.total += seconds
+        if nodes:
+            self.searches += 1
+            self.nodes += nodes
+        us = seconds * 1e6
+        for i, edge in enumerate(COST_EDGES_US):
+            if us <= edge:
+                self.counts[i] += 1
+                break
+        if len(self.worst) < self.keep:
+            heapq.heappush(self.worst, (seconds, self.ticks, nodes, board()))
+        elif self.worst and seconds > self.worst[0][0]:
+            heapq.heapreplace(self.worst, (seconds, self.ticks, nodes, board()))
+
+    def report(self):
+        lines = [f"planning: {self.searches:,} searches in {self.ticks:,} ticks "
+                 f"({1 - self.searches / max(self.ticks, 1):.1%} reused the plan), "
+                 f"mean {self.total / max(self.ticks, 1) * 1e6:.1f} us/tick, "
+                 f"{self.nodes / max(self.searches, 1):,.0f} nodes/search"]
+        low = 0
+        for edge, count in zip(COST_EDGES_US, self.counts):
+            lines.append(f"  {low:>6}-{edge:<6} us: {count:>10,}")
+            low = edge
+        for seconds, tick, nodes, board in sorted(self.worst, reverse=True):
+            lines.append(f"tick {tick:,}: {seconds * 1e3:.2f} ms, {nodes:,} nodes")
+            lines.append(board)
+        return "\n".join(lines)
+
+
+# --- gemini.py ---
+
+GEMINI_KEYS = {(0, -1): pygame.K_UP, (0, 1): pygame.K_DOWN, (-1, 0): pygame.K_LEFT, (1, 0): pygame.K_RIGHT}
+
+
+class GeminiAutopilot:
+    """Steers a gemini.SnakeGame along an A* path to the food."""
+
+    def __init__(self, stats=None):
+        import gemini
+
+        self.view = (gemini.GRID_WIDTH, gemini.GRID_HEIGHT)  # Largest board board() prints; bigger ones are cropped
+        self.stats = stats or PlanStats()
+        self.plan = deque()  # Cells still to enter, next first
+        self.expected = None  # (head, length, food) the last move should lead to
+        self._obstacles = (None, frozenset())
+
+    def keys(self, game):
+        start = perf_counter()
+        nodes = 0
+        body = game.snake_body
+        if not self.plan or self.expected != (body.head, len(body), game.food_pos):
+            nodes = self.search(game)
+        if self.plan:
+            cell = self.plan.popleft()
+            # Only the food changes the length; eating it means searching again
+            self.expected = (cell, len(body), game.food_pos)
+            direction = self.direction(body.head, cell, game)
+        else:
+            direction, nodes = self.escape(game, nodes)
+            self.expected = None
+        self.stats.record(perf_counter() - start, nodes, lambda: self.board(game))
+        return [] if direction == game.snake_direction else [GEMINI_KEYS[direction]]
+
+    def direction(self, head, cell, game):
+        dx = (cell[0] - head[0]) % game.width
+        dy = (cell[1] - head[1]) % game.height
+        return (1 if dx == 1 else -1 if dx else 0, 1 if dy == 1 else -1 if dy else 0)
+
+    def obstacles(self, game):
+        if self._obstacles[0] is not game.obstacles:
+            self._obstacles = (game.obstacles, frozenset(game.obstacles))
+        return self._obstacles[1]
+
+    def free_at(self, game):
+        """Tick from which each body cell can be entered (the move that enters the tail cell is the first)."""
+        segments = game.snake_body.segments
+        n = len(segments)
+        free_at = {}
+        for i in range(n - 1, -1, -1):  # The copy nearest the head decides
+            free_at[segments[i]] = n - i + 1
+        return free_at
+
+    def neighbours(self, cell, game):
+        x, y = cell
+        w, h = game.width, game.height
+        return ((x + 1) % w, y), ((x - 1) % w, y), (x, (y + 1) % h), (x, (y - 1) % h)
+
+    def search(self, game):
+        """A* from the head to the food; fills self.plan and returns the number of nodes expanded."""
+        self.plan.clear()
+        goal = game.food_pos
+        if goal is None:
+            return 1
+        w, h = game.width, game.height
+        gx, gy = goal
+        obstacles = self.obstacles(game)
+        free_at = self.free_at(game)
+        head = game.snake_body.head
+        back = ((head[0] - game.snake_direction[0]) % w, (head[1] - game.snake_direction[1]) % h)
+        parents = {head: None}
+        frontier = [(0, 0, head)]
+        nodes = 0
+        while frontier:
+            _, ticks, cell = heapq.heappop(frontier)
+            nodes += 1
+            if cell == goal:
+                while cell != head:
+                    self.plan.appendleft(cell)
+                    cell = parents[cell]
+                return nodes
+            ticks += 1
+            for step in self.neighbours(cell, game):
+                if step in parents or step in obstacles or (cell == head and step == back):
+                    continue
+                if free_at.get(step, 0) > ticks:
+                    continue  # Still body when we would get there; another route may come later
+                parents[step] = cell
+                dx, dy = abs(step[0] - gx), abs(step[1] - gy)
+                heapq.heappush(frontier, (ticks + min(dx, w - dx) + min(dy, h - dy), ticks, step))
+        return nodes
+
+    def escape(self, game, nodes):
+        """With no way to the food, turns toward the neighbour with the most room; returns (direction, nodes)."""
+        obstacles = self.obstacles(game)
+        free_at = self.free_at(game)
+        head = game.snake_body.head
+        best, best_room = game.snake_direction, -1
+        for step in self.neighbours(head, game):
+            direction = self.direction(head, step, game)
+            if direction == (-game.snake_direction[0], -game.snake_direction[1]):
+                continue
+            if step in obstacles or free_at.get(step, 0) > 1:
+                continue
+            # Flood fill from the step, counting cells that are open by the time they are reached
+            seen = {head, step}
+            frontier = deque([(step, 1)])
+            while frontier:
+                cell, ticks = frontier.popleft()
+                nodes += 1
+                for nxt in self.neighbours(cell, game):
+                    if nxt not in seen and nxt not in obstacles and free_at.get(nxt, 0) <= ticks + 1:
+                        seen.add(nxt)
+                        frontier.append((nxt, ticks + 1))
+            if len(seen) > best_room:
+                best, best_room = direction, len(seen)
+        return best, nodes
+
+    def board(self, game):
+        """The board as text; one bigger than self.view is cropped to a window of that size around the head."""
+        width, height = min(game.width, self.view[0]), min(game.height, self.view[1])
+        head_x, head_y = game.snake_body.head
+        # Top-left cell of the window, which wraps with the board
+        left = (head_x - width // 2) % game.width if width < game.width else 0
+        top = (head_y - height // 2) % game.height if height < game.height else 0
+        rows = [["."] * width for _ in range(height)]
+
+        def put(cell, char):
+            x, y = (cell[0] - left) % game.width, (cell[1] - top) % game.height
+            if x < width and y < height:
+                rows[y][x] = char
+
+        for cell in game.obstacles:
+            put(cell, "#")
+        for cell in game.snake_body:
+            put(cell, "o")
+        if game.food_pos is not None:
+            put(game.food_pos, "*")
+        put(game.snake_body.head, "@")
+        return "\n".join("".join(row) for row in rows)
+
+
+# --- claude.py ---
+
+CLAUDE_HORIZON = 160  # Ticks looked ahead
+CLAUDE_MAX_NODES = 20000  # Search budget; past it, the best plan found so far is used
+CLAUDE_SURVIVE = 60  # Ticks a plan that only stays alive runs before searching again
+
+
+class ClaudeAutopilot:
+    """Steers a claude.MarioSnake along an A* path through its physics states to a coin or mushroom."""
+
+    def __init__(self, stats=None):
+        import claude
+
+        self.claude = claude
+        self.stats = stats or PlanStats()
+        self.plan = deque()  # (keys, expected state after them), next first
+        self.expected = None
+        self.target = None
+        # Goals and explored states of the last search that ran out of states without
+        # reaching a goal; from any of those states the same goals stay out of reach
+        self.unreachable = (None, ())
+
+    def state(self, game):
+        return (game.positions[0], game.direction[0], game.jumping, game.jump_count, game.on_ground)
+
+    def keys(self, game):
+        start = perf_counter()
+        nodes = 0
+        if (not self.plan or self.expected != self.state(game) + (game.length,)
+                or (self.target is not None and self.target not in game.coins and self.target not in game.mushrooms)):
+            nodes = self.search(game)
+        keys = []
+        if self.plan:
+            keys, self.expected = self.plan.popleft()
+        self.stats.record(perf_counter() - start, nodes, lambda: self.board(game))
+        return keys
+
+    def search(self, game):
+        """Plans to the nearest coin or mushroom, or just to stay alive; returns the number of nodes expanded."""
+        self.plan.clear()
+        self.target = None
+        goals = game.coins | game.mushrooms
+        start = self.state(game)
+        successors = self.successors(game)
+        unreachable_goals, explored = self.unreachable
+        if goals == unreachable_goals and start in explored:
+            path, nodes = self.survive(game, start, successors)
+        else:
+            path, nodes = self.find_goal(game, start, goals, successors)
+        for keys, state in path:
+            # The length only changes when something is eaten, which ends the plan
+            self.plan.append((keys, state + (game.length,)))
+        return nodes
+
+    def successors(self, game):
+        """Returns successors(state, ticks) -> [(keys, state)], the moves that survive tick `ticks`."""
+        claude = self.claude
+        grid = claude.GRID_SIZE
+        level = game.level
+        move_head = claude.move_head
+        gravity, jump_height = game.gravity, game.jump_height
+
+        # A body segment blocks its cell until the tail has passed it
+        free_at = {}
+        for i in range(len(game.positions) - 1, 0, -1):
+            free_at[game.positions[i]] = game.length - i
+
+        # The enemies are deterministic, so their positions can be predicted for the whole horizon
+        enemies = game.enemies.tolist()
+        enemy_cells = []
+        for _ in range(CLAUDE_HORIZON):
+            enemy_cells.append({(x, y) for x, y, _ in enemies})
+            claude.move_enemies(level, enemies)
+
+        turn = {grid: pygame.K_LEFT, -grid: pygame.K_RIGHT}
+
+        def successors(state, ticks):
+            head, dir_x, jumping, jump_count, on_ground = state
+            found = []
+            for flip in (False, True):
+                new_dir = -dir_x if flip else dir_x
+                for jump in (False, True) if on_ground else (False,):
+                    if jump:
+                        moved = move_head(level, head, new_dir, True, jump_height, False, gravity, jump_height)
+                    else:
+                        moved = move_head(level, head, new_dir, jumping, jump_count, on_ground, gravity, jump_height)
+                    cell = moved[0]
+                    if cell in level or free_at.get(cell, 0) > ticks or cell in enemy_cells[ticks - 1]:
+                        continue
+                    keys = ([turn[dir_x]] if flip else []) + ([pygame.K_UP] if jump else [])
+                    found.append((keys, (cell, new_dir) + moved[1:]))
+            return found
+
+        return successors
+
+    def find_goal(self, game, start, goals, successors):
+        """A* to the nearest goal; returns (path, nodes), the path being the longest safe one if none is reached."""
+        grid, columns = self.claude.GRID_SIZE, self.claude.WIDTH // self.claude.GRID_SIZE
+        # Every tick moves one column, so the column distance to the nearest goal never overestimates
+        goal_columns = {x // grid for x, _ in goals}
+        estimate = [min((min(abs(c - g), columns - abs(c - g)) for g in goal_columns), default=0)
+                    for c in range(columns)]
+        nodes = [(start, None, None)]  # (state, parent index, keys that led here)
+        seen = {start}
+        frontier = [(estimate[start[0][0] // grid], 0, 0)]  # (f, ticks, node index)
+        deepest = (0, 0)  # (ticks, node index) of the longest surviving path
+        expanded = 0
+        while frontier and expanded < CLAUDE_MAX_NODES:
+            _, ticks, index = heapq.heappop(frontier)
+            expanded += 1
+            state = nodes[index][0]
+            if index and state[0] in goals:
+                self.target = state[0]
+                return self.path(nodes, index), expanded
+            if ticks > deepest[0]:
+                deepest = (ticks, index)
+            if ticks + 1 >= CLAUDE_HORIZON:
+                continue
+            for keys, new_state in successors(state, ticks + 1):
+                if new_state not in seen and not self.crosses(nodes, index, new_state[0], game.length):
+                    seen.add(new_state)
+                    nodes.append((new_state, index, keys))
+                    heapq.heappush(frontier, (ticks + 1 + estimate[new_state[0][0] // grid], ticks + 1, len(nodes) - 1))
+        if not frontier:
+            self.unreachable = (goals, seen)
+        return self.path(nodes, deepest[1]), expanded
+
+    def survive(self, game, start, successors):
+        """Depth-first search for CLAUDE_SURVIVE ticks alive, keeping on course where it can; returns (path, nodes)."""
+        nodes = [(start, None, None)]
+        stack = [(0, 0)]  # (ticks, node index)
+        seen = set()
+        deepest = (0, 0)
+        expanded = 0
+        while stack:
+            ticks, index = stack.pop()
+            expanded += 1
+            if ticks > deepest[0]:
+                deepest = (ticks, index)
+                if ticks == CLAUDE_SURVIVE:
+                    break
+            # Pushed in reverse, so going straight on without keys is tried first
+            for keys, new_state in reversed(successors(nodes[index][0], ticks + 1)):
+                if (new_state, ticks + 1) not in seen and not self.crosses(nodes, index, new_state[0], game.length):
+                    seen.add((new_state, ticks + 1))
+                    nodes.append((new_state, index, keys))
+                    stack.append((ticks + 1, len(nodes) - 1))
+        return self.path(nodes, deepest[1]), expanded
+
+    def crosses(self, nodes, index, cell, length):
+        """Whether `cell` is body left by the planned path itself: one of the last length - 1 heads up to node `index`."""
+        for _ in range(length - 1):
+            if index is None:
+                return False
+            if nodes[index][0][0] == cell:
+                return True
+            index = nodes[index][1]
+        return False
+
+    def path(self, nodes, index):
+        path = []
+        while index:
+            state, parent, keys = nodes[index]
+            path.append((keys, state))
+            index = parent
+        path.reverse()
+        return path
+
+    def board(self, game):
+        claude = self.claude
+        grid = claude.GRID_SIZE
+        rows = [["."] * (claude.WIDTH // grid) for _ in range(claude.HEIGHT // grid)]
+
+        def put(point, char):
+            x, y = point
+            if 0 <= y < claude.HEIGHT:
+                rows[int(y) // grid][int(x) // grid] = char
+
+        for brick in game.level:
+            put(brick, "#")
+        for coin in game.coins:
+            put(coin, "$")
+        for mushroom in game.mushrooms:
+            put(mushroom, "m")
+        for x, y, _ in game.enemies:
+            put((x, y), "E")
+        for position in game.positions[1:]:
+            put(position, "o")
+        put(game.positions[0], "@")
+        return "\n".join("".join(row) for row in rows)
+
+
+AUTOPILOTS = {"gemini": GeminiAutopilot, "claude": ClaudeAutopilot}
+
+
+def soak(name, ticks, seed=0, worst=3):
+    """Plays `ticks` ticks of a game under its autopilot, starting a new game whenever one ends.
+
+    Returns (seconds, scores, stats); `scores` has one per game, the last
+    one that of the game still running.
+    """
+    import importlib
+
+    module = importlib.import_module(name)
+    random.seed(seed)
+    stats = PlanStats(worst)
+    autopilot = AUTOPILOTS[name](stats)
+    game = module.SnakeGame() if name == "gemini" else module.MarioSnake()
+    scores = []
+    start = perf_counter()
+    for _ in range(ticks):
+        score = game.score
+        if game.step(autopilot.keys(game)):
+            if name == "gemini":
+                scores.append(game.score)
+                game = module.SnakeGame()
+            else:
+                scores.append(score)  # MarioSnake has already reset itself
+    elapsed = perf_counter() - start
+    return elapsed, scores + [game.score], stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("game", choices=sorted(AUTOPILOTS))
+    parser.add_argument("--ticks", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--worst", type=int, default=3, help="how many of the most expensive ticks to show")
+    args = parser.parse_args(argv)
+
+    import headless  # noqa: F401  (selects the dummy SDL drivers)
+
+    elapsed, scores, stats = soak(args.game, args.ticks, args.seed, args.worst)
+    print(f"{args.game}: {args.ticks:,} ticks in {elapsed:.2f}s ({args.ticks / elapsed:,.0f} ticks/sec), "
+          f"{len(scores)} games, score mean {sum(scores) / len(scores):.0f} max {max(scores)}")
+    print(stats.report())
+
+
+if __name__ == "__main__":
+    main()
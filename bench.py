@@ -0,0 +1,703 @@
+"""Throughput benchmarks for the headless simulation paths.
+
+Usage:
+    python bench.py claude [--ticks N] [--seed S]
+    python bench.py bricks [--ticks N] [--counts N ...]
+    python bench.py snake-body [--ticks N] [--lengths N ...]
+    python bench.py render [--frames N]
+    python bench.py batch [--games N ...] [--ticks N] [--check]
+    python bench.py tail [--frames N] [--lengths N ...]
+    python bench.py stream [--frames N] [--checkpoints N]
+    python bench.py sprites [--frames N] [--lengths N ...]
+    python bench.py atlas [--blits N] [--sprites N]
+    python bench.py level [--screens N] [--queries N] [--chunks N]
+    python bench.py reset [--resets N]
+    python bench.py entities [--frames N] [--counts N ...]
+    python bench.py goombas [--ticks N] [--counts N ...]
+    python bench.py capture [--frames N] [--fps N] [--pool N] [--workers N]
+    python bench.py board [--frames N] [--sizes WxH ...]
+"""
+import argparse
+import random
+import time
+
+import headless
+
+
+def bench_claude(args):
+    """Measures ticks/sec of MarioSnake.step with scripted random input and no drawing."""
+    import claude
+
+    script = headless.scripted_ticks(headless.random_script(headless.CLAUDE_KEYS, args.seed), args.ticks)
+    random.seed(args.seed)
+    game = claude.MarioSnake()
+    deaths = 0
+    start = time.perf_counter()
+    for keys in script:
+        if game.step(keys):
+            deaths += 1
+    elapsed = time.perf_counter() - start
+    print(f"claude: {args.ticks} ticks in {elapsed:.3f}s -> {args.ticks / elapsed:,.0f} ticks/sec ({deaths} deaths)")
+
+
+def bench_bricks(args):
+    """Measures MarioSnake's per-tick cost as the level grows to thousands of bricks.
+
+    Extra bricks are laid out below the playfield so gameplay is unchanged and
+    only the level grows. Ticks that end in a death (and therefore repopulate
+    the level) are excluded from the timing.
+    """
+    import claude
+
+    for count in args.counts:
+        script = headless.scripted_ticks(headless.random_script(headless.CLAUDE_KEYS, args.seed), args.ticks)
+        random.seed(args.seed)
+        game = claude.MarioSnake(claude.build_level(count))
+        timed = 0
+        elapsed = 0.0
+        for keys in script:
+            start = time.perf_counter()
+            died = game.step(keys)
+            if not died:
+                elapsed += time.perf_counter() - start
+                timed += 1
+        print(f"bricks={len(game.level):>6}: {elapsed / timed * 1e6:7.2f} us/tick over {timed} ticks")
+
+
+def bench_snake_body(args):
+    """Compares gemini.py's per-tick body update on a plain list and on SnakeBody.
+
+    Each tick pushes a new head, runs the self-collision test and pops the
+    tail, the same work main() does for a snake that did not eat.
+    """
+    import gemini
+
+    for length in args.lengths:
+        width = length + args.ticks + 1
+        cells = [(x, 0) for x in range(length, 0, -1)]
+
+        body = list(cells)
+        start = time.perf_counter()
+        for x in range(length + 1, width):
+            new_head = (x, 0)
+            if new_head in body[1:]:
+                break
+            body.insert(0, new_head)
+            body.pop()
+        list_us = (time.perf_counter() - start) / args.ticks * 1e6
+
+        body = gemini.SnakeBody(cells)
+        start = time.perf_counter()
+        for x in range(length + 1, width):
+            new_head = (x, 0)
+            if body.hits_body(new_head):
+                break
+            body.push_head(new_head)
+            body.pop_tail()
+        deque_us = (time.perf_counter() - start) / args.ticks * 1e6
+
+        print(f"length={length:>6}: list {list_us:9.2f} us/tick, SnakeBody {deque_us:6.2f} us/tick")
+
+
+def bench_render(args):
+    """Compares full-screen redraws with cached-background dirty-rect rendering."""
+    import pygame
+
+    import claude
+    import gemini
+    from window import open_window
+
+    screen = open_window()
+    script = headless.scripted_ticks(headless.random_script(headless.CLAUDE_KEYS, args.seed), args.frames)
+    for mode in ("full", "dirty"):
+        random.seed(args.seed)
+        game = claude.MarioSnake()
+        elapsed = 0.0
+        for keys in script:
+            game.step(keys)
+            start = time.perf_counter()
+            if mode == "dirty":
+                pygame.display.update(game.draw_dirty(screen))
+            else:
+                game.draw(screen)
+                pygame.display.update()
+            elapsed += time.perf_counter() - start
+        print(f"claude {mode:>5}: {elapsed / args.frames * 1e6:8.1f} us/frame")
+
+    background = gemini.render_background([gemini.generate_obstacle() for _ in range(gemini.OBSTACLE_COUNT)])
+    start = time.perf_counter()
+    for _ in range(args.frames):
+        screen.fill(gemini.BLACK)
+        gemini.draw_grid(screen)
+    grid_us = (time.perf_counter() - start) / args.frames * 1e6
+    start = time.perf_counter()
+    for _ in range(args.frames):
+        screen.blit(background, (0, 0))
+    cached_us = (time.perf_counter() - start) / args.frames * 1e6
+    print(f"gemini background: draw_grid {grid_us:8.1f} us/frame, cached blit {cached_us:8.1f} us/frame")
+
+
+def bench_batch(args):
+    """Measures game-ticks/sec of the NumPy batch engine against one scalar gemini.SnakeGame.
+
+    With --check, first verifies the batch engine against the scalar rules.
+    """
+    import numpy as np
+
+    import gemini
+    import gemini_batch
+
+    if args.check:
+        episodes = gemini_batch.verify_against_scalar(seed=args.seed)
+        print(f"batch engine matches gemini.SnakeGame over {episodes} games")
+
+    random.seed(args.seed)
+    rng = np.random.default_rng(args.seed)
+    game = gemini.SnakeGame()
+    actions = rng.integers(0, len(gemini_batch.ACTION_KEYS), args.ticks)
+    start = time.perf_counter()
+    for action in actions:
+        if game.step([gemini_batch.ACTION_KEYS[action]] if action else []):
+            game = gemini.SnakeGame()
+    elapsed = time.perf_counter() - start
+    print(f"scalar SnakeGame: {args.ticks / elapsed:12,.0f} game-ticks/sec")
+
+    for n_games in args.games:
+        env = gemini_batch.BatchSnakeEnv(n_games, seed=args.seed)
+        actions = rng.integers(0, len(gemini_batch.ACTION_KEYS), (args.ticks, n_games))
+        start = time.perf_counter()
+        for tick_actions in actions:
+            env.step(tick_actions)
+        elapsed = time.perf_counter() - start
+        print(f"batch x{n_games:>5}: {n_games * args.ticks / elapsed:12,.0f} game-ticks/sec")
+
+
+def bench_tail(args):
+    """Measures deepseek.py's per-frame cost against tail length.
+
+    Enemies are turned off so the player survives; the tail is filled before
+    timing starts. For reference, the old self-collision test (a list slice
+    and one Rect per segment) is timed on the same tail.
+    """
+    import pygame
+
+    import deepseek
+
+    for length in args.lengths:
+        random.seed(args.seed)
+        game = deepseek.Game(enemies=False)
+        player = game.player
+        player.tail_length = length
+        for _ in range(length):
+            game.step()
+
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            game.step()
+        frame_us = (time.perf_counter() - start) / args.frames * 1e6
+
+        tail = list(player.tail_positions)
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            for pos in tail[:-10]:
+                if pygame.Rect(pos[0], pos[1], player.width, player.height).colliderect(
+                        player.x, player.y, player.width, player.height):
+                    break
+        old_us = (time.perf_counter() - start) / args.frames * 1e6
+        print(f"tail={length:>6}: {frame_us:7.2f} us/frame (old tail test alone: {old_us:9.2f} us/frame)")
+
+
+def bench_stream(args):
+    """Measures deepseek.py's per-frame cost (simulation and drawing) against distance run.
+
+    Enemies are turned off and the player runs right; with chunk streaming the
+    frame time, loaded chunk count and broadphase size should stay flat.
+    """
+    import pygame
+
+    import deepseek
+
+    random.seed(args.seed)
+    game = deepseek.Game(enemies=False)
+    surface = pygame.Surface((deepseek.SCREEN_WIDTH, deepseek.SCREEN_HEIGHT))
+    for checkpoint in range(args.checkpoints):
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            game.step()
+            game.draw(surface)
+        frame_us = (time.perf_counter() - start) / args.frames * 1e6
+        print(f"x={game.player.x:>9,.0f}: {frame_us:7.2f} us/frame, {len(game.chunks)} chunks loaded, "
+              f"{len(game.platform_store.hash.cells)} platform hash cells")
+
+
+def bench_sprites(args):
+    """Measures chatgpt.py's per-frame draw cost against snake length.
+
+    The snake is laid out across the screen and wiggles one tile left and
+    right. For reference, the old full redraw (fill, then one draw.rect per
+    segment) is timed on the same snake.
+    """
+    import pygame
+
+    import chatgpt
+
+    columns, rows = chatgpt.WIDTH // chatgpt.TILE_SIZE, chatgpt.HEIGHT // chatgpt.TILE_SIZE
+    surface = pygame.Surface((chatgpt.WIDTH, chatgpt.HEIGHT))
+    for length in args.lengths:
+        random.seed(args.seed)
+        game = chatgpt.Game()
+        snake = game.snake
+        for cell in snake.body:
+            snake.vacate(cell)
+        snake.body = [(i % columns * chatgpt.TILE_SIZE, i // columns % rows * chatgpt.TILE_SIZE) for i in range(length)]
+        for cell in snake.body:
+            snake.occupy(cell)
+        game.draw(surface)
+
+        start = time.perf_counter()
+        for frame in range(args.frames):
+            snake.direction = (chatgpt.TILE_SIZE, 0) if frame % 2 == 0 else (-chatgpt.TILE_SIZE, 0)
+            snake.move()
+            game.draw(surface)
+        frame_us = (time.perf_counter() - start) / args.frames * 1e6
+
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            surface.fill(chatgpt.WHITE)
+            for segment in snake.body:
+                pygame.draw.rect(surface, chatgpt.RED, (*segment, chatgpt.TILE_SIZE, chatgpt.TILE_SIZE))
+        old_us = (time.perf_counter() - start) / args.frames * 1e6
+        print(f"snake={length:>6}: {frame_us:8.2f} us/frame (old full redraw of the snake alone: {old_us:9.2f} us/frame)")
+
+
+def bench_atlas(args):
+    """Measures blits from the display-format atlas against unconverted surfaces, and atlas startup.
+
+    Blits go to the display from claude.py's sprites as the game used to make
+    them, and from sprite files loaded as they come off disk (RGB and RGBA
+    PNGs), each against the same sprites in a converted atlas (noting the
+    format it picked for opaque sprites) and converted one by one with
+    display_format(). Startup packs
+    `--sprites` RGBA files with and without the disk cache.
+    """
+    import os
+    import tempfile
+
+    import pygame
+
+    import assets
+    import claude
+    from window import open_window
+
+    screen = open_window()
+    positions = [((i * 37) % (claude.WIDTH - 64), (i * 53) % (claude.HEIGHT - 64)) for i in range(args.blits)]
+
+    def blit_ns(images):
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            for i, position in enumerate(positions):
+                screen.blit(images[i % len(images)], position)
+            best = min(best, time.perf_counter() - start)
+        return best / len(positions) * 1e9
+
+    with tempfile.TemporaryDirectory() as root:
+        asset_dir, cache_dir = os.path.join(root, "assets"), os.path.join(root, "cache")
+        rng = random.Random(args.seed)
+        cases = {"claude": {name: pygame.Surface(size) for name, (size, color) in claude.SPRITES.items()}}
+        for alpha in (False, True):
+            game = "files-rgba" if alpha else "files-rgb"
+            os.makedirs(os.path.join(asset_dir, game))
+            sprites = {f"s{i}": ((32, 32), (0, 0, 0)) for i in range(args.sprites)}
+            for name in sprites:
+                image = pygame.Surface((32, 32), pygame.SRCALPHA if alpha else 0, 32)
+                image.fill((rng.randrange(256), rng.randrange(256), rng.randrange(256), 200 if alpha else 255))
+                pygame.image.save(image, os.path.join(asset_dir, game, f"{name}.png"))
+            cases[game] = {name: pygame.image.load(os.path.join(asset_dir, game, f"{name}.png")) for name in sprites}
+
+        for game, loose in cases.items():
+            sprites = claude.SPRITES if game == "claude" else {name: ((32, 32), (0, 0, 0)) for name in loose}
+            start = time.perf_counter()
+            atlas = assets.load_atlas(game, sprites, asset_dir, cache_dir)
+            packed_ms = (time.perf_counter() - start) * 1e3
+            assets._atlases.pop(game)
+            start = time.perf_counter()
+            atlas = assets.load_atlas(game, sprites, asset_dir, cache_dir)
+            cached_ms = (time.perf_counter() - start) * 1e3
+            assets._atlases.pop(game)
+            names = list(loose)
+            before, after = blit_ns([loose[n] for n in names]), blit_ns([atlas[n] for n in names])
+            converted = blit_ns([assets.display_format(loose[n], loose[n].get_flags() & pygame.SRCALPHA)
+                                 for n in names])
+            print(f"{game:<11} {len(names):>4} sprites: unconverted {before:7.1f} ns/blit, atlas {after:7.1f} ns/blit "
+                  f"({before / after:.2f}x, opaque {atlas.opaque_format}), each converted on its own {converted:7.1f} ns/blit; "
+                  f"startup packed {packed_ms:6.2f} ms, cached {cached_ms:6.2f} ms")
+
+
+def bench_level(args):
+    """Compares a memory-mapped tile level with the same solid tiles as a set of (x, y) tuples.
+
+    Reports load time and memory (the mapped file's size, against the
+    tracemalloc peak of building the set) and the cost of a point query,
+    then the time deepseek.py takes to generate a streamed chunk of it.
+    """
+    import os
+    import tempfile
+    import tracemalloc
+
+    import levels
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "level.lvl")
+        levels.generate(args.screens, seed=args.seed).save(path)
+        start = time.perf_counter()
+        level = levels.load(path)
+        load_ms = (time.perf_counter() - start) * 1e3
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        bricks = set(level)
+        build_ms = (time.perf_counter() - start) * 1e3
+        set_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        rng = random.Random(args.seed)
+        size = level.tile_size
+        points = [(rng.randrange(level.width) * size, rng.randrange(level.height) * size) for _ in range(args.queries)]
+        timings = {}
+        for name, solids in (("level", level), ("set", bricks)):
+            start = time.perf_counter()
+            hits = sum(point in solids for point in points)
+            timings[name] = (time.perf_counter() - start) / len(points) * 1e9
+        print(f"{args.screens} screens, {level.width}x{level.height} tiles, {len(bricks):,} solid ({hits:,} query hits)")
+        print(f"level file: load {load_ms:8.2f} ms, {level.nbytes / 2**20:7.2f} MiB mapped, {timings['level']:6.1f} ns/query")
+        print(f"tuple set:  build {build_ms:7.2f} ms, {set_bytes / 2**20:7.2f} MiB,        {timings['set']:6.1f} ns/query")
+
+        # deepseek.py streaming this level: every chunk places its enemies on the level's ground
+        import deepseek
+
+        solids = deepseek.LevelSolids(level)
+        chunks = level.width * size // deepseek.CHUNK_WIDTH
+        indices = range(0, chunks, max(chunks // args.chunks, 1))
+        times = []
+        for index in indices:
+            start = time.perf_counter()
+            deepseek.generate_chunk(index, args.seed, solids=solids)
+            times.append(time.perf_counter() - start)
+        times.sort()
+        print(f"deepseek chunks: {len(times)} generated, mean {sum(times) / len(times) * 1e3:7.3f} ms, "
+              f"max {times[-1] * 1e3:7.3f} ms")
+        del solids
+        del level, bricks  # Release the mapping before the directory is removed
+
+
+def bench_reset(args):
+    """Measures MarioSnake.reset() followed by first use of the free cells and background.
+
+    "template" is the normal path, restoring from the level's cached
+    LevelTemplate; "rebuilt" clears the cache before each reset, which costs
+    what every reset did before the template existed.
+    """
+    import claude
+    from window import open_window
+
+    open_window()
+    random.seed(args.seed)
+    game = claude.MarioSnake()
+    for name, rebuild in (("template", False), ("rebuilt", True)):
+        start = time.perf_counter()
+        for _ in range(args.resets):
+            if rebuild:
+                claude.level_template.cache_clear()
+            game.reset()
+            game.free_cells.sample()
+            game.background
+        elapsed = time.perf_counter() - start
+        print(f"{name:<8}: {elapsed / args.resets * 1e6:8.1f} us/reset")
+
+
+def bench_entities(args):
+    """Measures deepseek.py's memory per entity and step and draw time against entity count.
+
+    Half the entities are enemies patrolling the loaded chunks and half are
+    collectibles out of the player's reach; the player stands still, so the
+    same entities stay loaded throughout. Memory is what tracemalloc sees
+    allocated while adding them.
+    """
+    import tracemalloc
+
+    import pygame
+
+    import deepseek
+
+    surface = pygame.Surface((deepseek.SCREEN_WIDTH, deepseek.SCREEN_HEIGHT))
+    for count in args.counts:
+        random.seed(args.seed)
+        rng = random.Random(args.seed)
+        game = deepseek.Game(enemies=False)
+        game.player.speed = 0
+        width = 3 * deepseek.CHUNK_WIDTH
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(count // 2):
+            left = rng.randrange(0, width - 200)
+            game.add_enemy(left + 100, deepseek.SCREEN_HEIGHT - 2 * deepseek.TILE_SIZE, left, left + 200)
+            game.add_collectible(rng.randrange(width), rng.randrange(100))
+        per_entity = (tracemalloc.get_traced_memory()[0] - before) / max(count, 1)
+        tracemalloc.stop()
+
+        step = draw = 0.0
+        for _ in range(args.frames):
+            start = time.perf_counter()
+            game.remember()
+            game.step()
+            middle = time.perf_counter()
+            game.draw(surface, 0.5)
+            step += middle - start
+            draw += time.perf_counter() - middle
+        print(f"entities={count:>6}: {per_entity:6.0f} B/entity, step {step / args.frames * 1e6:8.1f} us, "
+              f"draw {draw / args.frames * 1e6:8.1f} us")
+
+
+def bench_goombas(args):
+    """Measures MarioSnake's per-tick cost against enemy count, batched and looped.
+
+    The enemies walk on shelves of bricks below the playfield, so the snake
+    never meets them. "loop" raises claude.VECTORIZE_ENEMIES so that they stay
+    [x, y, direction] lists moved one by one, as all enemies were before.
+    Ticks that end in a death (which resets the enemies) are excluded, and
+    the enemies are put back.
+    """
+    import numpy as np
+
+    import claude
+    import levels
+
+    shelves = 10
+    base = claude.build_level()
+    tiles = np.zeros((base.width, base.height + 2 * shelves), np.uint8)
+    tiles[:, :base.height] = base.tiles
+    tiles[:, base.height + 1::2] = levels.BRICK
+    level = levels.Level(tiles, claude.GRID_SIZE)
+    vectorize = claude.VECTORIZE_ENEMIES
+    for count in args.counts:
+        rng = random.Random(args.seed)
+        xs = [rng.randrange(base.width) * claude.GRID_SIZE for _ in range(count)]
+        ys = [(base.height + 2 * rng.randrange(shelves)) * claude.GRID_SIZE for _ in range(count)]
+        directions = [rng.choice((-1, 1)) for _ in range(count)]
+        results = []
+        for name, threshold in (("batched", vectorize), ("loop", float("inf"))):
+            claude.VECTORIZE_ENEMIES = threshold
+            script = headless.scripted_ticks(headless.random_script(headless.CLAUDE_KEYS, args.seed), args.ticks)
+            random.seed(args.seed)
+            game = claude.MarioSnake(level)
+            game.enemies.extend(xs, ys, directions)
+            timed = 0
+            elapsed = 0.0
+            for keys in script:
+                start = time.perf_counter()
+                died = game.step(keys)
+                if died:
+                    game.enemies.extend(xs, ys, directions)
+                else:
+                    elapsed += time.perf_counter() - start
+                    timed += 1
+            results.append(f"{name} {elapsed / timed * 1e6:8.1f} us/tick")
+        claude.VECTORIZE_ENEMIES = vectorize
+        print(f"enemies={count:>6}: " + ", ".join(results))
+
+
+def bench_capture(args):
+    """Measures what recording costs claude.py's loop: none, PNGs saved inline, or capture.FrameCapture.
+
+    Each frame is a tick, a full draw and a display update, paced to --fps
+    (0 runs flat out) so the workers get the idle time a real game leaves.
+    "loop" is the time from the start of the tick to the end of recording.
+    """
+    import os
+    import tempfile
+
+    import pygame
+
+    import claude
+    from capture import FrameCapture, percentile
+    from window import open_window
+
+    screen = open_window()
+    period = 1 / args.fps if args.fps else 0
+    for mode in ("none", "inline", "threaded"):
+        random.seed(args.seed)
+        game = claude.MarioSnake()
+        script = headless.scripted_ticks(headless.random_script(headless.CLAUDE_KEYS, args.seed), args.frames)
+        with tempfile.TemporaryDirectory() as directory:
+            capture = FrameCapture(directory, args.pool, args.workers) if mode == "threaded" else None
+            times = []
+            deadline = time.perf_counter()
+            for frame, keys in enumerate(script):
+                start = time.perf_counter()
+                game.step(keys)
+                game.draw(screen)
+                pygame.display.update()
+                if mode == "inline":
+                    pygame.image.save(screen, os.path.join(directory, f"frame_{frame:06d}.png"))
+                elif capture:
+                    capture.grab(screen)
+                times.append(time.perf_counter() - start)
+                deadline += period
+                time.sleep(max(0.0, deadline - time.perf_counter()))
+            note = ""
+            if capture:
+                capture.close()
+                s = capture.summary()
+                note = (f", grab {s['grab_mean_ms']:.3f} ms, {s['dropped']} of {s['frames']} frames dropped, "
+                        f"encode {s['encode_mean_ms']:.1f} ms/frame")
+        times.sort()
+        print(f"{mode:<8}: loop mean {sum(times) / len(times) * 1e3:6.2f} ms, "
+              f"p99 {percentile(times, 0.99) * 1e3:6.2f} ms{note}")
+
+
+def bench_board(args):
+    """Measures gemini.py's memory, setup, step and draw time against board size.
+
+    The snake (grown to 50 segments) runs straight ahead without input, so
+    every frame draws the same amount whatever the board; a run stops early
+    if it hits an obstacle. Memory is what tracemalloc sees allocated while
+    creating the game, in a separate pass from the timed setup.
+    """
+    import tracemalloc
+
+    import gemini
+    from window import open_window
+
+    screen = open_window()
+    for width, height in args.sizes:
+        random.seed(args.seed)
+        tracemalloc.start()
+        game = gemini.SnakeGame(width=width, height=height)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del game
+        random.seed(args.seed)
+        start = time.perf_counter()
+        game = gemini.SnakeGame(width=width, height=height)
+        setup = time.perf_counter() - start
+        game.snake_body.grow(50)
+        renderer = gemini.make_renderer(game, screen)
+        step = draw = 0.0
+        frames = 0
+        for _ in range(args.frames):
+            start = time.perf_counter()
+            renderer.remember()
+            crashed = game.step()
+            step += time.perf_counter() - start
+            if crashed:
+                break
+            start = time.perf_counter()
+            renderer.draw(0.5)
+            draw += time.perf_counter() - start
+            frames += 1
+        print(f"{width:>5}x{height:<5}: {type(renderer).__name__:<16} {memory / 2**20:7.1f} MiB, setup {setup * 1e3:6.1f} ms, "
+              f"step {step / max(frames, 1) * 1e6:6.1f} us, draw {draw / max(frames, 1) * 1e6:6.1f} us ({frames} frames)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="benchmark", required=True)
+
+    p = sub.add_parser("claude", help="pure simulation throughput of claude.py's MarioSnake")
+    p.add_argument("--ticks", type=int, default=50000)
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=bench_claude)
+
+    p = sub.add_parser("bricks", help="MarioSnake per-tick cost against level size")
+    p.add_argument("--ticks", type=int, default=20000)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--counts", type=int, nargs="+", default=[0, 1000, 5000, 20000])
+    p.set_defaults(func=bench_bricks)
+
+    p = sub.add_parser("snake-body", help="gemini.py snake body update cost against snake length")
+    p.add_argument("--ticks", type=int, default=2000)
+    p.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    p.set_defaults(func=bench_snake_body)
+
+    p = sub.add_parser("render", help="full redraw against cached-background dirty-rect rendering")
+    p.add_argument("--frames", type=int, default=2000)
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=bench_render)
+
+    p = sub.add_parser("batch", help="NumPy batch engine throughput for gemini.py's rules")
+    p.add_argument("--games", type=int, nargs="+", default=[1, 64, 1024, 4096])
+    p.add_argument("--ticks", type=int, default=500)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--check", action="store_true", help="verify against gemini.SnakeGame first")
+    p.set_defaults(func=bench_batch)
+
+    p = sub.add_parser("tail", help="deepseek.py per-frame cost against tail length")
+    p.add_argument("--frames", type=int, default=2000)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    p.set_defaults(func=bench_tail)
+
+    p = sub.add_parser("stream", help="deepseek.py per-frame cost against distance travelled")
+    p.add_argument("--frames", type=int, default=5000)
+    p.add_argument("--checkpoints", type=int, default=5)
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=bench_stream)
+
+    p = sub.add_parser("sprites", help="chatgpt.py per-frame draw cost against snake length")
+    p.add_argument("--frames", type=int, default=1000)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    p.set_defaults(func=bench_sprites)
+
+    p = sub.add_parser("atlas", help="display-format sprite atlas against unconverted surfaces")
+    p.add_argument("--blits", type=int, default=200000)
+    p.add_argument("--sprites", type=int, default=200)
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=bench_atlas)
+
+    p = sub.add_parser("level", help="memory-mapped tile level against a set of brick tuples")
+    p.add_argument("--screens", type=int, default=3000)
+    p.add_argument("--queries", type=int, default=200000)
+    p.add_argument("--chunks", type=int, default=200, help="deepseek chunks to generate along the level")
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=bench_level)
+
+    p = sub.add_parser("reset", help="claude.py reset cost with and without the level template")
+    p.add_argument("--resets", type=int, default=2000)
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=bench_reset)
+
+    p = sub.add_parser("entities", help="deepseek.py memory and frame time against entity count")
+    p.add_argument("--frames", type=int, default=200)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 10000])
+    p.set_defaults(func=bench_entities)
+
+    p = sub.add_parser("goombas", help="claude.py per-tick cost against enemy count")
+    p.add_argument("--ticks", type=int, default=2000)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    p.set_defaults(func=bench_goombas)
+
+    p = sub.add_parser("capture", help="claude.py frame time while recording, inline against threaded")
+    p.add_argument("--frames", type=int, default=600)
+    p.add_argument("--fps", type=int, default=60, help="frame pacing (0: flat out)")
+    p.add_argument("--pool", type=int, default=8)
+    p.add_argument("--workers", type=int, default=2)
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=bench_capture)
+
+    p = sub.add_parser("board", help="gemini.py memory and frame time against board size")
+    p.add_argument("--frames", type=int, default=500)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--sizes", type=lambda text: tuple(map(int, text.lower().split("x"))), nargs="+",
+                   default=[(40, 30), (256, 256), (2000, 2000), (4000, 4000)])
+    p.set_defaults(func=bench_board)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Gameplay recording without stalling the game loop.
+
+A game loop calls `capture.grab(screen)` right after updating the display.
+grab() copies the frame's pixels out of the surface in one step, through
+the surface's buffer view, into a free buffer from a pool allocated up
+front, and queues it. Worker threads turn queued frames into PNG files
+(zlib does the compressing and releases the GIL while it works) and give
+the buffers back to the pool. If every buffer is still waiting to be
+written, the frame is dropped rather than making the game wait; files are
+numbered by frame, so drops show up as gaps.
+
+summary() reports the time grab() took per frame (the only cost the game
+sees), frames captured, dropped, written and failed, and the workers'
+encode time. A frame that fails to encode or write is counted and its
+buffer goes back to the pool; close() re-raises the first such error.
+
+Usage:
+    python capture.py GAME [--out DIR] [--pool N] [--workers N] [--compression 0-9]
+"""
+import argparse
+import importlib
+import os
+import queue
+import struct
+import threading
+import zlib
+from array import array
+from collections import deque
+from time import perf_counter
+
+import numpy as np
+
+from window import open_window
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def encode_png(rgb, compression=6):
+    """PNG file contents of a (height, width, 3) uint8 RGB array."""
+    height, width, _ = rgb.shape
+    rows = np.empty((height, 1 + 3 * width), np.uint8)
+    rows[:, 0] = 0  # Filter type None for every row
+    rows[:, 1:] = rgb.reshape(height, 3 * width)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)  # 8-bit RGB, no interlace
+    return b"".join([PNG_SIGNATURE, _chunk(b"IHDR", header),
+                     _chunk(b"IDAT", zlib.compress(rows.data, compression)), _chunk(b"IEND", b"")])
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list (0 if empty)."""
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class FrameCapture:
+    """Copies frames into a pool of `pool` buffers and writes them as PNGs from `workers` threads.
+
+    Buffers are allocated by prepare(), for the surface's size and pixel
+    format, which must stay the same for the whole recording; grab() calls
+    it on the first frame if nobody did before. Call close() to write out
+    what is queued and stop the workers.
+    """
+
+    def __init__(self, directory, pool=8, workers=2, compression=6):
+        self.directory = directory
+        self.pool_size = pool
+        self.compression = compression
+        os.makedirs(directory, exist_ok=True)
+        self.free = deque()  # Buffers ready for grab(); deque appends and pops are thread-safe
+        self.frames = queue.Queue(maxsize=pool)  # (frame number, buffer) waiting for a worker
+        self.frame = 0
+        self.dropped = 0
+        self.written = 0
+        self.bytes_written = 0
+        self.failed = 0
+        self.error = None  # First exception a worker hit, re-raised by close()
+        self.grab_times = array("d")  # Seconds each grab() took
+        self.encode_times = array("d")  # Seconds each frame took a worker
+        self._format = None
+        self._lock = threading.Lock()  # Guards the workers' counters
+        self._workers = [threading.Thread(target=self._work, name=f"capture-{i}", daemon=True)
+                         for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def prepare(self, surface):
+        """Allocates the buffers for `surface`; raises ValueError unless it has 32-bit pixels."""
+        if surface.get_bytesize() != 4:
+            raise ValueError(f"capture needs a 32-bit surface, got {surface.get_bitsize()}-bit")
+        width, height = surface.get_size()
+        pitch = surface.get_pitch()
+        # Byte of each of R, G and B within a little-endian 32-bit pixel
+        channels = [shift // 8 for shift in surface.get_shifts()[:3]]
+        self._format = (width, height, pitch, channels)
+        for _ in range(self.pool_size):
+            self.free.append(np.empty(height * pitch, np.uint8))
+
+    def grab(self, surface):
+        """Queues a copy of the surface's pixels, or drops the frame if no buffer is free."""
+        start = perf_counter()
+        if self._format is None:
+            self.prepare(surface)
+        self.frame += 1
+        try:
+            buffer = self.free.pop()
+        except IndexError:
+            self.dropped += 1
+        else:
+            buffer[:] = np.frombuffer(surface.get_buffer(), np.uint8)
+            self.frames.put_nowait((self.frame, buffer))  # Never full: there are only `pool` buffers
+        self.grab_times.append(perf_counter() - start)
+
+    def _work(self):
+        while True:
+            item = self.frames.get()
+            if item is None:
+                return
+            frame, buffer = item
+            start = perf_counter()
+            try:
+                width, height, pitch, channels = self._format
+                pixels = buffer.reshape(height, pitch // 4, 4)[:, :width, channels]
+                data = encode_png(pixels, self.compression)
+                self.free.append(buffer)
+                buffer = None
+                with open(os.path.join(self.directory, f"frame_{frame:06d}.png"), "wb") as f:
+                    f.write(data)
+            except Exception as e:
+                with self._lock:
+                    self.failed += 1
+                    if self.error is None:
+                        self.error = e
+            else:
+                with self._lock:
+                    self.written += 1
+                    self.bytes_written += len(data)
+                    self.encode_times.append(perf_counter() - start)
+            finally:
+                if buffer is not None:
+                    self.free.append(buffer)
+
+    def close(self):
+        """Writes the frames still queued, stops the workers and re-raises the first frame that failed."""
+        for _ in self._workers:
+            self.frames.put(None)
+        for worker in self._workers:
+            worker.join()
+        if self.error is not None:
+            raise self.error
+
+    def summary(self):
+        grabs, encodes = sorted(self.grab_times), sorted(self.encode_times)
+        return {
+            "frames": self.frame,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "grab_mean_ms": sum(grabs) / max(len(grabs), 1) * 1e3,
+            "grab_p99_ms": percentile(grabs, 0.99) * 1e3,
+            "encode_mean_ms": sum(encodes) / max(len(encodes), 1) * 1e3,
+            "bytes_per_frame": self.bytes_written / max(self.written, 1),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("game", choices=["chatgpt", "claude", "deepseek", "gemini"])
+    parser.add_argument("--out", help="directory for the frames (default: capture-GAME)")
+    parser.add_argument("--pool", type=int, default=8, help="frame buffers; a frame is dropped when all are in use")
+    parser.add_argument("--workers", type=int, default=2, help="threads compressing and writing frames")
+    parser.add_argument("--compression", type=int, default=6, choices=range(10), help="zlib level of the PNGs")
+    args = parser.parse_args(argv)
+
+    # Check the display can be captured before the game starts its loop
+    screen = open_window()
+    capture = FrameCapture(args.out or f"capture-{args.game}", args.pool, args.workers, args.compression)
+    try:
+        capture.prepare(screen)
+    except ValueError:
+        capture.close()
+        raise
+    module = importlib.import_module(args.game)
+    try:
+        module.main(capture=capture, screen=screen)
+    finally:
+        try:
+            capture.close()
+        finally:
+            s = capture.summary()
+            print(f"{s['frames']} frames: {s['written']} written to {capture.directory}, {s['dropped']} dropped, "
+                  f"{s['failed']} failed; "
+                  f"grab mean {s['grab_mean_ms']:.3f} ms, p99 {s['grab_p99_ms']:.3f} ms; "
+                  f"encode mean {s['encode_mean_ms']:.1f} ms, {s['bytes_per_frame'] / 1024:,.0f} KiB/frame")
+
+
+if __name__ == "__main__":
+    main()
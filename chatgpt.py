@@ -1,5 +1,10 @@
 import pygame
 import random
+from collections import Counter, defaultdict
+
+from assets import display_format, load_atlas
+from profiler import NULL_PROFILER
+from window import open_window
 
 # Game settings
 WIDTH, HEIGHT = 800, 600
@@ -10,30 +15,46 @@ TILE_SIZE = 32
 WHITE = (255, 255, 255)
 GREEN = (0, 255, 0)
 RED = (255, 0, 0)
+ORANGE = (255, 165, 0)
+
+# Keys the player responds to while held
+CONTROL_KEYS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_SPACE)
+
+# Draw order, back to front
+PLATFORM_LAYER, ITEM_LAYER, PLAYER_LAYER, SNAKE_LAYER = range(4)
+
+CAPTION = "Mario-Snake Hybrid"
 
-# Initialize Pygame
-pygame.init()
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Mario-Snake Hybrid")
-clock = pygame.time.Clock()
+# Sprites: placeholder squares, replaced by assets/chatgpt/<name>.png when present
+SPRITES = {
+    'mario': ((TILE_SIZE, TILE_SIZE), (0, 0, 255)),  # placeholder blue square
+    'segment': ((TILE_SIZE, TILE_SIZE), RED),
+    'item': ((TILE_SIZE, TILE_SIZE), ORANGE),
+}
 
-# Load assets
-mario_img = pygame.Surface((TILE_SIZE, TILE_SIZE))
-mario_img.fill((0, 0, 255))  # placeholder blue square
+# Load assets as one display-format atlas (see assets.py)
+def load_images():
+    return load_atlas('chatgpt', SPRITES)
 
 # Classes
-class Player(pygame.sprite.Sprite):
+# Everything drawn is a DirtySprite in the game's LayeredDirty group, which
+# redraws only sprites marked dirty and whatever they overlap.
+class Player(pygame.sprite.DirtySprite):
+    _layer = PLAYER_LAYER
+
     def __init__(self):
         super().__init__()
-        self.image = mario_img
+        self.image = load_images()['mario']
         self.rect = self.image.get_rect()
         self.rect.x = WIDTH // 2
         self.rect.y = HEIGHT - TILE_SIZE * 2
         self.vel_y = 0
         self.on_ground = False
 
-    def update(self, platforms):
-        keys = pygame.key.get_pressed()
+    def update(self, platforms, keys=None):
+        if keys is None:
+            keys = pygame.key.get_pressed()
+        old_x, old_y = self.rect.topleft
         dx = 0
         if keys[pygame.K_LEFT]:
             dx = -5
@@ -60,84 +81,199 @@ class Player(pygame.sprite.Sprite):
         if keys[pygame.K_SPACE] and self.on_ground:
             self.vel_y = -10
 
-class Platform(pygame.sprite.Sprite):
+        if self.rect.topleft != (old_x, old_y):
+            self.dirty = 1
+
+class Platform(pygame.sprite.DirtySprite):
+    _layer = PLATFORM_LAYER
+
     def __init__(self, x, y, w, h):
         super().__init__()
-        self.image = pygame.Surface((w, h))
+        self.image = display_format(pygame.Surface((w, h)))
         self.image.fill(GREEN)
         self.rect = self.image.get_rect(topleft=(x, y))
 
+class Item(pygame.sprite.DirtySprite):
+    _layer = ITEM_LAYER
+
+    def __init__(self, x, y, *groups):
+        super().__init__(*groups)
+        self.image = load_images()['item']
+        self.rect = self.image.get_rect(topleft=(x, y))
+
+class Segment(pygame.sprite.DirtySprite):
+    _layer = SNAKE_LAYER
+
+    def __init__(self, pos, *groups):
+        super().__init__(*groups)
+        self.image = load_images()['segment']
+        self.rect = self.image.get_rect(topleft=pos)
+
 class Snake:
-    def __init__(self):
+    def __init__(self, *groups):
         self.body = [(WIDTH//4, HEIGHT//2)]
         self.direction = (TILE_SIZE, 0)
+        self.head_rect = pygame.Rect(self.body[0], (TILE_SIZE, TILE_SIZE))
+        # The body is drawn as one sprite per occupied on-screen position, made
+        # visible or hidden as segments arrive and leave, so a move touches at
+        # most two sprites and the sprite count is bounded by the screen size
+        self.groups = groups
+        self.counts = Counter()
+        self.segments = {}  # Position -> Segment, kept once created
+        self.occupy(self.body[0])
+
+    def occupy(self, pos):
+        self.counts[pos] += 1
+        if self.counts[pos] == 1:
+            self._show(pos, 1)
+
+    def vacate(self, pos):
+        self.counts[pos] -= 1
+        if not self.counts[pos]:
+            del self.counts[pos]
+            self._show(pos, 0)
+
+    def _show(self, pos, visible):
+        segment = self.segments.get(pos)
+        if segment is None:
+            x, y = pos
+            if not visible or not (-TILE_SIZE < x < WIDTH and -TILE_SIZE < y < HEIGHT):
+                return
+            segment = self.segments[pos] = Segment(pos, *self.groups)
+        segment.visible = visible
 
     def move(self):
         head_x, head_y = self.body[0]
         dx, dy = self.direction
         new_head = (head_x + dx, head_y + dy)
         self.body.insert(0, new_head)
-        self.body.pop()
+        self.occupy(new_head)
+        self.vacate(self.body.pop())
+        self.head_rect.topleft = new_head
 
     def grow(self):
         tail = self.body[-1]
         self.body.append(tail)
+        self.occupy(tail)
 
-    def draw(self, surface):
-        for segment in self.body:
-            pygame.draw.rect(surface, RED, (*segment, TILE_SIZE, TILE_SIZE))
-
-# Create game objects
-player = Player()
-platforms = pygame.sprite.Group()
-# Ground platform
-platforms.add(Platform(0, HEIGHT - TILE_SIZE, WIDTH, TILE_SIZE))
-# Floating platforms
-platforms.add(Platform(200, 400, TILE_SIZE * 3, TILE_SIZE))
-platforms.add(Platform(500, 300, TILE_SIZE * 2, TILE_SIZE))
-
-snake = Snake()
-
-# Items to collect
-items = []
-for _ in range(5):
-    x = random.randrange(0, WIDTH // TILE_SIZE) * TILE_SIZE
-    y = random.randrange(0, HEIGHT // TILE_SIZE) * TILE_SIZE
-    items.append(pygame.Rect(x, y, TILE_SIZE, TILE_SIZE))
-
-# Game loop
-running = True
-while running:
-    clock.tick(FPS)
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-    # Update
-    player.update(platforms)
-    snake.move()
-
-    # Check item collection
-    head_rect = pygame.Rect(*snake.body[0], TILE_SIZE, TILE_SIZE)
-    for item in items[:]:
-        if head_rect.colliderect(item):
-            items.remove(item)
-            snake.grow()
-            # spawn new item
+class Game:
+    profiler = NULL_PROFILER  # Times the phases of step(); see profiler.py
+
+    def __init__(self):
+        self.background = display_format(pygame.Surface((WIDTH, HEIGHT)))
+        self.background.fill(WHITE)
+        self.reset()
+
+    def reset(self):
+        # Create game objects
+        self.sprites = pygame.sprite.LayeredDirty()
+        self.sprites.clear(None, self.background)
+        self._target = None  # Surface the sprites were last drawn on
+        self.player = Player()
+        self.sprites.add(self.player)
+        self.platforms = pygame.sprite.Group()
+        # Ground platform
+        self.platforms.add(Platform(0, HEIGHT - TILE_SIZE, WIDTH, TILE_SIZE))
+        # Floating platforms
+        self.platforms.add(Platform(200, 400, TILE_SIZE * 3, TILE_SIZE))
+        self.platforms.add(Platform(500, 300, TILE_SIZE * 2, TILE_SIZE))
+        self.sprites.add(*self.platforms)
+
+        self.snake = Snake(self.sprites)
+
+        # Items to collect
+        self.items = []
+        for _ in range(5):
             x = random.randrange(0, WIDTH // TILE_SIZE) * TILE_SIZE
             y = random.randrange(0, HEIGHT // TILE_SIZE) * TILE_SIZE
-            items.append(pygame.Rect(x, y, TILE_SIZE, TILE_SIZE))
+            self.items.append(Item(x, y, self.sprites))
+
+    def step(self, held=None):
+        """Advances the game by one frame without drawing; returns the number of items collected.
+
+        `held` is the collection of keys held down this frame; by default the
+        keyboard state is read from pygame.
+        """
+        keys = None if held is None else defaultdict(bool, dict.fromkeys(held, True))
+
+        # Update
+        self.player.update(self.platforms, keys)
+        self.snake.move()
+        self.profiler.lap("physics")
+
+        # Check item collection
+        collected = 0
+        head_rect = self.snake.head_rect
+        for item in self.items[:]:
+            if head_rect.colliderect(item.rect):
+                self.items.remove(item)
+                item.kill()
+                self.snake.grow()
+                collected += 1
+                # spawn new item
+                x = random.randrange(0, WIDTH // TILE_SIZE) * TILE_SIZE
+                y = random.randrange(0, HEIGHT // TILE_SIZE) * TILE_SIZE
+                self.items.append(Item(x, y, self.sprites))
+        self.profiler.lap("collision")
+        return collected
+
+    def draw(self, surface):
+        """Draws the changes since the last frame onto `surface`; returns the rects to update.
+
+        The surface must keep its contents between calls; drawing to a new
+        surface repaints it in full.
+        """
+        if surface is not self._target:
+            self.sprites.repaint_rect(surface.get_rect())
+            self._target = surface
+        return self.sprites.draw(surface)
+
+def main(recorder=None, profiler=None, screen=None, capture=None):
+    # `recorder` (see replay.py) is given each tick's input; `profiler` (see
+    # profiler.py) times each phase of the frame, with F3 toggling its overlay;
+    # `capture` (see capture.py) is given every frame drawn.
+    # Draws on `screen`, or opens the window. Returns when the window is closed
+    # or Escape pressed.
+    if screen is None:
+        screen = open_window()
+    pygame.display.set_caption(CAPTION)
+    clock = pygame.time.Clock()
+    game = Game()
+    if recorder:
+        recorder.start(game)
+    if profiler:
+        game.profiler = profiler
+    profiler = game.profiler
 
-    # Draw
-    screen.fill(WHITE)
-    for plat in platforms:
-        screen.blit(plat.image, plat.rect)
-    for item in items:
-        pygame.draw.rect(screen, (255, 165, 0), item)  # orange items
-    player_group = pygame.sprite.Group(player)
-    player_group.draw(screen)
-    snake.draw(screen)
+    # Game loop
+    running = True
+    while running:
+        clock.tick(FPS)
+        profiler.lap("wait")
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle_overlay()
+                game._target = None  # Repaint whatever the overlay covered
 
-    pygame.display.flip()
+        pressed = pygame.key.get_pressed()
+        held = [key for key in CONTROL_KEYS if pressed[key]]
+        profiler.lap("events")
+        if recorder:
+            recorder.tick(held)
+        game.step(held)
+        rects = game.draw(screen) + profiler.draw_overlay(screen)
+        profiler.lap("draw")
+        pygame.display.update(rects)
+        profiler.lap("display")
+        if capture:
+            capture.grab(screen)
+            profiler.lap("capture")
+        profiler.end_frame()
 
-pygame.quit()
+if __name__ == "__main__":
+    main()
+    pygame.quit()
@@ -1,14 +1,24 @@
+import functools
 import pygame
 import random
-import sys
 
-# Initialize pygame
-pygame.init()
+import numpy as np
+
+from assets import display_format, load_atlas
+from freecells import FreeCells
+from levels import BRICK, Level
+from profiler import NULL_PROFILER
+from textcache import get_font, render_text
+from timestep import FixedTimestep, lerp_points
+from window import open_window
 
 # Constants
 WIDTH, HEIGHT = 800, 600
 GRID_SIZE = 20
-SNAKE_SPEED = 10
+SNAKE_SPEED = 10  # Simulation ticks per second
+RENDER_FPS = 60  # Frames drawn per second; positions are interpolated between ticks
+DIRTY_RENDERING = True  # Redraw only moving entities over a cached background
+VECTORIZE_ENEMIES = 16  # From this many enemies on, they are kept in NumPy arrays (see Enemies)
 
 # Colors
 BLACK = (0, 0, 0)
@@ -20,38 +30,235 @@ BROWN = (139, 69, 19)
 SKY_BLUE = (135, 206, 235)
 YELLOW = (255, 255, 0)
 
-# Create the screen
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Super Mario Snake")
-clock = pygame.time.Clock()
+CAPTION = "Super Mario Snake"
+
+# Sprites: placeholder squares, replaced by assets/claude/<name>.png when present
+SPRITES = {
+    'mario_head': ((GRID_SIZE, GRID_SIZE), RED),
+    'snake_body': ((GRID_SIZE, GRID_SIZE), GREEN),
+    'coin': ((GRID_SIZE, GRID_SIZE), YELLOW),
+    'brick': ((GRID_SIZE, GRID_SIZE), BROWN),
+    'enemy': ((GRID_SIZE, GRID_SIZE), BLACK),
+    'mushroom': ((GRID_SIZE, GRID_SIZE), RED),
+}
 
-# Load images (using simple shapes for now, can be replaced with actual sprites)
+# Load images as one display-format atlas (see assets.py)
 def load_images():
-    images = {
-        'mario_head': pygame.Surface((GRID_SIZE, GRID_SIZE)),
-        'snake_body': pygame.Surface((GRID_SIZE, GRID_SIZE)),
-        'coin': pygame.Surface((GRID_SIZE, GRID_SIZE)),
-        'brick': pygame.Surface((GRID_SIZE, GRID_SIZE)),
-        'enemy': pygame.Surface((GRID_SIZE, GRID_SIZE)),
-        'mushroom': pygame.Surface((GRID_SIZE, GRID_SIZE))
-    }
+    return load_atlas('claude', SPRITES)
+
+# The default level: a brick floor and three platforms of (x, y, length in bricks)
+PLATFORMS = [
+    (100, HEIGHT - 6 * GRID_SIZE, 7),
+    (300, HEIGHT - 8 * GRID_SIZE, 5),
+    (500, HEIGHT - 4 * GRID_SIZE, 6)
+]
+
+@functools.lru_cache(maxsize=None)
+def build_level(extra_bricks=0):
+    # The default level as a tile grid (see levels.py). Levels never change
+    # during a game, so one is shared by every game that uses it.
+    # `extra_bricks` are laid out in rows below the playfield, which grows
+    # the level without changing gameplay (the benchmarks use them).
+    columns, rows = WIDTH // GRID_SIZE, HEIGHT // GRID_SIZE
+    tiles = np.zeros((columns, rows + -(-extra_bricks // columns)), np.uint8)
+    tiles[:, rows - 1] = BRICK
+    for x, y, length in PLATFORMS:
+        tiles[x // GRID_SIZE:x // GRID_SIZE + length, y // GRID_SIZE] = BRICK
+    extra = np.arange(extra_bricks)
+    tiles[extra % columns, rows + extra // columns] = BRICK
+    return Level(tiles, GRID_SIZE)
+
+class SolidBitmap:
+    # The level's solid mask in grid cells, flattened and padded with empty
+    # cells (PAD columns either side of the screen and a row below the level)
+    # so batched lookups need no bounds checks: enemies stay within a column
+    # of the screen and below the top of it.
+    PAD = 2
     
-    # Color the surfaces
-    images['mario_head'].fill(RED)
-    images['snake_body'].fill(GREEN)
-    images['coin'].fill(YELLOW)
-    images['brick'].fill(BROWN)
-    images['enemy'].fill(BLACK)
-    images['mushroom'].fill(RED)
+    def __init__(self, level):
+        columns = max(level.width, WIDTH // GRID_SIZE) + 2 * self.PAD
+        self.rows = level.height + 1
+        cells = np.zeros((columns, self.rows), bool)
+        cells[self.PAD:self.PAD + level.width, :level.height] = level.solid
+        self.cells = cells.reshape(-1)
     
-    return images
+    def move_enemies(self, x, y, direction):
+        # move_enemies for enemies in NumPy columns, all at once, in place
+        cells, rows, last_row = self.cells, self.rows, self.rows - 1
+        x += direction * GRID_SIZE
+        column = (x // GRID_SIZE + self.PAD) * rows
+        row = y // GRID_SIZE
+        # Gravity where there is no brick below
+        falling = ~cells[column + np.minimum(row + 1, last_row)]
+        y += falling * GRID_SIZE
+        row += falling
+        # Turn at a brick ahead, and at the screen edges (both at once cancel out)
+        turn = cells[column + direction * rows + np.minimum(row, last_row)]
+        turn ^= (x <= 0) | (x >= WIDTH - GRID_SIZE)
+        direction[turn] *= -1
 
-class MarioSnake:
+class LevelTemplate:
+    # What every game on a level starts from, built once per level (see
+    # level_template) and never changed: the cells coins and mushrooms can
+    # take, the background image, and the solid bitmap enemies move against.
+    # A reset copies the free cells only when something first needs them,
+    # and keeps the rest.
+    def __init__(self, level):
+        if level.tile_size != GRID_SIZE:
+            raise ValueError(f"claude.py levels need {GRID_SIZE}-pixel tiles, not {level.tile_size}")
+        self.level = level
+        self.solids = SolidBitmap(level)
+        self.free_cells = FreeCells(
+            (x * GRID_SIZE, y * GRID_SIZE)
+            for x in range(WIDTH // GRID_SIZE)
+            for y in range(HEIGHT // GRID_SIZE - 2)
+            if (x * GRID_SIZE, y * GRID_SIZE) not in level
+        )
+        self._background = None
+    
+    def background(self, images):
+        # Static layer (sky and bricks), rendered on first use
+        if self._background is None:
+            self._background = display_format(pygame.Surface((WIDTH, HEIGHT)))
+            self._background.fill(SKY_BLUE)
+            for brick in self.level:
+                self._background.blit(images['brick'], brick)
+        return self._background
+
+@functools.lru_cache(maxsize=8)
+def level_template(level):
+    return LevelTemplate(level)
+
+def move_head(level, head, dir_x, jumping, jump_count, on_ground, gravity=1, jump_height=10):
+    # One tick of the head's movement: jumping, gravity, horizontal wrapping
+    # and landing on bricks. Returns (new_head, jumping, jump_count, on_ground).
+    # MarioSnake.move uses it, and so does autopilot.py to look ahead.
+    head_x, head_y = head
+    
+    # Handle jumping
+    if jumping:
+        head_y -= jump_count
+        jump_count -= gravity
+        if jump_count < -jump_height:
+            jumping = False
+    else:
+        # Apply gravity if not on ground
+        if not on_ground:
+            head_y += gravity * 2
+    
+    # Move horizontally
+    new_x = head_x + dir_x
+    
+    # Wrap around screen horizontally
+    if new_x < 0:
+        new_x = WIDTH - GRID_SIZE
+    elif new_x >= WIDTH:
+        new_x = 0
+    
+    # Check collision with ground and platforms: only brick rows between the
+    # head's feet and where gravity takes them this tick can catch the snake
+    feet_y = head_y + GRID_SIZE
+    first_row = -(-feet_y // GRID_SIZE) * GRID_SIZE
+    for brick_y in range(first_row, feet_y + gravity * 2 + 1, GRID_SIZE):
+        if (new_x, brick_y) in level:
+            return (new_x, brick_y - GRID_SIZE), jumping, jump_count, True
+    return (new_x, head_y), jumping, jump_count, False
+
+def move_enemies(level, enemies):
+    # One tick of the [x, y, direction] enemies, updated in place. For many
+    # enemies, SolidBitmap.move_enemies does the same in one batched pass.
+    for enemy in enemies:
+        # Move enemy horizontally
+        enemy[0] += enemy[2] * GRID_SIZE
+        
+        # Apply gravity if enemy is not on ground
+        if (enemy[0], enemy[1] + GRID_SIZE) not in level:
+            enemy[1] += GRID_SIZE
+        
+        # Check for collisions with bricks on sides and change direction
+        if (enemy[0] + enemy[2] * GRID_SIZE, enemy[1]) in level:
+            enemy[2] *= -1
+        
+        # Check if enemy is at screen edge
+        if enemy[0] <= 0 or enemy[0] >= WIDTH - GRID_SIZE:
+            enemy[2] *= -1
+
+class Enemies:
+    # The enemies (goombas) of a game, in spawn order. A few are kept as
+    # [x, y, direction] lists and moved by move_enemies, which beats NumPy's
+    # per-call overhead; from VECTORIZE_ENEMIES on they switch to NumPy
+    # arrays of x, y and direction (+1 right, -1 left), moved all at once
+    # against the level's SolidBitmap, with head contact found by one
+    # comparison over the arrays. Iterating gives (x, y, direction) tuples.
     def __init__(self):
+        self.rows = []  # [x, y, direction] lists while there are few
+        self.columns = None  # (x, y, direction) arrays once there are many
+    
+    def __len__(self):
+        return len(self.rows) if self.columns is None else len(self.columns[0])
+    
+    def __iter__(self):
+        if self.columns is None:
+            return (tuple(enemy) for enemy in self.rows)
+        return zip(*(column.tolist() for column in self.columns))
+    
+    def tolist(self):
+        return [list(enemy) for enemy in self]
+    
+    def positions(self):
+        return [(x, y) for x, y, _ in self]
+    
+    def add(self, x, y, direction=1):
+        self.extend([x], [y], [direction])
+    
+    def extend(self, xs, ys, directions):
+        if self.columns is None and len(self.rows) + len(xs) < VECTORIZE_ENEMIES:
+            self.rows.extend([x, y, d] for x, y, d in zip(xs, ys, directions))
+            return
+        if self.columns is None:
+            self.columns = tuple(np.array(column, np.intp) for column in zip(*self.rows)) if self.rows else (
+                np.zeros(0, np.intp),) * 3
+            self.rows = None
+        self.columns = tuple(np.append(column, values).astype(np.intp)
+                             for column, values in zip(self.columns, (xs, ys, directions)))
+    
+    def touching(self, point):
+        # Indices of the enemies at `point`
+        x, y = point
+        if self.columns is None:
+            return [i for i, enemy in enumerate(self.rows) if enemy[0] == x and enemy[1] == y]
+        xs, ys, _ = self.columns
+        return np.flatnonzero((xs == x) & (ys == y)).tolist()
+    
+    def remove(self, indices):
+        if self.columns is None:
+            for i in sorted(indices, reverse=True):
+                del self.rows[i]
+        else:
+            self.columns = tuple(np.delete(column, indices) for column in self.columns)
+    
+    def move(self, level):
+        if self.columns is None:
+            move_enemies(level, self.rows)
+        else:
+            level_template(level).solids.move_enemies(*self.columns)
+
+class MarioSnake:
+    profiler = NULL_PROFILER  # Times the phases of step(); see profiler.py
+
+    def __init__(self, level=None):
+        # `level` is a levels.Level (for instance levels.load()ed from a file)
+        # whose top-left screen is the playfield; by default, build_level()
+        self.level = build_level() if level is None else level
+        self._drawn_rects = None
         self.reset()
         self.images = load_images()
     
     def reset(self):
+        # Start a new game on the same level. Only the snake and the random
+        # coins, enemies and mushrooms are set up again; the level's free
+        # cells and background come from its shared LevelTemplate.
+        
         # Snake properties
         self.length = 3
         self.positions = [(WIDTH // 2, HEIGHT - 2 * GRID_SIZE)]
@@ -65,103 +272,92 @@ class MarioSnake:
         self.on_ground = True
         self.jump_height = 10
         
-        # Game elements
-        self.coins = []
-        self.bricks = []
-        self.enemies = []
-        self.mushrooms = []
+        # Game elements (coins and mushrooms are sets of (x, y) cells and bricks
+        # the solid tiles of self.level, so every occupancy query is a
+        # constant-time lookup)
+        self.coins = set()
+        self.enemies = Enemies()
+        self.mushrooms = set()
         
         # Generate initial level
         self.generate_level()
+        self._free_cells = None
+        self._previous = None  # Positions before the last tick, see remember()
+    
+    @property
+    def free_cells(self):
+        # Cells where coins and mushrooms can respawn (those not covered by a brick or coin).
+        # Copied from the level's template on first use, since most lives end before anything respawns.
+        if self._free_cells is None:
+            self._free_cells = level_template(self.level).free_cells.copy()
+            for cell in self.coins:
+                self._free_cells.occupy(cell)
+        return self._free_cells
     
     def generate_level(self):
-        # Create floor
-        for x in range(0, WIDTH, GRID_SIZE):
-            self.bricks.append((x, HEIGHT - GRID_SIZE))
-        
-        # Create some platforms
-        platforms = [
-            (100, HEIGHT - 6 * GRID_SIZE, 7),
-            (300, HEIGHT - 8 * GRID_SIZE, 5),
-            (500, HEIGHT - 4 * GRID_SIZE, 6)
-        ]
-        
-        for platform in platforms:
-            x, y, length = platform
-            for i in range(length):
-                self.bricks.append((x + i * GRID_SIZE, y))
-        
+        # Place coins, enemies and mushrooms (the level's bricks never change)
         # Add some random coins
         for _ in range(10):
             x = random.randint(0, (WIDTH // GRID_SIZE) - 1) * GRID_SIZE
             y = random.randint(0, (HEIGHT // GRID_SIZE) - 3) * GRID_SIZE
-            if (x, y) not in self.bricks and (x, y) not in self.coins:
-                self.coins.append((x, y))
+            if (x, y) not in self.level:
+                self.coins.add((x, y))
         
         # Add some enemies
         for _ in range(3):
             x = random.randint(0, (WIDTH // GRID_SIZE) - 1) * GRID_SIZE
             y = HEIGHT - 2 * GRID_SIZE
-            if (x, y) not in self.positions and (x, y) not in self.enemies:
-                self.enemies.append([x, y, 1])  # x, y, direction
+            if (x, y) != self.positions[0]:
+                self.enemies.add(x, y)
         
         # Add some mushrooms (power-ups)
         for _ in range(2):
             x = random.randint(0, (WIDTH // GRID_SIZE) - 1) * GRID_SIZE
             y = random.randint(0, (HEIGHT // GRID_SIZE) - 3) * GRID_SIZE
-            if (x, y) not in self.bricks and (x, y) not in self.coins and (x, y) not in self.mushrooms:
-                self.mushrooms.append((x, y))
+            if (x, y) not in self.level and (x, y) not in self.coins:
+                self.mushrooms.add((x, y))
     
     def handle_keys(self):
+        # Poll the event queue; returns the keys pressed since the last call,
+        # or None if the window was closed or Escape pressed
+        keys = []
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                return None
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP and self.on_ground:
-                    self.jumping = True
-                    self.on_ground = False
-                    self.jump_count = self.jump_height
-                elif event.key == pygame.K_LEFT:
-                    self.direction = (-GRID_SIZE, 0)
-                elif event.key == pygame.K_RIGHT:
-                    self.direction = (GRID_SIZE, 0)
+                if event.key == pygame.K_ESCAPE:
+                    return None
+                keys.append(event.key)
+        return keys
+    
+    def press(self, key):
+        # Apply a single key press (shared by the event loop and scripted input)
+        if key == pygame.K_UP and self.on_ground:
+            self.jumping = True
+            self.on_ground = False
+            self.jump_count = self.jump_height
+        elif key == pygame.K_LEFT:
+            self.direction = (-GRID_SIZE, 0)
+        elif key == pygame.K_RIGHT:
+            self.direction = (GRID_SIZE, 0)
+    
+    def step(self, keys=()):
+        # Advance the simulation by one tick without drawing or waiting on the clock.
+        # Returns True if the snake died (and the game was reset) during this tick.
+        for key in keys:
+            self.press(key)
+        self.move()
+        self.profiler.lap("physics")
+        died = self.check_collisions()
+        self.profiler.lap("collision")
+        self.update_enemies()
+        self.profiler.lap("enemies")
+        return died
     
     def move(self):
-        head_x, head_y = self.positions[0]
-        dir_x, dir_y = self.direction
-        
-        # Handle jumping
-        if self.jumping:
-            head_y -= self.jump_count
-            self.jump_count -= self.gravity
-            if self.jump_count < -self.jump_height:
-                self.jumping = False
-        else:
-            # Apply gravity if not on ground
-            if not self.on_ground:
-                head_y += self.gravity * 2
-        
-        # Move horizontally
-        new_x = head_x + dir_x
-        
-        # Wrap around screen horizontally
-        if new_x < 0:
-            new_x = WIDTH - GRID_SIZE
-        elif new_x >= WIDTH:
-            new_x = 0
-        
-        new_position = (new_x, head_y)
-        
-        # Check collision with ground and platforms
-        self.on_ground = False
-        for brick in self.bricks:
-            brick_x, brick_y = brick
-            # Check if snake head is directly above a brick and not jumping up
-            if new_x == brick_x and head_y + GRID_SIZE <= brick_y and head_y + GRID_SIZE + self.gravity * 2 >= brick_y:
-                new_position = (new_x, brick_y - GRID_SIZE)
-                self.on_ground = True
-                break
+        new_position, self.jumping, self.jump_count, self.on_ground = move_head(
+            self.level, self.positions[0], self.direction[0], self.jumping, self.jump_count, self.on_ground,
+            self.gravity, self.jump_height)
         
         # Update positions list with new head position
         self.positions.insert(0, new_position)
@@ -174,50 +370,45 @@ class MarioSnake:
         head = self.positions[0]
         
         # Check for collision with coins
-        for coin in self.coins[:]:
-            if head == coin:
-                self.coins.remove(coin)
-                self.score += 10
-                self.length += 1
-                
-                # Add new coin
-                while True:
-                    x = random.randint(0, (WIDTH // GRID_SIZE) - 1) * GRID_SIZE
-                    y = random.randint(0, (HEIGHT // GRID_SIZE) - 3) * GRID_SIZE
-                    if (x, y) not in self.bricks and (x, y) not in self.coins:
-                        self.coins.append((x, y))
-                        break
+        if head in self.coins:
+            self.coins.remove(head)
+            self.free_cells.release(head)
+            self.score += 10
+            self.length += 1
+            
+            # Add new coin (none if every cell is taken)
+            cell = self.free_cells.sample()
+            if cell is not None:
+                self.coins.add(cell)
+                self.free_cells.occupy(cell)
         
         # Check for collision with mushrooms
-        for mushroom in self.mushrooms[:]:
-            if head == mushroom:
-                self.mushrooms.remove(mushroom)
-                self.score += 50
-                self.length += 3
-                
-                # Add new mushroom
-                while True:
-                    x = random.randint(0, (WIDTH // GRID_SIZE) - 1) * GRID_SIZE
-                    y = random.randint(0, (HEIGHT // GRID_SIZE) - 3) * GRID_SIZE
-                    if (x, y) not in self.bricks and (x, y) not in self.coins and (x, y) not in self.mushrooms:
-                        self.mushrooms.append((x, y))
-                        break
+        if head in self.mushrooms:
+            self.mushrooms.remove(head)
+            self.score += 50
+            self.length += 3
+            
+            # Add new mushroom (none if every cell is taken)
+            cell = self.free_cells.sample(exclude=self.mushrooms)
+            if cell is not None:
+                self.mushrooms.add(cell)
         
         # Check for collision with enemies
-        for enemy in self.enemies[:]:
-            if head == (enemy[0], enemy[1]):
-                # Check if falling onto enemy (mario-like stomp)
-                if self.direction[1] > 0 and not self.on_ground:
-                    self.enemies.remove(enemy)
+        touching = self.enemies.touching(head)
+        if touching:
+            # Check if falling onto enemy (mario-like stomp)
+            if self.direction[1] > 0 and not self.on_ground:
+                self.enemies.remove(touching)
+                for _ in touching:
                     self.score += 30
                     # Add new enemy
                     x = random.randint(0, (WIDTH // GRID_SIZE) - 1) * GRID_SIZE
                     y = HEIGHT - 2 * GRID_SIZE
-                    self.enemies.append([x, y, 1])
-                else:
-                    # Game over
-                    self.reset()
-                    return True
+                    self.enemies.add(x, y)
+            else:
+                # Game over
+                self.reset()
+                return True
         
         # Check for collision with own body (excluding head)
         if head in self.positions[1:]:
@@ -225,84 +416,134 @@ class MarioSnake:
             return True
         
         # Check for collision with bricks
-        for brick in self.bricks:
-            if head == brick:
-                self.reset()
-                return True
+        if head in self.level:
+            self.reset()
+            return True
         
         return False
     
     def update_enemies(self):
-        for enemy in self.enemies:
-            # Move enemy horizontally
-            enemy[0] += enemy[2] * GRID_SIZE
-            
-            # Check if enemy is on ground
-            on_ground = False
-            for brick in self.bricks:
-                if (enemy[0], enemy[1] + GRID_SIZE) == brick:
-                    on_ground = True
-                    break
-            
-            # Apply gravity if needed
-            if not on_ground:
-                enemy[1] += GRID_SIZE
-            
-            # Check for collisions with bricks on sides and change direction
-            for brick in self.bricks:
-                if (enemy[0] + enemy[2] * GRID_SIZE, enemy[1]) == brick:
-                    enemy[2] *= -1
-                    break
-            
-            # Check if enemy is at screen edge
-            if enemy[0] <= 0 or enemy[0] >= WIDTH - GRID_SIZE:
-                enemy[2] *= -1
+        self.enemies.move(self.level)
     
-    def draw(self, screen):
-        # Draw background
-        screen.fill(SKY_BLUE)
-        
-        # Draw bricks
-        for brick in self.bricks:
-            screen.blit(self.images['brick'], brick)
+    @property
+    def background(self):
+        # Static layer (sky and bricks), shared by every game on the level
+        return level_template(self.level).background(self.images)
+    
+    def remember(self):
+        # Keep the positions of moving things before a tick, so frames drawn
+        # until the next one can interpolate from them
+        self._previous = (list(self.positions), self.enemies.positions())
+    
+    def draw(self, screen, alpha=1.0):
+        # Draw background (sky and bricks)
+        screen.blit(self.background, (0, 0))
+        self.draw_entities(screen, alpha)
+    
+    def draw_dirty(self, screen, alpha=1.0):
+        # Erase last frame's entities from the cached background and draw this
+        # frame's; returns the rectangles to pass to pygame.display.update
+        if self._drawn_rects is None:
+            screen.blit(self.background, (0, 0))
+            dirty = [screen.get_rect()]
+        else:
+            for rect in self._drawn_rects:
+                screen.blit(self.background, rect, rect)
+            dirty = self._drawn_rects
+        self._drawn_rects = self.draw_entities(screen, alpha)
+        return dirty + self._drawn_rects
+    
+    def draw_entities(self, screen, alpha=1.0):
+        # Draw everything that moves or changes, `alpha` of the way from the
+        # remembered positions to the current ones; returns the rectangles drawn
+        rects = []
+        positions = self.positions
+        enemies = self.enemies.positions()
+        if self._previous is not None and alpha < 1.0:
+            positions = lerp_points(self._previous[0], positions, alpha, GRID_SIZE)
+            enemies = lerp_points(self._previous[1], enemies, alpha, GRID_SIZE)
         
         # Draw coins
         for coin in self.coins:
-            screen.blit(self.images['coin'], coin)
+            rects.append(screen.blit(self.images['coin'], coin))
         
         # Draw enemies
-        for enemy in self.enemies:
-            screen.blit(self.images['enemy'], (enemy[0], enemy[1]))
+        for enemy in enemies:
+            rects.append(screen.blit(self.images['enemy'], enemy))
         
         # Draw mushrooms
         for mushroom in self.mushrooms:
-            screen.blit(self.images['mushroom'], mushroom)
+            rects.append(screen.blit(self.images['mushroom'], mushroom))
         
         # Draw snake body
-        for position in self.positions[1:]:
-            screen.blit(self.images['snake_body'], position)
+        for position in positions[1:]:
+            rects.append(screen.blit(self.images['snake_body'], position))
         
         # Draw snake head (mario)
-        screen.blit(self.images['mario_head'], self.positions[0])
+        rects.append(screen.blit(self.images['mario_head'], positions[0]))
         
         # Draw score
-        font = pygame.font.SysFont('Arial', 20)
-        score_text = font.render(f'Score: {self.score}', True, WHITE)
-        screen.blit(score_text, (10, 10))
+        font = get_font('Arial', 20, system=True)
+        score_text = render_text(f'Score: {self.score}', font, WHITE)
+        rects.append(screen.blit(score_text, (10, 10)))
+        return rects
 
-def main():
-    game = MarioSnake()
+def main(recorder=None, profiler=None, screen=None, level=None, capture=None):
+    # `recorder` (see replay.py) is given each tick's input; `profiler` (see
+    # profiler.py) times each phase of the frame, with F3 toggling its overlay;
+    # `capture` (see capture.py) is given every frame drawn.
+    # Draws on `screen`, or opens the window. `level` replaces the default
+    # level (see MarioSnake). Returns when the window is closed or Escape pressed.
+    if screen is None:
+        screen = open_window()
+    pygame.display.set_caption(CAPTION)
+    clock = pygame.time.Clock()
+    game = MarioSnake(level)
+    if recorder:
+        recorder.start(game)
+    if profiler:
+        game.profiler = profiler
+    profiler = game.profiler
+    timestep = FixedTimestep(SNAKE_SPEED)
+    pending = []  # Keys read since the last tick
     
-    # Game loop
+    # Game loop: input is read and a frame drawn RENDER_FPS times a second,
+    # the simulation advances SNAKE_SPEED times a second
     while True:
-        game.handle_keys()
-        game.move()
-        game.check_collisions()
-        game.update_enemies()
-        game.draw(screen)
-        
-        pygame.display.update()
-        clock.tick(SNAKE_SPEED)
+        keys = game.handle_keys()
+        if keys is None:
+            return
+        if pygame.K_F3 in keys:
+            profiler.toggle_overlay()
+            game._drawn_rects = None  # Repaint whatever the overlay covered
+        pending += keys
+        profiler.lap("events")
+        for _ in range(timestep.ticks()):
+            if recorder:
+                recorder.tick(pending)
+            game.remember()
+            game.step(pending)
+            pending = []
+        if DIRTY_RENDERING:
+            rects = game.draw_dirty(screen, timestep.alpha)
+        else:
+            game.draw(screen, timestep.alpha)
+            rects = [screen.get_rect()]
+        rects += profiler.draw_overlay(screen)
+        profiler.lap("draw")
+        pygame.display.update(rects)
+        profiler.lap("display")
+        if capture:
+            capture.grab(screen)
+            profiler.lap("capture")
+        clock.tick(RENDER_FPS)
+        profiler.lap("wait")
+        profiler.end_frame()
 
 if __name__ == "__main__":
-    main()
+    import sys
+
+    from levels import load
+
+    main(level=load(sys.argv[1]) if len(sys.argv) > 1 else None)
+    pygame.quit()
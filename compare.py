@@ -0,0 +1,216 @@
+"""Cross-game benchmark suite for chatgpt.py, claude.py, deepseek.py and gemini.py.
+
+Each game runs headless through its envs.py environment under seeded random
+input for a fixed number of ticks, once per entity scale, each case in a fresh
+process so peak RSS is its own. A tick is one step plus one draw; when a game
+ends it is reset and rescaled, and the reset is timed as part of the tick.
+
+Entity scale adds n entities of the kind each game has the most of:
+    chatgpt   n extra snake segments
+    claude    n extra bricks (below the playfield, so gameplay is unchanged)
+    deepseek  a tail of n segments (it fills in as the player moves)
+    gemini    n extra snake segments (they unfold from the tail)
+
+Reported per case: ticks/sec, p50/p99 frame time, peak RSS, and the peak
+memory allocated within a tick (tracemalloc, measured in a separate pass).
+
+Usage:
+    python compare.py [--games G ...] [--scales N ...] [--ticks N] [--json FILE]
+    python compare.py --baseline FILE [--tolerance F]   # exit 1 on a slowdown
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import sys
+import time
+
+GAMES = ("chatgpt", "claude", "deepseek", "gemini")
+WARMUP_TICKS = 100
+ALLOC_TICKS = 500
+
+
+def _scale_chatgpt(game, n):
+    for _ in range(n):
+        game.snake.grow()
+
+
+def _scale_claude(game, n):
+    import claude
+
+    game.level = claude.build_level(n)
+
+
+def _scale_deepseek(game, n):
+    game.player.tail_length = n
+
+
+def _scale_gemini(game, n):
+    game.snake_body.grow(n)
+
+
+SCALERS = {
+    "chatgpt": _scale_chatgpt,
+    "claude": _scale_claude,
+    "deepseek": _scale_deepseek,
+    "gemini": _scale_gemini,
+}
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run_case(name, scale, ticks, seed=0):
+    """Benchmarks one game at one scale in this process; returns a result dict."""
+    import resource
+    import tracemalloc
+
+    import headless  # noqa: F401  (selects the dummy SDL drivers before the game is imported)
+
+    import envs
+    from window import open_window
+
+    env = envs.make(name)
+    surface = open_window()
+    scaler = SCALERS[name]
+    rng = random.Random(seed)
+    resets = 0
+
+    def reset():
+        env.reset(seed + resets)
+        scaler(env.game, scale)
+
+    def tick():
+        nonlocal resets
+        _, _, done = env.step(rng.randrange(len(env.ACTIONS)))
+        env.draw(surface)
+        if done:
+            resets += 1
+            reset()
+
+    reset()
+    for _ in range(WARMUP_TICKS):
+        tick()
+
+    perf_counter = time.perf_counter
+    frames = []
+    start = perf_counter()
+    for _ in range(ticks):
+        frame_start = perf_counter()
+        tick()
+        frames.append(perf_counter() - frame_start)
+    elapsed = perf_counter() - start
+    timed_resets = resets
+    peak_rss_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Before tracemalloc's own overhead
+
+    tracemalloc.start()
+    allocated = 0
+    for _ in range(ALLOC_TICKS):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        tick()
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+
+    frames.sort()
+    return {
+        "game": name,
+        "scale": scale,
+        "ticks": ticks,
+        "resets": timed_resets,
+        "ticks_per_sec": ticks / elapsed,
+        "p50_us": percentile(frames, 0.50) * 1e6,
+        "p99_us": percentile(frames, 0.99) * 1e6,
+        "peak_rss_mib": peak_rss_mib,
+        "alloc_bytes_per_tick": allocated / ALLOC_TICKS,
+    }
+
+
+def _case_process(conn, name, scale, ticks, seed):
+    conn.send(run_case(name, scale, ticks, seed))
+    conn.close()
+
+
+def run_suite(games=GAMES, scales=(0, 100, 1000), ticks=5000, seed=0):
+    """Runs every (game, scale) case in its own process; returns the report dict."""
+    import pygame
+
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for name in games:
+        for scale in scales:
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_case_process, args=(sender, name, scale, ticks, seed))
+            process.start()
+            sender.close()
+            try:
+                results.append(receiver.recv())
+            except EOFError:
+                raise RuntimeError(f"benchmark process for {name} at scale {scale} failed") from None
+            finally:
+                process.join()
+    return {
+        "ticks": ticks,
+        "seed": seed,
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def format_table(report):
+    lines = [f"{'game':<9} {'scale':>6} {'ticks/sec':>10} {'p50 us':>9} {'p99 us':>9} "
+             f"{'peak RSS MiB':>12} {'alloc B/tick':>12} {'resets':>6}"]
+    for r in report["results"]:
+        lines.append(f"{r['game']:<9} {r['scale']:>6} {r['ticks_per_sec']:>10,.0f} {r['p50_us']:>9.1f} "
+                     f"{r['p99_us']:>9.1f} {r['peak_rss_mib']:>12.1f} {r['alloc_bytes_per_tick']:>12,.0f} "
+                     f"{r['resets']:>6}")
+    return "\n".join(lines)
+
+
+def find_regressions(report, baseline, tolerance=0.2):
+    """Returns a message for each case whose ticks/sec fell more than `tolerance` below the baseline."""
+    expected = {(r["game"], r["scale"]): r["ticks_per_sec"] for r in baseline["results"]}
+    regressions = []
+    for r in report["results"]:
+        base = expected.get((r["game"], r["scale"]))
+        if base is not None and r["ticks_per_sec"] < base * (1 - tolerance):
+            regressions.append(f"{r['game']} at scale {r['scale']}: {r['ticks_per_sec']:,.0f} ticks/sec, "
+                               f"baseline {base:,.0f} ({r['ticks_per_sec'] / base - 1:+.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", nargs="+", choices=GAMES, default=list(GAMES))
+    parser.add_argument("--scales", type=int, nargs="+", default=[0, 100, 1000])
+    parser.add_argument("--ticks", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="compare against a report written earlier with --json")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed ticks/sec drop against the baseline (default 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.games, args.scales, args.ticks, args.seed)
+    print(format_table(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION: {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
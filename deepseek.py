@@ -1,15 +1,25 @@
 import pygame
 import random
 
-# Initialize Pygame
-pygame.init()
+import numpy as np
+
+from entitystore import EntityStore, EntityView, field
+from profiler import NULL_PROFILER
+from timestep import FixedTimestep
+from window import open_window
 
 # Game constants
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 TILE_SIZE = 32
 GRAVITY = 0.5
-FPS = 30
+FPS = 30  # Simulation ticks per second
+RENDER_FPS = 60  # Frames drawn per second; positions are interpolated between ticks
+HASH_CELL_SIZE = TILE_SIZE * 2  # Spatial hash cell size
+CHUNK_WIDTH = SCREEN_WIDTH  # The world is streamed in chunks this wide
+CHUNKS_BEHIND = 1  # Chunks kept loaded behind the camera (or the player, if further back)
+CHUNKS_AHEAD = 1  # Chunks generated ahead of the right edge of the view
+TAIL_SKIP = 10  # The newest tail segments never count as a self-collision
 
 # Colors
 BLACK = (0, 0, 0)
@@ -19,11 +29,126 @@ GREEN = (0, 255, 0)
 BLUE = (0, 0, 255)
 YELLOW = (255, 255, 0)
 
-# Initialize screen
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Mario Snake")
+CAPTION = "Mario Snake"
+
+def overlaps(ax, ay, aw, ah, bx, by, bw, bh):
+    """Rect.colliderect on integer boxes, without allocating Rects."""
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+def overlapping(store, x, y, w, h, width=TILE_SIZE, height=TILE_SIZE):
+    """overlaps() between one box and every width x height box of an entity store, as a boolean array."""
+    return (store.x < x + w) & (x < store.x + width) & (store.y < y + h) & (y < store.y + height)
+
+class SpatialHash:
+    """Uniform grid mapping each cell to the items whose box overlaps it.
+
+    Boxes are truncated to integers the way pygame.Rect does. query() returns
+    candidates in insertion order so collision handling stays deterministic.
+    """
+
+    def __init__(self, cell_size=HASH_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.order = {}
+        self.inserted = 0
+
+    def _span(self, x, y, w, h):
+        size = self.cell_size
+        x, y = int(x), int(y)
+        return x // size, y // size, (x + w - 1) // size, (y + h - 1) // size
+
+    def _keys(self, span):
+        x0, y0, x1, y1 = span
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield cx, cy
+
+    def insert(self, item, x, y, w, h):
+        self.order[item] = self.inserted
+        self.inserted += 1
+        for key in self._keys(self._span(x, y, w, h)):
+            bucket = self.cells.get(key)
+            if bucket is None:
+                self.cells[key] = {item}
+            else:
+                bucket.add(item)
+
+    def remove(self, item, x, y, w, h):
+        self._unlink(item, self._span(x, y, w, h))
+        del self.order[item]
+
+    def _unlink(self, item, span):
+        for key in self._keys(span):
+            bucket = self.cells[key]
+            bucket.discard(item)
+            if not bucket:
+                del self.cells[key]
+
+    def query(self, x, y, w, h):
+        """Returns the items stored in the cells a box overlaps (a superset of those it touches)."""
+        found = None
+        for key in self._keys(self._span(x, y, w, h)):
+            bucket = self.cells.get(key)
+            if bucket:
+                found = set(bucket) if found is None else found | bucket
+        if not found:
+            return ()
+        if len(found) == 1:
+            return found
+        return sorted(found, key=self.order.__getitem__)
+
+class TailBuffer:
+    """Ring buffer of tail positions, oldest first.
+
+    Every position gets a sequence number and lives at index seq % capacity.
+    The capacity only changes (doubling) when the tail outgrows it.
+    """
+
+    def __init__(self, capacity=64):
+        self.positions = [None] * capacity
+        self.first = 0  # Sequence number of the oldest position
+        self.next = 0  # Sequence number of the next position appended
+
+    def __len__(self):
+        return self.next - self.first
+
+    def __iter__(self):
+        positions = self.positions
+        capacity = len(positions)
+        for seq in range(self.first, self.next):
+            yield positions[seq % capacity]
+
+    def at(self, seq):
+        return self.positions[seq % len(self.positions)]
+
+    def append(self, position):
+        """Adds the newest position and returns its sequence number."""
+        if self.next - self.first == len(self.positions):
+            self._grow()
+        seq = self.next
+        self.positions[seq % len(self.positions)] = position
+        self.next += 1
+        return seq
+
+    def pop(self):
+        """Removes the oldest position; returns (seq, position)."""
+        seq = self.first
+        index = seq % len(self.positions)
+        position = self.positions[index]
+        self.positions[index] = None
+        self.first += 1
+        return seq, position
+
+    def _grow(self):
+        old = self.positions
+        self.positions = [None] * (2 * len(old))
+        for seq in range(self.first, self.next):
+            self.positions[seq % len(self.positions)] = old[seq % len(old)]
 
 class Player:
+    __slots__ = ("x", "y", "width", "height", "velocity_y", "on_ground", "direction", "speed", "jump_power",
+                 "tail_positions", "tail_hash", "tail_length")
+
     def __init__(self):
         self.reset()
         
@@ -37,7 +162,8 @@ class Player:
         self.direction = 1
         self.speed = 5
         self.jump_power = -12
-        self.tail_positions = []
+        self.tail_positions = TailBuffer()
+        self.tail_hash = SpatialHash()  # Tail sequence numbers by position
         self.tail_length = 0
 
     def jump(self):
@@ -46,6 +172,9 @@ class Player:
             self.on_ground = False
 
     def update(self, platforms):
+        # `platforms` is a PlatformStore or LevelSolids; boxes() gives the
+        # (x, y, w, h) of the platforms near a box, in a fixed order
+
         # Horizontal movement
         self.x += self.direction * self.speed
 
@@ -55,132 +184,448 @@ class Player:
 
         # Platform collisions
         self.on_ground = False
-        player_rect = pygame.Rect(self.x, self.y, self.width, self.height)
-        for platform in platforms:
-            if player_rect.colliderect(platform.rect):
+        px, py = int(self.x), int(self.y)
+        for x, y, w, h in platforms.boxes(px, py, self.width, self.height):
+            if overlaps(px, py, self.width, self.height, x, y, w, h):
                 if self.velocity_y > 0:
-                    self.y = platform.rect.top - self.height
+                    self.y = y - self.height
                     self.velocity_y = 0
                     self.on_ground = True
                 elif self.velocity_y < 0:
-                    self.y = platform.rect.bottom
+                    self.y = y + h
                     self.velocity_y = 0
 
         # Update tail
-        self.tail_positions.append((self.x, self.y))
+        seq = self.tail_positions.append((self.x, self.y))
+        self.tail_hash.insert(seq, self.x, self.y, self.width, self.height)
         if len(self.tail_positions) > self.tail_length:
-            self.tail_positions.pop(0)
+            seq, (x, y) = self.tail_positions.pop()
+            self.tail_hash.remove(seq, x, y, self.width, self.height)
 
-class Platform:
-    def __init__(self, x, y, width, height):
-        self.rect = pygame.Rect(x, y, width, height)
+    def hits_tail(self):
+        """Returns True if the player overlaps a tail segment older than the newest TAIL_SKIP."""
+        px, py = int(self.x), int(self.y)
+        newest = self.tail_positions.next - TAIL_SKIP
+        for seq in self.tail_hash.query(px, py, self.width, self.height):
+            if seq < newest:
+                x, y = self.tail_positions.at(seq)
+                if overlaps(px, py, self.width, self.height, int(x), int(y), self.width, self.height):
+                    return True
+        return False
 
-class Collectible:
-    def __init__(self, x, y):
-        self.rect = pygame.Rect(x, y, TILE_SIZE, TILE_SIZE)
-        self.active = True
+# Platforms, enemies and collectibles live in entity stores (see entitystore.py),
+# one column per field; the classes below are views of one entity for scripting
+PLATFORM_COLUMNS = {"x": np.int32, "y": np.int32, "width": np.int32, "height": np.int32}
+ENEMY_COLUMNS = {"x": np.int32, "y": np.int32, "direction": np.int8, "speed": np.int16,
+                 "left": np.int32, "right": np.int32}  # Patrol bounds
+COLLECTIBLE_COLUMNS = {"x": np.int32, "y": np.int32}
+ENEMY_SPEED = 3
 
-class Enemy:
-    def __init__(self, x, y):
-        self.rect = pygame.Rect(x, y, TILE_SIZE, TILE_SIZE)
-        self.direction = 1
-        self.speed = 3
-
-    def update(self):
-        self.rect.x += self.direction * self.speed
-        if self.rect.x <= 0 or self.rect.x >= SCREEN_WIDTH - TILE_SIZE:
-            self.direction *= -1
-
-# Game initialization
-player = Player()
-platforms = [
-    Platform(0, SCREEN_HEIGHT - TILE_SIZE, SCREEN_WIDTH * 10, TILE_SIZE),
-    Platform(300, SCREEN_HEIGHT - TILE_SIZE*3, 200, TILE_SIZE),
-    Platform(600, SCREEN_HEIGHT - TILE_SIZE*5, 200, TILE_SIZE),
-]
-collectibles = [Collectible(400, SCREEN_HEIGHT - TILE_SIZE*4)]
-enemies = [Enemy(200, SCREEN_HEIGHT - TILE_SIZE*2)]
-
-camera_offset = 0
-clock = pygame.time.Clock()
-running = True
-
-# Main game loop
-while running:
-    screen.fill(BLACK)
-    
-    # Event handling
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_UP:
-                player.jump()
-            elif event.key == pygame.K_LEFT:
-                player.direction = -1
-            elif event.key == pygame.K_RIGHT:
-                player.direction = 1
-
-    # Update game state
-    player.update(platforms)
-    
-    # Update enemies
-    for enemy in enemies:
-        enemy.update()
-
-    # Collectible collision
-    for collectible in collectibles[:]:
-        if collectible.active and pygame.Rect(player.x, player.y, 
-           player.width, player.height).colliderect(collectible.rect):
-            player.tail_length += 5
-            collectible.active = False
-            collectibles.remove(collectible)
-            collectibles.append(Collectible(
-                random.randint(camera_offset + SCREEN_WIDTH, camera_offset + SCREEN_WIDTH * 2),
-                random.randint(TILE_SIZE, SCREEN_HEIGHT - TILE_SIZE*2)
-            ))
-
-    # Collision checks
-    for enemy in enemies:
-        if pygame.Rect(player.x, player.y, player.width, player.height).colliderect(enemy.rect):
-            running = False
-
-    for pos in player.tail_positions[:-10]:
-        if pygame.Rect(pos[0], pos[1], player.width, player.height).colliderect(
-            player.x, player.y, player.width, player.height):
-            running = False
-
-    # Camera scrolling
-    if player.x - camera_offset > SCREEN_WIDTH * 0.6:
-        camera_offset = player.x - SCREEN_WIDTH * 0.6
-
-    # Drawing
-    for platform in platforms:
-        pygame.draw.rect(screen, GREEN, 
-                        (platform.rect.x - camera_offset, platform.rect.y, 
-                         platform.rect.width, platform.rect.height))
-
-    for collectible in collectibles:
-        if collectible.active:
-            pygame.draw.rect(screen, YELLOW, 
-                           (collectible.rect.x - camera_offset, collectible.rect.y, 
-                            TILE_SIZE, TILE_SIZE))
-
-    for enemy in enemies:
-        pygame.draw.rect(screen, RED, 
-                        (enemy.rect.x - camera_offset, enemy.rect.y, 
-                         TILE_SIZE, TILE_SIZE))
-
-    pygame.draw.rect(screen, BLUE, 
-                    (player.x - camera_offset, player.y, 
-                     player.width, player.height))
-
-    for pos in player.tail_positions:
-        pygame.draw.rect(screen, WHITE, 
-                        (pos[0] - camera_offset, pos[1], 
+class PlatformStore(EntityStore):
+    """Platforms as columns, with a spatial hash of their ids for the player's collision queries."""
+
+    def __init__(self):
+        super().__init__(PLATFORM_COLUMNS)
+        self.hash = SpatialHash()
+        self._boxes = {}  # Id -> (x, y, w, h); platforms never move
+
+    def add_boxes(self, boxes):
+        """Adds a platform per (x, y, w, h); returns their ids."""
+        ids = self.extend(**dict(zip(PLATFORM_COLUMNS, zip(*boxes)))) if boxes else ()
+        for platform_id, box in zip(ids.tolist() if len(ids) else (), boxes):
+            self._boxes[platform_id] = box
+            self.hash.insert(platform_id, *box)
+        return ids
+
+    def remove(self, ids):
+        for platform_id in ids:
+            self.hash.remove(platform_id, *self._boxes.pop(platform_id))
+        super().remove(ids)
+
+    def boxes(self, x, y, w, h):
+        """(x, y, w, h) of the platforms in the spatial hash cells a box overlaps, in insertion order."""
+        boxes = self._boxes
+        return [boxes[platform_id] for platform_id in self.hash.query(x, y, w, h)]
+
+class Platform(EntityView):
+    __slots__ = ()
+    x, y, width, height = field("x"), field("y"), field("width"), field("height")
+
+    @property
+    def rect(self):
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
+class Collectible(EntityView):
+    __slots__ = ()
+    x, y = field("x"), field("y")
+
+    @property
+    def rect(self):
+        return pygame.Rect(self.x, self.y, TILE_SIZE, TILE_SIZE)
+
+    @property
+    def active(self):
+        # Collected ones are removed from the store
+        return self.id in self.store
+
+class Enemy(EntityView):
+    __slots__ = ()
+    x, y, direction, speed = field("x"), field("y"), field("direction"), field("speed")
+    left, right = field("left"), field("right")
+
+    @property
+    def rect(self):
+        return pygame.Rect(self.x, self.y, TILE_SIZE, TILE_SIZE)
+
+def update_enemies(enemies):
+    """Moves every enemy in the store one tick, turning around those at their patrol bounds."""
+    x = enemies.x
+    x += enemies.direction * enemies.speed
+    turn = (x <= enemies.left) | (x >= enemies.right)
+    enemies.direction[turn] *= -1
+
+class LevelSolids:
+    """Platform collisions against a levels.Level standing on the bottom of the screen.
+
+    boxes() answers like PlatformStore.boxes, with a box for each solid tile a
+    box overlaps, read straight from the level's ground table and solid mask
+    instead of from stored platforms.
+    """
+
+    def __init__(self, level):
+        self.level = level
+        self.size = level.tile_size
+        self.top = SCREEN_HEIGHT - level.height * level.tile_size  # Screen y of the level's first row
+        self._ground = level.ground.data  # Flat memoryview, for cheap scalar reads
+
+    def ground_span(self, x, left, right):
+        """The topmost solid tile in the column at world x, and the run of solid tiles it is part of.
+
+        The run is only followed as far as the columns covering world x
+        `left` to `right`, so a long floor costs no more than a short one.
+        Returns (screen y of its top, world x of the run's left and right
+        ends), or None if the column has no solid tile.
+        """
+        level, size = self.level, self.size
+        col = int(x) // size
+        if not 0 <= col < level.width or self._ground[col] == level.height:
+            return None
+        row = self._ground[col]
+        first_col, last_col = int(left) // size, (int(right) - 1) // size
+        first = last = col
+        while first > first_col and level.solid_at(first - 1, row):
+            first -= 1
+        while last < last_col and level.solid_at(last + 1, row):
+            last += 1
+        return self.top + row * size, first * size, (last + 1) * size
+
+    def boxes(self, x, y, w, h):
+        level, size = self.level, self.size
+        x, y = int(x), int(y) - self.top
+        first_row, last_row = max(y // size, 0), min((y + h - 1) // size, level.height - 1)
+        found = []
+        for col in range(max(x // size, 0), min((x + w - 1) // size, level.width - 1) + 1):
+            # Nothing above a column's topmost solid tile can touch it
+            for row in range(max(first_row, self._ground[col]), last_row + 1):
+                if level.solid_at(col, row):
+                    found.append((col * size, self.top + row * size, size, size))
+        return found
+
+class Chunk:
+    """A CHUNK_WIDTH-wide slice of the world with the platforms and enemies that start in it.
+
+    `platforms` are (x, y, w, h) boxes and `enemies` (x, y, left, right)
+    patrols; once the chunk is loaded, the ids they were stored under are
+    `platform_ids` and `enemy_ids`.
+    """
+
+    def __init__(self, index, platforms, enemies):
+        self.index = index
+        self.platforms = platforms
+        self.enemies = enemies
+        self.platform_ids = self.enemy_ids = ()
+
+def generate_chunk(index, world_seed, enemies=True, solids=None):
+    """Builds chunk `index`. Chunk 0 is the hand-made start; later ones are generated
+    from the world seed, so an evicted chunk comes back the same. There is no
+    ground left of the start.
+
+    With `solids` (a LevelSolids), the level is the ground and platforms, and
+    the chunk only places enemies, each patrolling the topmost solid run of
+    its column within the chunk."""
+    if index < 0:
+        return Chunk(index, [], [])
+    left = index * CHUNK_WIDTH
+    right = left + CHUNK_WIDTH - TILE_SIZE
+    if solids is not None:
+        rng = random.Random(f"{world_seed}:{index}")
+        positions = [200] if index == 0 else [
+            left + rng.randrange(TILE_SIZE, CHUNK_WIDTH - 2 * TILE_SIZE) for _ in range(rng.randint(0, 2))]
+        chunk_enemies = []
+        for x in positions if enemies else ():
+            span = solids.ground_span(x, left, left + CHUNK_WIDTH)
+            if span is not None:
+                y, run_left, run_right = span
+                chunk_enemies.append((x, y - TILE_SIZE, max(left, run_left), min(right, run_right - TILE_SIZE)))
+        return Chunk(index, [], chunk_enemies)
+    platforms = [(left, SCREEN_HEIGHT - TILE_SIZE, CHUNK_WIDTH, TILE_SIZE)]
+    if index == 0:
+        platforms += [
+            (300, SCREEN_HEIGHT - TILE_SIZE*3, 200, TILE_SIZE),
+            (600, SCREEN_HEIGHT - TILE_SIZE*5, 200, TILE_SIZE),
+        ]
+        positions = [200]
+    else:
+        rng = random.Random(f"{world_seed}:{index}")
+        for _ in range(rng.randint(1, 3)):
+            width = rng.randint(3, 7) * TILE_SIZE
+            x = left + rng.randrange(0, CHUNK_WIDTH - width + 1, TILE_SIZE)
+            platforms.append((x, SCREEN_HEIGHT - TILE_SIZE * rng.randint(3, 6), width, TILE_SIZE))
+        positions = [left + rng.randrange(TILE_SIZE, CHUNK_WIDTH - 2 * TILE_SIZE) for _ in range(rng.randint(0, 2))]
+    chunk_enemies = [(x, SCREEN_HEIGHT - TILE_SIZE*2, left, right) for x in positions] if enemies else []
+    return Chunk(index, platforms, chunk_enemies)
+
+class Game:
+    profiler = NULL_PROFILER  # Times the phases of step(); see profiler.py
+
+    def __init__(self, enemies=True, level=None):
+        # With a levels.Level, the world is that level instead of generated
+        # platforms; past its right end there is nothing to stand on
+        self.spawn_enemies = enemies
+        self.solids = None if level is None else LevelSolids(level)
+        self.reset()
+
+    def reset(self):
+        self.player = Player()
+        self.camera_offset = 0
+        self.previous = None  # Positions before the last tick, see remember()
+        self.world_seed = random.getrandbits(32)
+
+        # Loaded platforms and enemies, and the collectibles, in insertion order.
+        # Enemies and collectibles are few enough to update and test in bulk;
+        # platforms keep a spatial hash, since the player only touches one or two.
+        self.platform_store = PlatformStore()
+        self.enemy_store = EntityStore(ENEMY_COLUMNS)
+        self.collectible_store = EntityStore(COLLECTIBLE_COLUMNS)
+        self.add_collectible(400, SCREEN_HEIGHT - TILE_SIZE*4)
+
+        # Loaded chunks by index; stream() keeps only those near the view
+        self.chunks = {}
+        self.stream()
+
+    @property
+    def platforms(self):
+        return [Platform(self.platform_store, i) for i in self.platform_store.ids.tolist()]
+
+    @property
+    def enemies(self):
+        return [Enemy(self.enemy_store, i) for i in self.enemy_store.ids.tolist()]
+
+    @property
+    def collectibles(self):
+        return [Collectible(self.collectible_store, i) for i in self.collectible_store.ids.tolist()]
+
+    def add_enemy(self, x, y, left=0, right=SCREEN_WIDTH - TILE_SIZE):
+        """Adds an enemy patrolling between `left` and `right` that belongs to no chunk, so it stays loaded."""
+        return Enemy(self.enemy_store, self.enemy_store.add(x=x, y=y, direction=1, speed=ENEMY_SPEED,
+                                                            left=left, right=right))
+
+    def add_collectible(self, x, y):
+        return Collectible(self.collectible_store, self.collectible_store.add(x=x, y=y))
+
+    def stream(self):
+        """Generates the chunks near the view and the player and evicts the rest."""
+        first = int(min(self.camera_offset, self.player.x)) // CHUNK_WIDTH - CHUNKS_BEHIND
+        last = int(max(self.camera_offset + SCREEN_WIDTH, self.player.x)) // CHUNK_WIDTH + CHUNKS_AHEAD
+        for index in [index for index in self.chunks if not first <= index <= last]:
+            chunk = self.chunks.pop(index)
+            self.platform_store.remove(chunk.platform_ids)
+            self.enemy_store.remove(chunk.enemy_ids)
+        for index in range(first, last + 1):
+            if index not in self.chunks:
+                chunk = generate_chunk(index, self.world_seed, self.spawn_enemies, self.solids)
+                self.chunks[index] = chunk
+                chunk.platform_ids = self.platform_store.add_boxes(chunk.platforms)
+                if chunk.enemies:
+                    x, y, left, right = zip(*chunk.enemies)
+                    chunk.enemy_ids = self.enemy_store.extend(
+                        x=x, y=y, direction=[1] * len(x), speed=[ENEMY_SPEED] * len(x), left=left, right=right)
+
+    def press(self, key):
+        if key == pygame.K_UP:
+            self.player.jump()
+        elif key == pygame.K_LEFT:
+            self.player.direction = -1
+        elif key == pygame.K_RIGHT:
+            self.player.direction = 1
+
+    def step(self, keys=()):
+        """Advances the game by one frame without drawing. Returns True if the player died."""
+        player = self.player
+        for key in keys:
+            self.press(key)
+
+        # Update game state
+        player.update(self.platform_store if self.solids is None else self.solids)
+        self.profiler.lap("physics")
+        
+        # Update enemies (only loaded chunks, all of which are near the view), all at once
+        update_enemies(self.enemy_store)
+        self.profiler.lap("enemies")
+
+        px, py, width, height = int(player.x), int(player.y), player.width, player.height
+
+        # Collectible collision, tested against every collectible at once
+        collectibles = self.collectible_store
+        hits = np.flatnonzero(overlapping(collectibles, px, py, width, height))
+        if len(hits):
+            collectibles.remove(collectibles.ids[hits])
+            for _ in hits:
+                player.tail_length += 5
+                self.add_collectible(
+                    random.randint(self.camera_offset + SCREEN_WIDTH, self.camera_offset + SCREEN_WIDTH * 2),
+                    random.randint(TILE_SIZE, SCREEN_HEIGHT - TILE_SIZE*2)
+                )
+
+        # Collision checks
+        died = bool(overlapping(self.enemy_store, px, py, width, height).any())
+
+        if player.hits_tail():
+            died = True
+
+        # Camera scrolling
+        if player.x - self.camera_offset > SCREEN_WIDTH * 0.6:
+            self.camera_offset = player.x - SCREEN_WIDTH * 0.6
+        self.profiler.lap("collision")
+        self.stream()
+        self.profiler.lap("streaming")
+        return died
+
+    def remember(self):
+        """Keeps the positions of moving things before a tick, for interpolating frames until the next."""
+        enemies = self.enemy_store
+        self.previous = (self.player.x, self.player.y, self.camera_offset,
+                         (enemies.ids.copy(), enemies.x.copy(), enemies.y.copy()))
+
+    def draw(self, surface, alpha=1.0):
+        """Draws the view, `alpha` of the way from the remembered positions to the current ones."""
+        player = self.player
+        camera_offset = self.camera_offset
+        player_x, player_y = player.x, player.y
+        store = self.enemy_store
+        enemy_x, enemy_y = store.x, store.y
+        if self.previous is not None and alpha < 1.0:
+            old_x, old_y, old_offset, (old_ids, old_enemy_x, old_enemy_y) = self.previous
+            player_x = old_x + (player_x - old_x) * alpha
+            player_y = old_y + (player_y - old_y) * alpha
+            camera_offset = old_offset + (camera_offset - old_offset) * alpha
+            # Enemies loaded since remember() are drawn where they are
+            if len(old_ids):
+                rows = np.minimum(np.searchsorted(old_ids, store.ids), len(old_ids) - 1)
+                known = old_ids[rows] == store.ids
+                enemy_x = np.where(known, old_enemy_x[rows] + (enemy_x - old_enemy_x[rows]) * alpha, enemy_x)
+                enemy_y = np.where(known, old_enemy_y[rows] + (enemy_y - old_enemy_y[rows]) * alpha, enemy_y)
+        view_left = camera_offset - TILE_SIZE
+        view_right = camera_offset + SCREEN_WIDTH
+        surface.fill(BLACK)
+
+        # Only chunks overlapping the view, and only the things in them that are visible
+        first = int(camera_offset) // CHUNK_WIDTH
+        last = int(view_right) // CHUNK_WIDTH
+        visible = [self.chunks[index] for index in range(first, last + 1) if index in self.chunks]
+
+        for chunk in visible:
+            for x, y, w, h in chunk.platforms:
+                if x + w > camera_offset and x < view_right:
+                    pygame.draw.rect(surface, GREEN, (x - camera_offset, y, w, h))
+
+        if self.solids is not None:
+            size, top = self.solids.size, self.solids.top
+            for col, row, length in self.solids.level.runs(int(camera_offset) // size, int(view_right) // size + 1):
+                pygame.draw.rect(surface, GREEN, (col * size - camera_offset, top + row * size, length * size, size))
+
+        # Collectibles and enemies: pick the visible rows in bulk, then draw those
+        collectibles = self.collectible_store
+        shown = (view_left < collectibles.x) & (collectibles.x < view_right)
+        for x, y in zip(collectibles.x[shown].tolist(), collectibles.y[shown].tolist()):
+            pygame.draw.rect(surface, YELLOW, (x - camera_offset, y, TILE_SIZE, TILE_SIZE))
+
+        shown = (view_left < enemy_x) & (enemy_x < view_right)
+        for x, y in zip(enemy_x[shown].tolist(), enemy_y[shown].tolist()):
+            pygame.draw.rect(surface, RED, (x - camera_offset, y, TILE_SIZE, TILE_SIZE))
+
+        pygame.draw.rect(surface, BLUE, 
+                        (player_x - camera_offset, player_y, 
                          player.width, player.height))
 
-    pygame.display.flip()
-    clock.tick(FPS)
+        for pos in player.tail_positions:
+            if view_left < pos[0] < view_right:
+                pygame.draw.rect(surface, WHITE, 
+                                (pos[0] - camera_offset, pos[1], 
+                                 player.width, player.height))
+
+def main(recorder=None, profiler=None, screen=None, level=None, capture=None):
+    # `recorder` (see replay.py) is given each tick's input; `profiler` (see
+    # profiler.py) times each phase of the frame, with F3 toggling its overlay;
+    # `capture` (see capture.py) is given every frame drawn.
+    # Draws on `screen`, or opens the window. `level` is a levels.Level to play
+    # instead of the generated world. Returns when the player dies, the window
+    # is closed or Escape pressed.
+    if screen is None:
+        screen = open_window()
+    pygame.display.set_caption(CAPTION)
+    game = Game(level=level)
+    if recorder:
+        recorder.start(game)
+    if profiler:
+        game.profiler = profiler
+    profiler = game.profiler
+    clock = pygame.time.Clock()
+    timestep = FixedTimestep(FPS)
+    pending = []  # Keys read since the last tick
+    running = True
+
+    # Main game loop: input is read and a frame drawn RENDER_FPS times a
+    # second, the simulation advances FPS times a second whatever the frame rate
+    while running:
+        # Event handling
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_F3:
+                    profiler.toggle_overlay()
+                pending.append(event.key)
+        profiler.lap("events")
+
+        for _ in range(timestep.ticks()):
+            if recorder:
+                recorder.tick(pending)
+            game.remember()
+            died = game.step(pending)
+            pending = []
+            if died:
+                running = False
+                break
+
+        game.draw(screen, timestep.alpha)
+        profiler.draw_overlay(screen)
+        profiler.lap("draw")
+        pygame.display.flip()
+        profiler.lap("display")
+        if capture:
+            capture.grab(screen)
+            profiler.lap("capture")
+        clock.tick(RENDER_FPS)
+        profiler.lap("wait")
+        profiler.end_frame()
+
+if __name__ == "__main__":
+    import sys
+
+    from levels import load
 
-pygame.quit()
+    main(level=load(sys.argv[1]) if len(sys.argv) > 1 else None)
+    pygame.quit()
@@ -0,0 +1,122 @@
+"""Struct-of-arrays entity storage: one NumPy column per field, one row per entity.
+
+Rows stay in insertion order, so a store visits its entities in the order
+they were added, and an update of every entity is one NumPy expression per
+column instead of a Python call per object. Each entity gets an id when it
+is added. Ids only grow, so the id column is sorted and finding an entity's
+row is a binary search.
+
+Views (EntityView subclasses) give scripts attribute access to one entity by
+id, with one property per column made by field(); the hot paths use the
+columns directly.
+"""
+import numpy as np
+
+
+class EntityStore:
+    """Entities with the fields `columns` ({name: dtype}), one row each.
+
+    `store.<name>` is that column over the live rows and `store.ids` their
+    ids. Adding or removing entities replaces these arrays, so read them
+    again afterwards rather than keeping them.
+    """
+
+    def __init__(self, columns, capacity=16):
+        self._arrays = {name: np.zeros(capacity, dtype) for name, dtype in columns.items()}
+        self._ids = np.zeros(capacity, np.int64)
+        self.size = 0
+        self.next_id = 0
+        self._bind()
+
+    def _bind(self):
+        size = self.size
+        for name, array in self._arrays.items():
+            setattr(self, name, array[:size])
+        self.ids = self._ids[:size]
+
+    def _reserve(self, count):
+        capacity = len(self._ids)
+        if self.size + count <= capacity:
+            return
+        while capacity < self.size + count:
+            capacity *= 2
+        for name, array in self._arrays.items():
+            self._arrays[name] = np.resize(array, capacity)
+        self._ids = np.resize(self._ids, capacity)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, entity_id):
+        row = int(np.searchsorted(self.ids, entity_id))
+        return row < self.size and self.ids[row] == entity_id
+
+    def add(self, **values):
+        """Adds one entity; fields not given are zero. Returns its id."""
+        return int(self.extend(**{name: [value] for name, value in values.items()})[0])
+
+    def extend(self, **columns):
+        """Adds as many entities as the (equally long) sequences given per field; returns their ids."""
+        count = len(next(iter(columns.values()))) if columns else 0
+        self._reserve(count)
+        start, end = self.size, self.size + count
+        for name, array in self._arrays.items():
+            array[start:end] = columns.get(name, 0)
+        ids = np.arange(self.next_id, self.next_id + count)
+        self._ids[start:end] = ids
+        self.next_id += count
+        self.size = end
+        self._bind()
+        return ids
+
+    def remove(self, ids):
+        """Removes the entities with the given ids (others are ignored), keeping the rest in order."""
+        keep = ~np.isin(self.ids, ids)
+        size = int(keep.sum())
+        if size == self.size:
+            return
+        for array in self._arrays.values():
+            array[:size] = array[:self.size][keep]
+        self._ids[:size] = self.ids[keep]
+        self.size = size
+        self._bind()
+
+    def row(self, entity_id):
+        """Index of an entity's row in the columns; KeyError if it is not in the store."""
+        row = int(np.searchsorted(self.ids, entity_id))
+        if row < self.size and self.ids[row] == entity_id:
+            return row
+        raise KeyError(entity_id)
+
+
+def field(name):
+    """A view property reading and writing column `name` at the view's row, as a Python scalar."""
+
+    def get(view):
+        store = view.store
+        return getattr(store, name)[store.row(view.id)].item()
+
+    def set(view, value):
+        store = view.store
+        getattr(store, name)[store.row(view.id)] = value
+
+    return property(get, set, doc=f"The entity's {name} column.")
+
+
+class EntityView:
+    """One entity of a store, by id. Views of the same entity compare equal."""
+
+    __slots__ = ("store", "id")
+
+    def __init__(self, store, entity_id):
+        self.store = store
+        self.id = entity_id
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.store is self.store and other.id == self.id
+
+    def __hash__(self):
+        return hash((id(self.store), self.id))
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.id}>"
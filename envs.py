@@ -0,0 +1,193 @@
+"""Gym-style environments over the four games.
+
+Every environment has the same interface: reset(seed) starts a new episode
+and returns an observation, step(action) advances the game by one tick and
+returns (observation, reward, done), and render() draws the current frame to
+the display on request. Actions are indices into the class's ACTIONS, each
+of which is the tuple of keys pressed (or, for chatgpt.py, held) that tick.
+
+Game modules are imported when an environment is created; import `headless`
+first to run without a window. Games draw from the global `random` module,
+which reset(seed) seeds.
+"""
+import importlib
+import random
+
+import pygame
+
+from window import open_window
+
+
+class GameEnv:
+    """Base class; subclasses set MODULE and ACTIONS and implement the game-specific hooks."""
+
+    MODULE = None
+    ACTIONS = ((),)
+
+    def __init__(self, max_steps=None):
+        self.module = importlib.import_module(self.MODULE)
+        self.max_steps = max_steps
+        self.game = None
+        self.steps = 0
+
+    def reset(self, seed=None):
+        if seed is not None:
+            random.seed(seed)
+        self.game = self.new_game()
+        self.steps = 0
+        return self.observe()
+
+    def step(self, action):
+        reward, done = self.advance(self.ACTIONS[action])
+        self.steps += 1
+        if self.max_steps is not None and self.steps >= self.max_steps:
+            done = True
+        return self.observe(), reward, done
+
+    def render(self):
+        surface = open_window()
+        self.draw(surface)
+        pygame.display.flip()
+
+    # Game-specific hooks
+
+    def new_game(self):
+        raise NotImplementedError
+
+    def advance(self, keys):
+        """Runs one tick with the given keys; returns (reward, done)."""
+        raise NotImplementedError
+
+    def observe(self):
+        raise NotImplementedError
+
+    def draw(self, surface):
+        self.game.draw(surface)
+
+
+class ClaudeEnv(GameEnv):
+    """claude.py's MarioSnake. Reward is the score gained; the episode ends when the snake dies."""
+
+    MODULE = "claude"
+    ACTIONS = ((), (pygame.K_UP,), (pygame.K_LEFT,), (pygame.K_RIGHT,))
+
+    def new_game(self):
+        return self.module.MarioSnake()
+
+    def advance(self, keys):
+        score = self.game.score
+        if self.game.step(keys):
+            return 0, True
+        return self.game.score - score, False
+
+    def observe(self):
+        game = self.game
+        return {
+            "positions": tuple(game.positions),
+            "direction": game.direction,
+            "on_ground": game.on_ground,
+            "score": game.score,
+            "coins": frozenset(game.coins),
+            "mushrooms": frozenset(game.mushrooms),
+            "enemies": tuple((x, y) for x, y, _ in game.enemies),
+        }
+
+
+class GeminiEnv(GameEnv):
+    """gemini.py's SnakeGame. Reward is the score gained; the episode ends on a crash or a full board."""
+
+    MODULE = "gemini"
+    ACTIONS = ((), (pygame.K_UP,), (pygame.K_DOWN,), (pygame.K_LEFT,), (pygame.K_RIGHT,), (pygame.K_SPACE,))
+
+    def new_game(self):
+        self.renderer = None
+        return self.module.SnakeGame()
+
+    def advance(self, keys):
+        score = self.game.score
+        done = self.game.step(keys)
+        return self.game.score - score, done
+
+    def observe(self):
+        game = self.game
+        return {
+            "snake": tuple(game.snake_body),
+            "direction": game.snake_direction,
+            "food": game.food_pos,
+            "powerup": game.powerup_pos,
+            "obstacles": tuple(game.obstacles),
+            "mario_y": game.mario_pos[1],
+            "score": game.score,
+        }
+
+    def draw(self, surface):
+        if self.renderer is None:
+            self.renderer = self.module.Renderer(self.game, surface, dirty=False)
+        self.renderer.draw()
+
+
+class DeepseekEnv(GameEnv):
+    """deepseek.py's runner. Reward is the tail length gained; the episode ends when the player dies."""
+
+    MODULE = "deepseek"
+    ACTIONS = ((), (pygame.K_UP,), (pygame.K_LEFT,), (pygame.K_RIGHT,))
+
+    def new_game(self):
+        return self.module.Game()
+
+    def advance(self, keys):
+        tail_length = self.game.player.tail_length
+        done = self.game.step(keys)
+        return self.game.player.tail_length - tail_length, done
+
+    def observe(self):
+        game = self.game
+        player = game.player
+        return {
+            "player": (player.x, player.y, player.velocity_y, player.direction),
+            "tail_length": player.tail_length,
+            "enemies": tuple((enemy.rect.x, enemy.rect.y) for enemy in game.enemies),
+            "collectibles": tuple((item.rect.x, item.rect.y) for item in game.collectibles),
+            "camera_offset": game.camera_offset,
+        }
+
+
+class ChatgptEnv(GameEnv):
+    """chatgpt.py's game. Reward is the number of items collected; the game never ends, so set max_steps."""
+
+    MODULE = "chatgpt"
+    ACTIONS = (
+        (),
+        (pygame.K_LEFT,),
+        (pygame.K_RIGHT,),
+        (pygame.K_SPACE,),
+        (pygame.K_LEFT, pygame.K_SPACE),
+        (pygame.K_RIGHT, pygame.K_SPACE),
+    )
+
+    def new_game(self):
+        return self.module.Game()
+
+    def advance(self, keys):
+        return self.game.step(keys), False
+
+    def observe(self):
+        game = self.game
+        return {
+            "player": (game.player.rect.x, game.player.rect.y, game.player.vel_y),
+            "snake": tuple(game.snake.body),
+            "items": tuple((item.rect.x, item.rect.y) for item in game.items),
+        }
+
+
+ENVS = {
+    "chatgpt": ChatgptEnv,
+    "claude": ClaudeEnv,
+    "deepseek": DeepseekEnv,
+    "gemini": GeminiEnv,
+}
+
+
+def make(name, **kwargs):
+    """Creates the environment for one of the games by module name."""
+    return ENVS[name](**kwargs)
@@ -1,9 +1,13 @@
+import bisect
 import pygame
 import random
-import sys
+from collections import Counter, deque
 
-# Initialize Pygame
-pygame.init()
+from freecells import FreeCells, GridCells
+from profiler import NULL_PROFILER
+from textcache import get_font, render_text
+from timestep import FixedTimestep, lerp_points
+from window import open_window
 
 # --- Window Settings ---
 SCREEN_WIDTH = 800
@@ -11,6 +15,7 @@ SCREEN_HEIGHT = 600
 GRID_SIZE = 20  # Size of each grid cell
 GRID_WIDTH = SCREEN_WIDTH // GRID_SIZE
 GRID_HEIGHT = SCREEN_HEIGHT // GRID_SIZE
+LARGE_BOARD_CELLS = 1 << 16 # Boards with more cells keep their free cells in a compact GridCells
 
 # --- Colors ---
 WHITE = (255, 255, 255)
@@ -21,11 +26,13 @@ BLUE = (0, 0, 255)   # Obstacle color
 YELLOW = (255, 255, 0) # Powerup color
 
 # --- Game Settings ---
-FPS = 10
+FPS = 10  # Simulation ticks per second
+RENDER_FPS = 60  # Frames drawn per second; positions are interpolated between ticks
 SNAKE_SPEED = 1  # Snake moves 1 grid cell per frame, effectively
-OBSTACLE_COUNT = 10  # Number of obstacles
+OBSTACLE_COUNT = 10  # Number of obstacles on a GRID_WIDTH x GRID_HEIGHT board; bigger boards get more in proportion
 POWERUP_DURATION = 50 # Frames the powerup lasts
 GROW_AMOUNT = 3 # How much snake grows after eating food
+DIRTY_RENDERING = True # Redraw only moving entities over a cached grid/obstacle layer
 
 # --- Mario Elements ---
 MARIO_COLOR = (200, 50, 50)  # Example Mario color (red cap)
@@ -37,196 +44,525 @@ FLOOR_LEVEL = SCREEN_HEIGHT - GRID_SIZE # Y-coordinate of the "floor"
 BLOCK_SIZE = GRID_SIZE
 
 # --- Fonts ---
-BASIC_FONT = pygame.font.Font('freesansbold.ttf', 18) # Use a default font
+BASIC_FONT = ('freesansbold.ttf', 18) # Default font, loaded on first use
+CAPTION = "Super Mario Snake"
+
+# --- Snake Body ---
+
+class SnakeBody:
+    """Snake segments, head first, with O(1) head push, tail pop and membership.
+
+    Cells are reference-counted so stacked segments (the snake grows by
+    repeating its tail cell) stay occupied until the last copy is popped.
+    If `free_cells` is given, every segment also blocks its cell there.
+    """
+
+    def __init__(self, cells, free_cells=None):
+        self.segments = deque(cells)
+        self.occupancy = Counter(self.segments)
+        self.free_cells = free_cells
+        if free_cells is not None:
+            for cell in self.segments:
+                free_cells.occupy(cell)
+
+    def __len__(self):
+        return len(self.segments)
+
+    def __iter__(self):
+        return iter(self.segments)
+
+    def __contains__(self, cell):
+        return self.occupancy[cell] > 0
+
+    @property
+    def head(self):
+        return self.segments[0]
+
+    @property
+    def tail(self):
+        return self.segments[-1]
+
+    def hits_body(self, cell):
+        """Returns True if cell is occupied by any segment other than the head."""
+        return self.occupancy[cell] - (cell == self.segments[0]) > 0
+
+    def push_head(self, cell):
+        self.segments.appendleft(cell)
+        self.occupancy[cell] += 1
+        if self.free_cells is not None:
+            self.free_cells.occupy(cell)
+
+    def pop_tail(self):
+        cell = self.segments.pop()
+        self.occupancy[cell] -= 1
+        if not self.occupancy[cell]:
+            del self.occupancy[cell]
+        if self.free_cells is not None:
+            self.free_cells.release(cell)
+        return cell
+
+    def grow(self, amount):
+        """Stacks `amount` extra segments on the current tail cell."""
+        cell = self.segments[-1]
+        self.segments.extend([cell] * amount)
+        self.occupancy[cell] += amount
+        if self.free_cells is not None:
+            self.free_cells.occupy(cell, amount)
 
 # --- Functions ---
 
-def draw_grid():
-    """Draws the grid lines on the screen."""
+def draw_grid(surface):
+    """Draws the grid lines on the surface."""
     for x in range(0, SCREEN_WIDTH, GRID_SIZE):
-        pygame.draw.line(screen, WHITE, (x, 0), (x, SCREEN_HEIGHT))
+        pygame.draw.line(surface, WHITE, (x, 0), (x, SCREEN_HEIGHT))
     for y in range(0, SCREEN_HEIGHT, GRID_SIZE):
-        pygame.draw.line(screen, WHITE, (0, y), (SCREEN_WIDTH, y))
-
-def generate_food(snake_body, obstacles, mario_pos):
-    """Generates the food at a random location, avoiding the snake, obstacles, and Mario."""
-    while True:
-        x = random.randint(0, GRID_WIDTH - 1)
-        y = random.randint(0, GRID_HEIGHT - 1)
-        food_pos = (x, y)
-        if (
-            food_pos not in snake_body
-            and food_pos not in obstacles
-            and food_pos != (mario_pos[0] // GRID_SIZE, mario_pos[1] // GRID_SIZE) # Avoid spawning on Mario's initial pos
-        ):
-            break
-    return food_pos
-
-def generate_obstacle():
-    """Generates a random obstacle location."""
-    x = random.randint(0, GRID_WIDTH - 1)
-    y = random.randint(0, GRID_HEIGHT - 1)
+        pygame.draw.line(surface, WHITE, (0, y), (SCREEN_WIDTH, y))
+
+def draw_obstacles(surface, obstacles):
+    """Draws the obstacles on the surface."""
+    for x, y in obstacles:
+        pygame.draw.rect(surface, BLUE, (x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+
+def render_background(obstacles):
+    """Renders the static layer (grid lines and obstacles) once into a display-format surface."""
+    background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+    background.fill(BLACK)
+    draw_grid(background)
+    draw_obstacles(background, obstacles)
+    return background
+
+def generate_food(free_cells, mario_pos):
+    """Generates the food at a random free cell (not snake or obstacle), avoiding Mario.
+
+    Returns None if the board is full.
+    """
+    return free_cells.sample(exclude=[(mario_pos[0] // GRID_SIZE, mario_pos[1] // GRID_SIZE)])
+
+def generate_obstacle(width=GRID_WIDTH, height=GRID_HEIGHT):
+    """Generates a random obstacle location on a width x height board."""
+    x = random.randint(0, width - 1)
+    y = random.randint(0, height - 1)
     return (x, y)
 
 def display_message(text, color, surface, x, y):
-    """Displays text on the screen."""
-    text_obj = BASIC_FONT.render(text, True, color)
+    """Displays text on the screen and returns the area it covers."""
+    text_obj = render_text(text, get_font(*BASIC_FONT), color)
     text_rect = text_obj.get_rect()
     text_rect.center = (x, y)
-    surface.blit(text_obj, text_rect)
-
-def draw_mario(position_x, position_y):
-    """Draws Mario on the screen."""
-    pygame.draw.rect(screen, MARIO_COLOR, (position_x, position_y, MARIO_SIZE_X, MARIO_SIZE_Y))
-
-def generate_powerup(snake_body, food_pos, obstacles, mario_pos):
-    """Generates a power-up at a random location, avoiding snake, food and obstacles."""
-    while True:
-        x = random.randint(0, GRID_WIDTH - 1)
-        y = random.randint(0, GRID_HEIGHT - 1)
-        powerup_pos = (x, y)
-        if (powerup_pos not in snake_body and powerup_pos != food_pos and powerup_pos not in obstacles and powerup_pos != (mario_pos[0] // GRID_SIZE, mario_pos[1] // GRID_SIZE)):
-            break
-    return powerup_pos
+    return surface.blit(text_obj, text_rect)
 
-# --- Main Game Function ---
-def main():
-    """Main function to run the game."""
-    global screen, clock, SNAKE_SPEED
+def draw_mario(surface, position_x, position_y):
+    """Draws Mario on the surface and returns the area it covers."""
+    return pygame.draw.rect(surface, MARIO_COLOR, (position_x, position_y, MARIO_SIZE_X, MARIO_SIZE_Y))
 
-    # Initialize screen and clock
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("Super Mario Snake")
-    clock = pygame.time.Clock()
+def generate_powerup(free_cells, food_pos, mario_pos):
+    """Generates a power-up at a random free cell, avoiding food and Mario.
 
-    # --- Game Variables ---
-    snake_body = [(GRID_WIDTH // 2, GRID_HEIGHT // 2)]  # Initial snake position
-    snake_direction = (1, 0)  # Initial direction (right)
-    food_pos = generate_food(snake_body, [], (0,0))  # Initial food position.  Correctly initialized now.
-    game_over = False
-    mario_pos = [50, FLOOR_LEVEL]  # Initial Mario position
-    mario_velocity_y = 0
-    is_jumping = False
-    obstacles = [generate_obstacle() for _ in range(OBSTACLE_COUNT)] # List of obstacle positions
-    score = 0
-    powerup_pos = None # No powerup initially
-    powerup_active = False
-    powerup_timer = 0
-    ate_food_this_frame = False #track if food was eaten in current frame
-    level = 1
-    
-    # --- Game Loop ---
-    while not game_over:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                game_over = True
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP and snake_direction != (0, 1):
-                    snake_direction = (0, -1)
-                elif event.key == pygame.K_DOWN and snake_direction != (0, -1):
-                    snake_direction = (0, 1)
-                elif event.key == pygame.K_LEFT and snake_direction != (1, 0):
-                    snake_direction = (-1, 0)
-                elif event.key == pygame.K_RIGHT and snake_direction != (-1, 0):
-                    snake_direction = (1, 0)
-                elif event.key == pygame.K_SPACE and not is_jumping: # Spacebar for jump
-                    mario_velocity_y = JUMP_SPEED
-                    is_jumping = True
+    Returns None if there is no room for it.
+    """
+    return free_cells.sample(exclude=[food_pos, (mario_pos[0] // GRID_SIZE, mario_pos[1] // GRID_SIZE)])
+
+# --- Game State ---
+
+class SnakeGame:
+    """State and per-tick rules of one game, independent of drawing and the clock.
+
+    The board is `width` x `height` cells and wraps at its edges; by default
+    it is the size of the screen.
+    """
+
+    profiler = NULL_PROFILER # Times the phases of step(); see profiler.py
+
+    def __init__(self, verbose=False, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.verbose = verbose # Print powerup messages
+        self.width = width
+        self.height = height
+        # Cells not covered by snake or obstacles
+        if width * height > LARGE_BOARD_CELLS:
+            self.free_cells = GridCells(width, height)
+        else:
+            self.free_cells = FreeCells((x, y) for x in range(width) for y in range(height))
+        self.snake_body = SnakeBody([(width // 2, height // 2)], self.free_cells)  # Initial snake position
+        self.snake_direction = (1, 0)  # Initial direction (right)
+        self.food_pos = self.spawn_food((0,0))  # Initial food position.  Correctly initialized now.
+        self.game_over = False
+        self.mario_pos = [50, FLOOR_LEVEL]  # Initial Mario position
+        self.mario_velocity_y = 0
+        self.is_jumping = False
+        self.obstacles = self.spawn_obstacles() # List of obstacle positions
+        for obstacle in self.obstacles:
+            self.free_cells.occupy(obstacle)
+        self.score = 0
+        self.powerup_pos = None # No powerup initially
+        self.powerup_active = False
+        self.powerup_timer = 0
+        self.ate_food_this_frame = False #track if food was eaten in current frame
+        self.level = 1
+        self.snake_speed = SNAKE_SPEED
+
+    # Random placement; each hook is a separate method so callers can script it
+
+    def spawn_food(self, mario_pos):
+        return generate_food(self.free_cells, mario_pos)
+
+    def spawn_obstacles(self):
+        count = OBSTACLE_COUNT * self.width * self.height // (GRID_WIDTH * GRID_HEIGHT)
+        return [generate_obstacle(self.width, self.height) for _ in range(count)]
+
+    def roll_powerup(self):
+        return random.randint(0, 19) == 0 # 5% chance of powerup
+
+    def spawn_powerup(self):
+        return generate_powerup(self.free_cells, self.food_pos, self.mario_pos)
+
+    def press(self, key):
+        """Applies a single key press."""
+        if key == pygame.K_UP and self.snake_direction != (0, 1):
+            self.snake_direction = (0, -1)
+        elif key == pygame.K_DOWN and self.snake_direction != (0, -1):
+            self.snake_direction = (0, 1)
+        elif key == pygame.K_LEFT and self.snake_direction != (1, 0):
+            self.snake_direction = (-1, 0)
+        elif key == pygame.K_RIGHT and self.snake_direction != (-1, 0):
+            self.snake_direction = (1, 0)
+        elif key == pygame.K_SPACE and not self.is_jumping: # Spacebar for jump
+            self.mario_velocity_y = JUMP_SPEED
+            self.is_jumping = True
+
+    def step(self, keys=()):
+        """Advances the game by one tick. Returns True if the snake crashed or the board filled up."""
+        for key in keys:
+            self.press(key)
 
         # --- Mario Movement ---
-        mario_velocity_y += GRAVITY
-        mario_pos[1] += mario_velocity_y
+        self.mario_velocity_y += GRAVITY
+        self.mario_pos[1] += self.mario_velocity_y
 
         # --- Floor Collision ---
-        if mario_pos[1] >= FLOOR_LEVEL:
-            mario_pos[1] = FLOOR_LEVEL
-            mario_velocity_y = 0
-            is_jumping = False
+        if self.mario_pos[1] >= FLOOR_LEVEL:
+            self.mario_pos[1] = FLOOR_LEVEL
+            self.mario_velocity_y = 0
+            self.is_jumping = False
 
         # --- Snake Movement ---
+        snake_body = self.snake_body
         new_head = (
-            (snake_body[0][0] + snake_direction[0]) % GRID_WIDTH,
-            (snake_body[0][1] + snake_direction[1]) % GRID_HEIGHT,
+            (snake_body.head[0] + self.snake_direction[0]) % self.width,
+            (snake_body.head[1] + self.snake_direction[1]) % self.height,
         )
 
-        # --- Collision Detection ---
-        if new_head in snake_body[1:]:
-            game_over = True  # Game over if snake hits itself
-            break
+        self.profiler.lap("physics")
 
-        if new_head in obstacles:
-            game_over = True # Game over if snake hits obstacle
-            break
+        # --- Collision Detection ---
+        if snake_body.hits_body(new_head):
+            self.game_over = True  # Game over if snake hits itself
+            return True
+
+        # Only the snake and obstacles block cells, so past the body check a blocked cell is an
+        # obstacle; this stays O(1) however many obstacles a big board has
+        if new_head not in self.free_cells:
+            self.game_over = True # Game over if snake hits obstacle
+            return True
         
-        ate_food_this_frame = False #reset
-        if new_head == (food_pos[0], food_pos[1]):
-            snake_body.insert(0, new_head)
-            food_pos = generate_food(snake_body, obstacles, mario_pos)
-            score += 10
-            ate_food_this_frame = True #track
-            if score % 50 == 0:  # Increase speed every 50 points
-                SNAKE_SPEED += 1
-                level += 1
+        self.ate_food_this_frame = False #reset
+        if new_head == (self.food_pos[0], self.food_pos[1]):
+            snake_body.push_head(new_head)
+            self.food_pos = self.spawn_food(self.mario_pos)
+            if self.food_pos is None:
+                if self.verbose:
+                    print("Board Full!")
+                self.game_over = True
+                return True
+            self.score += 10
+            self.ate_food_this_frame = True #track
+            if self.score % 50 == 0:  # Increase speed every 50 points
+                self.snake_speed += 1
+                self.level += 1
                 
-            if random.randint(0, 19) == 0: # 5% chance of powerup
-                powerup_pos = generate_powerup(snake_body, food_pos, obstacles, mario_pos)
+            if self.roll_powerup():
+                self.powerup_pos = self.spawn_powerup()
 
         else:
-            snake_body.insert(0, new_head)
-            snake_body.pop()
+            snake_body.push_head(new_head)
+            snake_body.pop_tail()
 
         # --- Power-up Effects ---
-        if powerup_active:
-            powerup_timer -= 1
-            if powerup_timer <= 0:
-                powerup_active = False
-                SNAKE_SPEED = 1 #reset
-                print("Powerup Over")
+        if self.powerup_active:
+            self.powerup_timer -= 1
+            if self.powerup_timer <= 0:
+                self.powerup_active = False
+                self.snake_speed = 1 #reset
+                if self.verbose:
+                    print("Powerup Over")
 
         # --- Power-up Collision ---
-        if powerup_pos and new_head == powerup_pos:
-            powerup_active = True
-            powerup_timer = POWERUP_DURATION
-            powerup_pos = None
-            SNAKE_SPEED = 2  # Double the speed
-            score += 30
-            print("Powerup Collected!")
-            if ate_food_this_frame:
-                for _ in range(GROW_AMOUNT):
-                    snake_body.append(snake_body[-1])
-
-        # --- Drawing ---
-        screen.fill(BLACK)
-        draw_grid()
+        if self.powerup_pos and new_head == self.powerup_pos:
+            self.powerup_active = True
+            self.powerup_timer = POWERUP_DURATION
+            self.powerup_pos = None
+            self.snake_speed = 2  # Double the speed
+            self.score += 30
+            if self.verbose:
+                print("Powerup Collected!")
+            if self.ate_food_this_frame:
+                snake_body.grow(GROW_AMOUNT)
+        return False
+
+# --- Rendering ---
+
+class Renderer:
+    """Draws a SnakeGame onto a surface.
+
+    With `dirty` set, the grid and obstacles come from a cached background and
+    only the entities are erased and redrawn each frame.
+    """
+
+    def __init__(self, game, surface, dirty=DIRTY_RENDERING):
+        self.game = game
+        self.surface = surface
+        self.dirty = dirty
+        self.background = render_background(game.obstacles) # Static layer; obstacles never move during a game
+        self.drawn_rects = [surface.get_rect()] # Areas covered by last frame's entities
+        self.previous = None # Snake cells and Mario's height before the last tick, see remember()
+
+    def remember(self):
+        """Keeps the positions of moving things before a tick, for interpolating frames until the next."""
+        self.previous = (list(self.game.snake_body), self.game.mario_pos[1])
+
+    def draw(self, alpha=1.0):
+        """Draws one frame, `alpha` of the way from the remembered positions to the current ones.
+
+        Returns the rectangles to pass to pygame.display.update.
+        """
+        game = self.game
+        screen = self.surface
+        snake = game.snake_body
+        mario_y = game.mario_pos[1]
+        if self.previous is not None and alpha < 1.0:
+            snake = lerp_points(self.previous[0], snake, alpha, 1) # Wrapping segments jump
+            mario_y = self.previous[1] + (mario_y - self.previous[1]) * alpha
+        if self.dirty:
+            # Erase last frame's entities by restoring the cached background under them
+            for rect in self.drawn_rects:
+                screen.blit(self.background, rect, rect)
+            dirty_rects = self.drawn_rects
+        else:
+            screen.fill(BLACK)
+            draw_grid(screen)
+        drawn_rects = []
 
         # Draw Snake
-        for x, y in snake_body:
-            pygame.draw.rect(screen, GREEN, (x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
-        # Draw Food
-        pygame.draw.rect(screen, RED, (food_pos[0] * GRID_SIZE, food_pos[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+        for x, y in snake:
+            drawn_rects.append(pygame.draw.rect(screen, GREEN, (x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE)))
+        # Draw Food (none left once the snake fills the board)
+        if game.food_pos:
+            drawn_rects.append(pygame.draw.rect(screen, RED, (game.food_pos[0] * GRID_SIZE, game.food_pos[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE)))
         # Draw Mario
-        draw_mario(mario_pos[0], mario_pos[1])
+        drawn_rects.append(draw_mario(screen, game.mario_pos[0], mario_y))
 
-        # Draw Obstacles
-        for x, y in obstacles:
-            pygame.draw.rect(screen, BLUE, (x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+        # Draw Obstacles (already part of the cached background in dirty mode)
+        if not self.dirty:
+            draw_obstacles(screen, game.obstacles)
         
         # Draw Powerup
-        if powerup_pos:
-            pygame.draw.rect(screen, YELLOW, (powerup_pos[0] * GRID_SIZE, powerup_pos[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+        if game.powerup_pos:
+            drawn_rects.append(pygame.draw.rect(screen, YELLOW, (game.powerup_pos[0] * GRID_SIZE, game.powerup_pos[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE)))
 
         # Display Score
-        display_message(f"Score: {score}", WHITE, screen, 100, 20)
-        display_message(f"Level: {level}", WHITE, screen, 700, 20)
+        drawn_rects.append(display_message(f"Score: {game.score}", WHITE, screen, 100, 20))
+        drawn_rects.append(display_message(f"Level: {game.level}", WHITE, screen, 700, 20))
+
+        if game.game_over:
+            drawn_rects.append(display_message("Game Over!", RED, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+
+        self.drawn_rects = drawn_rects
+        if self.dirty:
+            return dirty_rects + drawn_rects
+        return [screen.get_rect()]
+
+class ViewportRenderer:
+    """Draws a SnakeGame whose board is bigger than the surface, through a camera following the head.
+
+    Only what is in view is drawn: the grid lines are one blit of a cached
+    layer, obstacles are looked up row by row for the visible rows, and the
+    view wraps with the board. A frame costs the same on any size of board
+    (the snake's length aside); the whole surface is redrawn every frame,
+    since the view scrolls.
+    """
+
+    def __init__(self, game, surface):
+        self.game = game
+        self.surface = surface
+        self.view_width, self.view_height = surface.get_size()
+        # Grid lines one cell wider and taller than the view, blitted at the camera's offset within a cell
+        self.grid = pygame.Surface((self.view_width + GRID_SIZE, self.view_height + GRID_SIZE)).convert()
+        self.grid.fill(BLACK)
+        for x in range(0, self.view_width + GRID_SIZE, GRID_SIZE):
+            pygame.draw.line(self.grid, WHITE, (x, 0), (x, self.view_height + GRID_SIZE))
+        for y in range(0, self.view_height + GRID_SIZE, GRID_SIZE):
+            pygame.draw.line(self.grid, WHITE, (0, y), (self.view_width + GRID_SIZE, y))
+        self.obstacle_rows = {} # Row -> sorted columns of its obstacles
+        for x, y in game.obstacles:
+            self.obstacle_rows.setdefault(y, []).append(x)
+        for columns in self.obstacle_rows.values():
+            columns.sort()
+        self.drawn_rects = [surface.get_rect()] # Kept for main(); every frame covers the whole surface
+        self.previous = None # Snake cells and Mario's height before the last tick, see remember()
+
+    def remember(self):
+        """Keeps the positions of moving things before a tick, for interpolating frames until the next."""
+        self.previous = (list(self.game.snake_body), self.game.mario_pos[1])
+
+    def visible_obstacles(self, first_col, first_row):
+        """Yields the obstacles in the view's columns and rows, which start at (first_col, first_row)."""
+        game = self.game
+        cols = min(self.view_width // GRID_SIZE + 2, game.width)
+        rows = min(self.view_height // GRID_SIZE + 2, game.height)
+        first_col %= game.width
+        # Column spans of the view, split in two where it wraps
+        spans = [(first_col, min(first_col + cols, game.width))]
+        if first_col + cols > game.width:
+            spans.append((0, first_col + cols - game.width))
+        for row in range(first_row, first_row + rows):
+            y = row % game.height
+            columns = self.obstacle_rows.get(y)
+            if columns:
+                for start, end in spans:
+                    for i in range(bisect.bisect_left(columns, start), bisect.bisect_left(columns, end)):
+                        yield columns[i], y
+
+    def draw(self, alpha=1.0):
+        """Draws one frame, `alpha` of the way from the remembered positions to the current ones.
+
+        Returns the rectangles to pass to pygame.display.update.
+        """
+        game = self.game
+        screen = self.surface
+        view_width, view_height = self.view_width, self.view_height
+        snake = game.snake_body
+        mario_y = game.mario_pos[1]
+        if self.previous is not None and alpha < 1.0:
+            snake = lerp_points(self.previous[0], snake, alpha, 1) # Wrapping segments jump
+            mario_y = self.previous[1] + (mario_y - self.previous[1]) * alpha
+        else:
+            snake = list(snake)
+
+        # The camera's top-left corner in board pixels, centring the head
+        head_x, head_y = snake[0]
+        left = head_x * GRID_SIZE + (GRID_SIZE - view_width) // 2
+        top = head_y * GRID_SIZE + (GRID_SIZE - view_height) // 2
+        board_width, board_height = game.width * GRID_SIZE, game.height * GRID_SIZE
+
+        def place(x, y):
+            # Where board pixel (x, y) lands on the surface, wrapped to the copy nearest the view
+            return (x - left + GRID_SIZE) % board_width - GRID_SIZE, (y - top + GRID_SIZE) % board_height - GRID_SIZE
+
+        def draw_cell(color, x, y):
+            sx, sy = place(x * GRID_SIZE, y * GRID_SIZE)
+            if sx < view_width and sy < view_height:
+                pygame.draw.rect(screen, color, (sx, sy, GRID_SIZE, GRID_SIZE))
+
+        screen.blit(self.grid, (-(left % GRID_SIZE), -(top % GRID_SIZE)))
+        for x, y in self.visible_obstacles(int(left // GRID_SIZE), int(top // GRID_SIZE)):
+            draw_cell(BLUE, x, y)
+        for x, y in snake:
+            draw_cell(GREEN, x, y)
+        if game.food_pos:
+            draw_cell(RED, *game.food_pos)
+        if game.powerup_pos:
+            draw_cell(YELLOW, *game.powerup_pos)
+        mario_x, mario_y = place(game.mario_pos[0], mario_y)
+        if mario_x < view_width and mario_y < view_height:
+            draw_mario(screen, mario_x, mario_y)
+
+        display_message(f"Score: {game.score}", WHITE, screen, 100, 20)
+        display_message(f"Level: {game.level}", WHITE, screen, 700, 20)
+        if game.game_over:
+            display_message("Game Over!", RED, screen, view_width // 2, view_height // 2)
+        return [screen.get_rect()]
+
+def make_renderer(game, surface):
+    """A Renderer if the game's board fits on the surface, otherwise a ViewportRenderer."""
+    width, height = surface.get_size()
+    if game.width * GRID_SIZE <= width and game.height * GRID_SIZE <= height:
+        return Renderer(game, surface)
+    return ViewportRenderer(game, surface)
 
-        if game_over:
-            display_message("Game Over!", RED, screen, SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+# --- Main Game Function ---
+def main(recorder=None, profiler=None, screen=None, capture=None, board=None):
+    """Main function to run the game.
+
+    `recorder` (see replay.py) is given each tick's input; `profiler` (see
+    profiler.py) times each phase of the frame, with F3 toggling its overlay;
+    `capture` (see capture.py) is given every frame drawn. `board` is the
+    board's (width, height) in cells, the screen's by default; a bigger board
+    is seen through a camera following the snake. Draws on `screen`, or
+    opens the window. Returns when the game ends, the window is closed or
+    Escape pressed.
+    """
+    # Initialize screen and clock
+    if screen is None:
+        screen = open_window()
+    pygame.display.set_caption(CAPTION)
+    clock = pygame.time.Clock()
 
-        pygame.display.update()
-        clock.tick(FPS)
+    # --- Game Variables ---
+    width, height = board or (GRID_WIDTH, GRID_HEIGHT)
+    game = SnakeGame(verbose=True, width=width, height=height)
+    renderer = make_renderer(game, screen)
+    if recorder:
+        recorder.start(game)
+    if profiler:
+        game.profiler = profiler
+    profiler = game.profiler
+    timestep = FixedTimestep(FPS)
+    pending = [] # Keys read since the last tick
+    
+    # --- Game Loop ---
+    # Input is read and a frame drawn RENDER_FPS times a second; the
+    # simulation advances FPS times a second
+    crashed = False
+    running = True
+    while running and not game.game_over:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False # Not game.game_over, which belongs to the rules (and replays)
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_F3:
+                    profiler.toggle_overlay()
+                    renderer.drawn_rects = [screen.get_rect()]  # Repaint whatever the overlay covered
+                pending.append(event.key)
+        profiler.lap("events")
+
+        for _ in range(timestep.ticks()):
+            if recorder:
+                recorder.tick(pending)
+            renderer.remember()
+            crashed = game.step(pending)
+            pending = []
+            profiler.lap("collision")  # step() laps "physics" itself; the rest of its rules land here
+            if crashed:
+                break
+        if crashed:
+            break
 
-    pygame.quit()
-    sys.exit()
+        # --- Drawing ---
+        rects = renderer.draw(timestep.alpha) + profiler.draw_overlay(screen)
+        profiler.lap("draw")
+        pygame.display.update(rects)
+        profiler.lap("display")
+        if capture:
+            capture.grab(screen)
+            profiler.lap("capture")
+        clock.tick(RENDER_FPS)
+        profiler.lap("wait")
+        profiler.end_frame()
 
 if __name__ == "__main__":
-    main()
+    import sys
+
+    # python gemini.py [WIDTHxHEIGHT]
+    main(board=tuple(map(int, sys.argv[1].lower().split("x"))) if len(sys.argv) > 1 else None)
+    pygame.quit()
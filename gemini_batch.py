@@ -0,0 +1,367 @@
+"""NumPy engine that runs many gemini.py games at once.
+
+BatchSnakeEnv keeps N games as arrays (per-cell snake counts, obstacle masks,
+ring-buffered snake bodies, food/powerup cells, Mario's jump state) and
+advances all of them with one step(actions) call. The rules are those of
+gemini.SnakeGame.step: the wrapping grid, obstacles, food, the 5% powerup
+chance and GROW_AMOUNT. Finished games are reset automatically.
+
+Cells are numbered row-major: cell = y * GRID_WIDTH + x.
+
+verify_against_scalar() plays the same games through gemini.SnakeGame and
+checks that both engines agree on every tick.
+"""
+import numpy as np
+import pygame
+
+import gemini
+
+WIDTH = gemini.GRID_WIDTH
+HEIGHT = gemini.GRID_HEIGHT
+CELLS = WIDTH * HEIGHT
+
+# Actions; ACTION_KEYS maps each to the key press gemini.SnakeGame expects
+NOOP, UP, DOWN, LEFT, RIGHT, JUMP = range(6)
+ACTION_KEYS = (None, pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT, pygame.K_SPACE)
+
+# Direction codes are action - 1: up, down, left, right
+DIRECTIONS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+DX = np.array([d[0] for d in DIRECTIONS])
+DY = np.array([d[1] for d in DIRECTIONS])
+OPPOSITE = np.array([1, 0, 3, 2])
+
+START_CELL = (HEIGHT // 2) * WIDTH + WIDTH // 2
+MARIO_COLUMN = 50 // gemini.GRID_SIZE  # SnakeGame keeps Mario at x = 50
+POWERUP_CHANCE = 1 / 20
+
+# Observation codes returned by observe()
+EMPTY, BODY, HEAD, FOOD, OBSTACLE, POWERUP = range(6)
+
+
+class BatchSnakeEnv:
+    """N independent gemini.py games advanced in lockstep.
+
+    step(actions) takes one action per game and returns (rewards, dones):
+    the score gained this tick and whether the game ended (the snake crashed
+    or the board filled up). Ended games are reset before step returns; their
+    final scores are left in `final_score`.
+    """
+
+    def __init__(self, n_games, seed=None, capacity=2 * CELLS):
+        self.n_games = n_games
+        self.rng = np.random.default_rng(seed)
+        # The body can outgrow the board only by a few stacked growth segments
+        self.capacity = capacity
+        self.games = np.arange(n_games)
+
+        self.counts = np.zeros((n_games, CELLS), np.int16)  # Snake segments per cell
+        self.obstacles = np.zeros((n_games, CELLS), bool)
+        self.obstacle_cells = np.zeros((n_games, gemini.OBSTACLE_COUNT), np.int64)
+        self.body = np.zeros((n_games, capacity), np.int16)  # Ring buffer of cells, head at `head`
+        self.head = np.zeros(n_games, np.int64)
+        self.length = np.zeros(n_games, np.int64)
+        self.direction = np.zeros(n_games, np.int64)
+        self.food = np.zeros(n_games, np.int64)
+        self.powerup = np.zeros(n_games, np.int64)  # -1 when there is none
+        self.powerup_active = np.zeros(n_games, bool)
+        self.powerup_timer = np.zeros(n_games, np.int64)
+        self.score = np.zeros(n_games, np.int64)
+        self.level = np.zeros(n_games, np.int64)
+        self.snake_speed = np.zeros(n_games, np.int64)
+        self.mario_y = np.zeros(n_games)
+        self.mario_velocity_y = np.zeros(n_games)
+        self.is_jumping = np.zeros(n_games, bool)
+        self.final_score = np.zeros(n_games, np.int64)
+
+        # Random outcomes of the last step, before any auto-reset (-1 where nothing was placed)
+        self.spawned_food = np.full(n_games, -1)
+        self.rolled_powerup = np.zeros(n_games, bool)
+        self.spawned_powerup = np.full(n_games, -1)
+
+        self.reset()
+
+    def reset(self, games=None):
+        """Starts new games at the given indices (all games by default)."""
+        g = self.games if games is None else np.asarray(games)
+        if not len(g):
+            return
+        self.counts[g] = 0
+        self.obstacles[g] = False
+        self.body[g, 0] = START_CELL
+        self.head[g] = 0
+        self.length[g] = 1
+        self.counts[g, START_CELL] = 1
+        self.direction[g] = RIGHT - 1
+
+        # Food is placed before the obstacles, avoiding the snake and the cell Mario
+        # is assumed to occupy at startup, (0, 0)
+        free = self.counts[g] == 0
+        free[:, 0] = False
+        self.food[g] = self._sample(free)
+
+        # Obstacles may overlap each other, the snake and the food
+        cells = self.rng.integers(0, CELLS, (len(g), gemini.OBSTACLE_COUNT))
+        self.obstacle_cells[g] = cells
+        self.obstacles[g[:, None], cells] = True
+
+        self.powerup[g] = -1
+        self.powerup_active[g] = False
+        self.powerup_timer[g] = 0
+        self.score[g] = 0
+        self.level[g] = 1
+        self.snake_speed[g] = gemini.SNAKE_SPEED
+        self.mario_y[g] = gemini.FLOOR_LEVEL
+        self.mario_velocity_y[g] = 0
+        self.is_jumping[g] = False
+
+    def _sample(self, free):
+        """Picks a uniformly random True column in each row of `free`; -1 for rows with none."""
+        available = free.sum(axis=1)
+        k = (self.rng.random(len(free)) * available).astype(np.int64)
+        picks = (np.cumsum(free, axis=1) > k[:, None]).argmax(axis=1)
+        return np.where(available > 0, picks, -1)
+
+    def _free_cells(self, g):
+        """Mask of cells in games `g` not covered by the snake, an obstacle or Mario."""
+        free = (self.counts[g] == 0) & ~self.obstacles[g]
+        mario_row = (self.mario_y[g] // gemini.GRID_SIZE).astype(np.int64)
+        free[np.arange(len(g)), mario_row * WIDTH + MARIO_COLUMN] = False
+        return free
+
+    def step(self, actions):
+        """Advances every game by one tick; returns (rewards, dones)."""
+        actions = np.asarray(actions)
+        games = self.games
+        score_before = self.score.copy()
+        self.spawned_food[:] = -1
+        self.rolled_powerup[:] = False
+        self.spawned_powerup[:] = -1
+
+        # --- Input ---
+        turn = (actions >= UP) & (actions <= RIGHT)
+        wanted = np.where(turn, actions - 1, 0)
+        turn &= self.direction != OPPOSITE[wanted]
+        self.direction[turn] = wanted[turn]
+        jump = (actions == JUMP) & ~self.is_jumping
+        self.mario_velocity_y[jump] = gemini.JUMP_SPEED
+        self.is_jumping[jump] = True
+
+        # --- Mario Movement ---
+        self.mario_velocity_y += gemini.GRAVITY
+        self.mario_y += self.mario_velocity_y
+        landed = self.mario_y >= gemini.FLOOR_LEVEL
+        self.mario_y[landed] = gemini.FLOOR_LEVEL
+        self.mario_velocity_y[landed] = 0
+        self.is_jumping[landed] = False
+
+        # --- Snake Movement ---
+        head_cell = self.body[games, self.head].astype(np.int64)
+        new_x = (head_cell % WIDTH + DX[self.direction]) % WIDTH
+        new_y = (head_cell // WIDTH + DY[self.direction]) % HEIGHT
+        new_head = new_y * WIDTH + new_x
+
+        # --- Collision Detection ---
+        hits_body = self.counts[games, new_head] - (new_head == head_cell) > 0
+        crashed = hits_body | self.obstacles[games, new_head]
+        alive = ~crashed
+        ate = alive & (new_head == self.food)
+
+        g = games[alive]
+        self.head[g] = (self.head[g] - 1) % self.capacity
+        self.body[g, self.head[g]] = new_head[g]
+        self.counts[g, new_head[g]] += 1
+        self.length[g] += 1
+
+        g = games[alive & ~ate]
+        tail = self.body[g, (self.head[g] + self.length[g] - 1) % self.capacity]
+        self.counts[g, tail] -= 1
+        self.length[g] -= 1
+
+        # --- Food ---
+        board_full = np.zeros(self.n_games, bool)
+        g = games[ate]
+        if len(g):
+            food = self._sample(self._free_cells(g))
+            self.spawned_food[g] = food
+            self.food[g] = food
+            board_full[g] = food < 0
+            g = g[food >= 0]
+            self.score[g] += 10
+            levelled = g[self.score[g] % 50 == 0]
+            self.snake_speed[levelled] += 1
+            self.level[levelled] += 1
+            rolled = g[self.rng.random(len(g)) < POWERUP_CHANCE]
+            self.rolled_powerup[rolled] = True
+            if len(rolled):
+                free = self._free_cells(rolled)
+                free[np.arange(len(rolled)), self.food[rolled]] = False
+                powerup = self._sample(free)
+                self.spawned_powerup[rolled] = powerup
+                self.powerup[rolled] = powerup
+        ate &= ~board_full
+        live = alive & ~board_full
+
+        # --- Power-up Effects ---
+        active = live & self.powerup_active
+        self.powerup_timer[active] -= 1
+        expired = active & (self.powerup_timer <= 0)
+        self.powerup_active[expired] = False
+        self.snake_speed[expired] = 1
+
+        # --- Power-up Collision ---
+        collected = live & (self.powerup >= 0) & (new_head == self.powerup)
+        self.powerup_active[collected] = True
+        self.powerup_timer[collected] = gemini.POWERUP_DURATION
+        self.powerup[collected] = -1
+        self.snake_speed[collected] = 2
+        self.score[collected] += 30
+        g = games[collected & ate]
+        if len(g):
+            tail_index = self.head[g] + self.length[g] - 1
+            tail = self.body[g, tail_index % self.capacity]
+            extra = (tail_index[:, None] + np.arange(1, gemini.GROW_AMOUNT + 1)) % self.capacity
+            self.body[g[:, None], extra] = tail[:, None]
+            self.counts[g, tail] += gemini.GROW_AMOUNT
+            self.length[g] += gemini.GROW_AMOUNT
+
+        rewards = self.score - score_before
+        dones = crashed | board_full
+        done_games = games[dones]
+        self.final_score[done_games] = self.score[done_games]
+        self.reset(done_games)
+        return rewards, dones
+
+    def segments(self, game):
+        """Snake cells of one game, head first."""
+        index = (self.head[game] + np.arange(self.length[game])) % self.capacity
+        return self.body[game, index]
+
+    def observe(self):
+        """Returns an (N, GRID_HEIGHT, GRID_WIDTH) int8 board using the observation codes."""
+        board = np.where(self.obstacles, OBSTACLE, EMPTY).astype(np.int8)
+        board[self.counts > 0] = BODY
+        board[self.games, self.food] = FOOD
+        has_powerup = self.powerup >= 0
+        board[self.games[has_powerup], self.powerup[has_powerup]] = POWERUP
+        board[self.games, self.body[self.games, self.head]] = HEAD
+        return board.reshape(self.n_games, HEIGHT, WIDTH)
+
+
+def _cell(index):
+    return None if index < 0 else (int(index) % WIDTH, int(index) // WIDTH)
+
+
+class _ScriptedGame(gemini.SnakeGame):
+    """gemini.SnakeGame whose random placements are copied from one game of a batch.
+
+    Every placement is checked against the scalar game's own rules before it
+    is used, so the batch engine cannot pass by choosing illegal cells.
+    """
+
+    def __init__(self, batch, game):
+        self.batch = batch
+        self.game = game
+        self.started = False
+        super().__init__()
+        self.started = True
+
+    def _checked(self, index, exclude):
+        cell = _cell(index)
+        if cell is not None and (cell not in self.free_cells or cell in exclude):
+            raise AssertionError(f"game {self.game}: batch placed an item on occupied cell {cell}")
+        if cell is None and self.free_cells.sample(exclude=exclude) is not None:
+            raise AssertionError(f"game {self.game}: batch found no free cell but the scalar game does")
+        return cell
+
+    def _mario_cell(self, mario_pos):
+        return (mario_pos[0] // gemini.GRID_SIZE, mario_pos[1] // gemini.GRID_SIZE)
+
+    def spawn_food(self, mario_pos):
+        # The initial food is part of the batch's reset state rather than a step's spawns
+        index = self.batch.spawned_food[self.game] if self.started else self.batch.food[self.game]
+        return self._checked(index, [self._mario_cell(mario_pos)])
+
+    def spawn_obstacles(self):
+        return [_cell(index) for index in self.batch.obstacle_cells[self.game]]
+
+    def roll_powerup(self):
+        return bool(self.batch.rolled_powerup[self.game])
+
+    def spawn_powerup(self):
+        exclude = [self.food_pos, self._mario_cell(self.mario_pos)]
+        return self._checked(self.batch.spawned_powerup[self.game], exclude)
+
+
+def _compare(game, batch, i, tick):
+    expected = {
+        "snake": list(game.snake_body),
+        "direction": game.snake_direction,
+        "food": game.food_pos,
+        "powerup": game.powerup_pos,
+        "powerup_active": game.powerup_active,
+        "powerup_timer": game.powerup_timer,
+        "score": game.score,
+        "level": game.level,
+        "snake_speed": game.snake_speed,
+        "mario": (game.mario_pos[1], game.mario_velocity_y, game.is_jumping),
+    }
+    actual = {
+        "snake": [_cell(index) for index in batch.segments(i)],
+        "direction": DIRECTIONS[batch.direction[i]],
+        "food": _cell(batch.food[i]),
+        "powerup": _cell(batch.powerup[i]),
+        "powerup_active": bool(batch.powerup_active[i]),
+        "powerup_timer": int(batch.powerup_timer[i]),
+        "score": int(batch.score[i]),
+        "level": int(batch.level[i]),
+        "snake_speed": int(batch.snake_speed[i]),
+        "mario": (float(batch.mario_y[i]), float(batch.mario_velocity_y[i]), bool(batch.is_jumping[i])),
+    }
+    for field, value in expected.items():
+        if actual[field] != value:
+            raise AssertionError(f"tick {tick}, game {i}: {field} is {actual[field]!r} in the batch, {value!r} in SnakeGame")
+
+
+def _seek_food(batch, rng, noise=0.2):
+    """Actions that steer each snake toward its food, with some random presses mixed in."""
+    head = batch.body[batch.games, batch.head].astype(np.int64)
+    dx = batch.food % WIDTH - head % WIDTH
+    dy = batch.food // WIDTH - head // WIDTH
+    actions = np.where(dx > 0, RIGHT, LEFT)
+    actions = np.where(dx == 0, np.where(dy > 0, DOWN, UP), actions)
+    noisy = rng.random(batch.n_games) < noise
+    actions[noisy] = rng.integers(0, len(ACTION_KEYS), noisy.sum())
+    return actions
+
+
+def verify_against_scalar(n_games=16, ticks=5000, seed=0):
+    """Plays the same games through BatchSnakeEnv and gemini.SnakeGame and checks they agree.
+
+    Random placements are copied from the batch into the scalar games (after a
+    legality check); everything else is simulated independently by both
+    engines and compared field by field after every tick. Raises
+    AssertionError on the first difference; returns the number of games played.
+    """
+    batch = BatchSnakeEnv(n_games, seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    games = [_ScriptedGame(batch, i) for i in range(n_games)]
+    episodes = n_games
+    for i, game in enumerate(games):
+        _compare(game, batch, i, 0)
+    for tick in range(1, ticks + 1):
+        actions = _seek_food(batch, rng)
+        rewards, dones = batch.step(actions)
+        for i, game in enumerate(games):
+            score_before = game.score
+            keys = [ACTION_KEYS[actions[i]]] if actions[i] else []
+            ended = game.step(keys)
+            if ended != dones[i]:
+                raise AssertionError(f"tick {tick}, game {i}: done is {dones[i]} in the batch, {ended} in SnakeGame")
+            if rewards[i] != game.score - score_before:
+                raise AssertionError(f"tick {tick}, game {i}: reward is {rewards[i]} in the batch, "
+                                     f"{game.score - score_before} in SnakeGame")
+            if ended:
+                games[i] = game = _ScriptedGame(batch, i)
+                episodes += 1
+            _compare(game, batch, i, tick)
+    return episodes
@@ -0,0 +1,34 @@
+"""Headless drivers that run the games' simulation without a window or a clock.
+
+Importing this module selects SDL's dummy video/audio drivers (unless a driver
+was already chosen), so the game modules can be imported on machines without a
+display. Input is scripted: a script is an iterable yielding one sequence of
+pygame key codes per tick; once it is exhausted the game receives no input.
+"""
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import itertools
+import random
+
+import pygame
+
+CLAUDE_KEYS = (pygame.K_UP, pygame.K_LEFT, pygame.K_RIGHT)
+
+
+def random_script(keys, seed=0, press_chance=0.2):
+    """Yields an endless stream of per-tick key tuples, pressing one random key with the given chance."""
+    rng = random.Random(seed)
+    while True:
+        if rng.random() < press_chance:
+            yield (rng.choice(keys),)
+        else:
+            yield ()
+
+
+def scripted_ticks(script, ticks):
+    """Materializes the first `ticks` entries of a script, padding with empty input."""
+    return list(itertools.islice(itertools.chain(script, itertools.repeat(())), ticks))
+
@@ -0,0 +1,131 @@
+"""Runs all four games in one process, sharing one pygame and one window.
+
+A menu lists the games; press 1-4 to play one. Escape (or closing the
+window) in a game returns to the menu, and Escape in the menu quits. Game
+modules are imported the first time they are picked, and pygame and the
+window are set up once, so switching games costs an import at most.
+
+The launcher prints its cold start (launcher start to the menu on screen)
+and each switch (menu selection to the game's first frame on screen).
+--measure runs the same measurements headless for every game, and compares
+them with starting each game in a fresh Python process.
+
+Usage:
+    python launcher.py
+    python launcher.py --measure [--games G ...]
+"""
+from time import perf_counter
+
+STARTED = perf_counter()
+
+import argparse
+import importlib
+import subprocess
+import sys
+
+import pygame
+
+from profiler import NullProfiler
+from textcache import get_font
+from window import open_window
+
+GAMES = ("chatgpt", "claude", "deepseek", "gemini")
+CAPTION = "Mario Snake launcher"
+
+
+class FirstFrame(NullProfiler):
+    """Profiler stand-in that notes when a game first updates the display, and can end the game then."""
+
+    def __init__(self, leave=False):
+        self.shown = None
+        self.leave = leave
+
+    def lap(self, phase):
+        if phase == "display" and self.shown is None:
+            self.shown = perf_counter()
+            if self.leave:
+                pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_ESCAPE))
+
+
+def draw_menu(screen):
+    screen.fill((0, 0, 0))
+    font = get_font(None, 40)
+    lines = ["Mario Snake"] + [f"{i}  {name}.py" for i, name in enumerate(GAMES, 1)] + ["Esc  quit"]
+    for i, line in enumerate(lines):
+        screen.blit(font.render(line, True, (255, 255, 255)), (240, 150 + i * 50))
+    pygame.display.flip()
+
+
+def play(name, screen, leave=False):
+    """Imports (once) and runs a game on the shared screen; returns (import_s, first_frame_s) from the call.
+
+    first_frame_s is None if the game returned before showing a frame (Escape
+    or a window close on its first event poll).
+    """
+    start = perf_counter()
+    module = importlib.import_module(name)
+    imported = perf_counter()
+    first_frame = FirstFrame(leave)
+    module.main(profiler=first_frame, screen=screen)
+    pygame.display.set_caption(CAPTION)
+    return imported - start, None if first_frame.shown is None else first_frame.shown - start
+
+
+def format_ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1e3:.1f}"  # "-": the game left before its first frame
+
+
+def main():
+    screen = open_window(CAPTION)
+    draw_menu(screen)
+    print(f"cold start: {(perf_counter() - STARTED) * 1e3:.1f} ms to the menu")
+    while True:
+        event = pygame.event.wait()
+        if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+            break
+        if event.type == pygame.KEYDOWN and pygame.K_1 <= event.key < pygame.K_1 + len(GAMES):
+            name = GAMES[event.key - pygame.K_1]
+            import_s, first_s = play(name, screen)
+            if first_s is None:
+                print(f"{name}: left before its first frame (import {import_s * 1e3:.1f} ms)")
+            else:
+                print(f"{name}: first frame {first_s * 1e3:.1f} ms after selection (import {import_s * 1e3:.1f} ms)")
+            pygame.event.clear()
+            draw_menu(screen)
+    pygame.quit()
+
+
+def measure(games):
+    """Reports cold start, in-process switch times, and fresh-process start times, headless."""
+    import headless  # noqa: F401  (selects the dummy SDL drivers)
+
+    screen = open_window(CAPTION)
+    draw_menu(screen)
+    print(f"cold start: {(perf_counter() - STARTED) * 1e3:.1f} ms to the menu")
+    print(f"{'game':<9} {'first switch ms':>15} {'(import ms)':>11} {'next switch ms':>14} {'new process ms':>14}")
+    for name in games:
+        import_s, first_s = play(name, screen, leave=True)
+        _, again_s = play(name, screen, leave=True)
+        start = perf_counter()
+        subprocess.run([sys.executable, __file__, "--first-frame", name], check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        process_s = perf_counter() - start
+        print(f"{name:<9} {format_ms(first_s):>15} {import_s * 1e3:>11.1f} {format_ms(again_s):>14} "
+              f"{process_s * 1e3:>14.1f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--measure", action="store_true", help="report start and switch times headless")
+    parser.add_argument("--games", nargs="+", choices=GAMES, default=list(GAMES))
+    parser.add_argument("--first-frame", choices=GAMES, help=argparse.SUPPRESS)  # Used by --measure
+    args = parser.parse_args()
+    if args.first_frame:
+        import headless  # noqa: F401
+
+        play(args.first_frame, open_window(), leave=True)
+    elif args.measure:
+        measure(args.games)
+    else:
+        main()
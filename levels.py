@@ -0,0 +1,214 @@
+"""Tile-grid levels in a compact binary file, memory-mapped with NumPy.
+
+A level is a grid of one-byte tile kinds, stored column-major so any span of
+columns (a screen, a streamed chunk) is one contiguous block. Next to the
+tiles the file holds what collision needs, computed when it is written:
+
+    solid   one byte per tile, 1 where the tile blocks movement
+    ground  int16 per column, the topmost solid row (the level height if none)
+
+Layout (little-endian), each section starting on an 8-byte boundary:
+
+    header  "MSLV", version u16, tile size u16, width u32, height u32 (tiles)
+    tiles   u8[width * height]
+    solid   u8[width * height]
+    ground  i16[width]
+
+load() maps the file read-only and wraps the sections as NumPy arrays
+without copying, so a level thousands of screens wide opens in about a
+millisecond and only the pages that are read come into memory. Collision
+queries (`(x, y) in level`, solid_at, ground_below) read the mask directly.
+
+Levels are drawn as text, one character per tile ("#" brick, "." empty):
+
+Usage:
+    python levels.py build level.txt level.lvl [--tile-size N]
+    python levels.py generate level.lvl [--screens N] [--seed S]
+    python levels.py info level.lvl
+"""
+import argparse
+import mmap
+import random
+import struct
+import time
+
+import numpy as np
+
+MAGIC = b"MSLV"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")  # Magic, version, tile size, width, height
+
+# Tile kinds
+EMPTY, BRICK = 0, 1
+SOLID = (BRICK,)  # Kinds that block movement
+TEXT_TILES = {".": EMPTY, "#": BRICK}
+
+
+def _align(offset):
+    return -(-offset // 8) * 8
+
+
+def _layout(width, height):
+    """Returns the byte offsets of the tiles, solid and ground sections and the file size."""
+    tiles = _align(HEADER.size)
+    solid = _align(tiles + width * height)
+    ground = _align(solid + width * height)
+    return tiles, solid, ground, ground + 2 * width
+
+
+def ground_table(solid):
+    """Topmost solid row of each column of a (width, height) mask, or the height where there is none."""
+    return np.where(solid.any(axis=1), solid.argmax(axis=1), solid.shape[1]).astype(np.int16)
+
+
+class Level:
+    """A (width, height) grid of tiles `tile_size` pixels square, with its solid mask and ground table.
+
+    Pixel coordinates are relative to the level's top-left corner.
+    """
+
+    def __init__(self, tiles, tile_size, solid=None, ground=None):
+        self.tiles = tiles
+        self.width, self.height = tiles.shape
+        self.tile_size = tile_size
+        self.solid = np.isin(tiles, SOLID).astype(np.uint8) if solid is None else solid
+        self.ground = ground_table(self.solid) if ground is None else ground
+        self._mask = self.solid.reshape(-1).data  # Flat memoryview; indexing it is cheaper than NumPy's
+
+    @classmethod
+    def from_text(cls, text, tile_size):
+        """Builds a level from rows of TEXT_TILES characters; short rows are padded with empty tiles."""
+        rows = [line.rstrip("\n") for line in text.splitlines() if line.strip()]
+        tiles = np.zeros((max(map(len, rows)), len(rows)), np.uint8)
+        for row, line in enumerate(rows):
+            for col, char in enumerate(line):
+                try:
+                    tiles[col, row] = TEXT_TILES[char]
+                except KeyError:
+                    raise ValueError(f"unknown tile {char!r} at row {row + 1}, column {col + 1}") from None
+        return cls(tiles, tile_size)
+
+    @property
+    def nbytes(self):
+        return self.tiles.nbytes + self.solid.nbytes + self.ground.nbytes
+
+    def solid_at(self, col, row):
+        """Whether the tile at (col, row) is solid; everything outside the level is open."""
+        return 0 <= col < self.width and 0 <= row < self.height and self._mask[col * self.height + row] == 1
+
+    def __contains__(self, point):
+        # `(x, y) in level`: whether a solid tile has its top-left corner exactly at integer pixel (x, y)
+        x, y = point
+        size = self.tile_size
+        if x % size or y % size:
+            return False
+        col, row = x // size, y // size
+        return 0 <= col < self.width and 0 <= row < self.height and self._mask[col * self.height + row] == 1
+
+    def __iter__(self):
+        # Top-left pixel of every solid tile, column by column
+        size = self.tile_size
+        for col, row in zip(*np.nonzero(self.solid)):
+            yield int(col) * size, int(row) * size
+
+    def __len__(self):
+        return int(np.count_nonzero(self.solid))
+
+    def ground_below(self, col, row):
+        """First solid row at or below `row` in column `col`, or the level height if there is none."""
+        if not 0 <= col < self.width:
+            return self.height
+        top = int(self.ground[col])
+        if row <= top:
+            return top
+        column = self.solid[col, row:]
+        below = int(column.argmax()) if len(column) else 0
+        return row + below if len(column) and column[below] else self.height
+
+    def runs(self, first_col, last_col):
+        """Horizontal runs of solid tiles within columns [first_col, last_col); yields (col, row, length)."""
+        first_col, last_col = max(first_col, 0), min(last_col, self.width)
+        if first_col >= last_col:
+            return
+        rows = self.solid[first_col:last_col].T.astype(np.int8)
+        edges = np.diff(rows, axis=1, prepend=0, append=0)
+        for row, col in zip(*np.nonzero(edges == 1)):
+            length = int(np.argmax(edges[row, col + 1:] == -1)) + 1
+            yield first_col + int(col), int(row), length
+
+    def save(self, path):
+        tiles_at, solid_at, ground_at, size = _layout(self.width, self.height)
+        data = bytearray(size)
+        HEADER.pack_into(data, 0, MAGIC, VERSION, self.tile_size, self.width, self.height)
+        data[tiles_at:tiles_at + self.tiles.size] = np.ascontiguousarray(self.tiles, np.uint8).tobytes()
+        data[solid_at:solid_at + self.solid.size] = np.ascontiguousarray(self.solid, np.uint8).tobytes()
+        data[ground_at:size] = self.ground.astype("<i2").tobytes()
+        with open(path, "wb") as f:
+            f.write(data)
+
+
+def load(path):
+    """Maps a level file read-only; the returned Level's arrays are views of the file."""
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(buffer) < HEADER.size:
+        raise ValueError(f"{path} is not a level file")
+    magic, version, tile_size, width, height = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a level file")
+    if version != VERSION:
+        raise ValueError(f"{path} is level format version {version}, expected {VERSION}")
+    tiles_at, solid_at, ground_at, size = _layout(width, height)
+    if len(buffer) < size:
+        raise ValueError(f"{path} is truncated ({len(buffer)} bytes, expected {size})")
+    count = width * height
+    tiles = np.frombuffer(buffer, np.uint8, count, tiles_at).reshape(width, height)
+    solid = np.frombuffer(buffer, np.uint8, count, solid_at).reshape(width, height)
+    ground = np.frombuffer(buffer, "<i2", width, ground_at)
+    return Level(tiles, tile_size, solid, ground)
+
+
+def generate(screens, screen_tiles=(25, 18), tile_size=32, seed=0):
+    """A level `screens` screens wide: a continuous floor and a few random platforms per screen."""
+    columns, height = screen_tiles
+    rng = random.Random(seed)
+    tiles = np.zeros((screens * columns, height), np.uint8)
+    tiles[:, height - 1] = BRICK
+    for screen in range(screens):
+        for _ in range(rng.randint(1, 3)):
+            length = rng.randint(3, 7)
+            col = screen * columns + rng.randrange(0, columns - length + 1)
+            tiles[col:col + length, height - rng.randint(3, 6)] = BRICK
+    return Level(tiles, tile_size)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build", help="convert a text level to the binary format")
+    p.add_argument("text")
+    p.add_argument("level")
+    p.add_argument("--tile-size", type=int, default=32)
+    p = sub.add_parser("generate", help="write a long random level (deepseek.py's proportions)")
+    p.add_argument("level")
+    p.add_argument("--screens", type=int, default=1000)
+    p.add_argument("--seed", type=int, default=0)
+    p = sub.add_parser("info", help="load a level and describe it")
+    p.add_argument("level")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        with open(args.text) as f:
+            Level.from_text(f.read(), args.tile_size).save(args.level)
+    elif args.command == "generate":
+        generate(args.screens, seed=args.seed).save(args.level)
+    else:
+        start = time.perf_counter()
+        level = load(args.level)
+        load_ms = (time.perf_counter() - start) * 1e3
+        print(f"{args.level}: {level.width}x{level.height} tiles of {level.tile_size} px, "
+              f"{len(level):,} solid, {level.nbytes:,} bytes, loaded in {load_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,748 @@
+"""Networked multiplayer on one wrapping gemini.py board: server, headless client and load test.
+
+The server owns the simulation (Arena: gemini.SnakeGame's rules for many
+snakes) and advances it at a fixed tick rate with asyncio. Clients connect
+over TCP, get a snapshot of the board, and from then on send only their
+inputs (a direction or a jump). After every tick the server sends all
+clients the same delta: each snake's move as a direction code rather than
+its body, whether its tail was removed, growth, deaths, spawns, food and
+powerup changes, Mario heights that changed and scores that changed. A
+client's Board mirror applies the deltas to stay in step with the server.
+
+Rules, per tick: inputs are applied in order as SnakeGame.press does, then
+every snake moves at once. A snake dies if its new head is on an obstacle
+or on any snake (tails have not moved yet, as in SnakeGame), or if two heads
+meet; it respawns RESPAWN_TICKS later with a score of 0. Eating food grows
+a snake by one and scores 10, and each eat has SnakeGame's 5% chance of
+placing a powerup if there is none. The powerup scores 30 and grows the
+snake by GROW_AMOUNT.
+
+Wire format (little-endian): every message is a u32 length, then a type
+byte and the payload (see encode_snapshot and encode_delta). A server
+disconnects a client that sends any frame but a two-byte input; a client
+refuses frames longer than MAX_MESSAGE.
+
+    client -> server   I  input: u8 code (UP, DOWN, LEFT, RIGHT or JUMP)
+    server -> client   S  snapshot: on joining, and once more when the server stops
+                       D  delta: one per tick
+
+The load test runs a server in a separate process and hundreds of bot
+clients in this one. Most bots ignore the board and turn at random; the
+--verify bots keep a Board mirror, steer with it, and check it against the
+snapshot the server sends when it stops. Reported: the server's tick
+lateness (jitter) and work per tick, bytes per tick per client, and the
+tick-to-tick arrival jitter seen by the clients.
+
+Usage:
+    python multiplayer.py serve [--host H] [--port P] [--rate HZ] [--size WxH] [--ticks N]
+    python multiplayer.py client [--host H] [--port P] [--ticks N]
+    python multiplayer.py loadtest [--clients N] [--verify N] [--ticks N] [--rate HZ] [--size WxH]
+"""
+import argparse
+import asyncio
+import random
+import struct
+import time
+from collections import Counter, deque
+
+from freecells import FreeCells
+from gemini import (FLOOR_LEVEL, FPS, GRAVITY, GRID_HEIGHT, GRID_WIDTH, GROW_AMOUNT, JUMP_SPEED,
+                    OBSTACLE_COUNT, SnakeBody)
+
+# Input codes; DIRECTIONS[code] is the (dx, dy) of a direction code
+UP, DOWN, LEFT, RIGHT, JUMP = range(5)
+DIRECTIONS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+OPPOSITE = (DOWN, UP, RIGHT, LEFT)
+
+RESPAWN_TICKS = 10
+POWERUP_CHANCE = 20  # One in this many eats places a powerup, as in SnakeGame.roll_powerup
+MAX_PENDING_INPUTS = 8  # Inputs a player can queue for one tick; more are dropped
+MAX_BUFFERED = 1 << 20  # Bytes queued for a client before it counts as too slow and is dropped
+
+# Message types and framing
+INPUT, SNAPSHOT, DELTA = b"I"[0], b"S"[0], b"D"[0]
+FRAME = struct.Struct("<IB")  # Length of what follows, message type
+INPUT_LENGTH = 2  # The only frame length a server accepts: type and input code
+MAX_MESSAGE = 16 << 20  # Longest frame a client accepts; a snapshot of a full 2000x2000 board fits
+
+# Records
+COUNT = struct.Struct("<H")
+ID = struct.Struct("<H")
+CELL = struct.Struct("<HH")
+MOVE = struct.Struct("<HB")  # Player id, direction code | tail removed << 2
+GROW = struct.Struct("<HB")  # Player id, segments added
+SPAWN = struct.Struct("<HHH")  # Player id, cell
+MARIO = struct.Struct("<Hh")  # Player id, Mario's y
+SCORE = struct.Struct("<HI")  # Player id, score
+DELTA_HEADER = struct.Struct("<I")  # Tick
+SNAPSHOT_HEADER = struct.Struct("<IHHH")  # Tick, width, height, your player id (NO_PLAYER if none)
+PLAYER = struct.Struct("<HIhH")  # Player id, score, Mario's y, body length (followed by its cells)
+POWERUP_UNCHANGED, POWERUP_REMOVED, POWERUP_PLACED = range(3)
+NO_PLAYER = 0xFFFF
+
+
+# --- Simulation ---
+
+class Player:
+    """A player's snake (None while waiting to respawn), queued inputs, score and Mario's jump."""
+
+    def __init__(self, player_id):
+        self.id = player_id
+        self.body = None
+        self.direction = RIGHT
+        self.inputs = []
+        self.score = 0
+        self.respawn_at = 0  # Tick at which a dead snake comes back
+        self.mario_y = FLOOR_LEVEL
+        self.mario_velocity_y = 0
+        self.is_jumping = False
+
+    def press(self, code):
+        """Applies one input the way SnakeGame.press does."""
+        if code == JUMP:
+            if not self.is_jumping:
+                self.mario_velocity_y = JUMP_SPEED
+                self.is_jumping = True
+        elif self.direction != OPPOSITE[code]:
+            self.direction = code
+
+
+class Delta:
+    """What one tick changed, in the order a mirror applies it (see Board.apply)."""
+
+    def __init__(self, tick):
+        self.tick = tick
+        self.leaves = []  # Ids of players who left
+        self.deaths = []  # Ids of players whose snake died
+        self.moves = []  # (id, direction code, tail removed)
+        self.grows = []  # (id, segments added)
+        self.food_removed = []
+        self.food_added = []
+        self.powerup = POWERUP_UNCHANGED
+        self.powerup_cell = None
+        self.spawns = []  # (id, x, y): a new one-segment snake
+        self.marios = []  # (id, y) for Marios whose height changed
+        self.scores = []  # (id, score) for scores that changed, and for new players
+
+
+class Arena:
+    """gemini.py's rules for many snakes on one wrapping width x height board.
+
+    join() and leave() add and remove players, press() queues a player's
+    input, and step() advances one tick and returns its Delta.
+    """
+
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT, obstacles=OBSTACLE_COUNT, food=1, seed=None):
+        self.width = width
+        self.height = height
+        self.rng = random.Random(seed)
+        self.free_cells = FreeCells((x, y) for x in range(width) for y in range(height))
+        self.obstacles = {(self.rng.randrange(width), self.rng.randrange(height)) for _ in range(obstacles)}
+        for cell in self.obstacles:
+            self.free_cells.occupy(cell)
+        self.foods = set()
+        self.powerup = None
+        for _ in range(food):
+            self._place_food([])
+        self.players = {}
+        self.tick = 0
+        self._joined = []
+        self._left = []
+
+    def _sample(self):
+        return self.free_cells.sample(exclude=self.foods | {self.powerup}, rng=self.rng)
+
+    def _place_food(self, added):
+        cell = self._sample()
+        if cell is not None:
+            self.foods.add(cell)
+            added.append(cell)
+
+    def join(self):
+        """Adds a player, whose snake spawns on the next tick; returns the Player."""
+        player_id = next(i for i in range(NO_PLAYER) if i not in self.players)
+        player = self.players[player_id] = Player(player_id)
+        self._joined.append(player)
+        return player
+
+    def leave(self, player_id):
+        player = self.players.pop(player_id)
+        if player.body is not None:
+            self._remove_body(player)
+        if player in self._joined:
+            self._joined.remove(player)
+        self._left.append(player_id)  # Clients that joined since may have it in their snapshot
+
+    def press(self, player_id, code):
+        player = self.players.get(player_id)
+        if player is not None and len(player.inputs) < MAX_PENDING_INPUTS:
+            player.inputs.append(code)
+
+    def _remove_body(self, player):
+        body = player.body
+        while len(body):
+            body.pop_tail()
+        player.body = None
+
+    def step(self):
+        """Advances every snake one tick; returns the Delta."""
+        self.tick += 1
+        delta = Delta(self.tick)
+        delta.leaves, self._left = self._left, []
+        width, height = self.width, self.height
+        players = list(self.players.values())
+
+        # Inputs and Mario
+        for player in players:
+            for code in player.inputs:
+                player.press(code)
+            player.inputs.clear()
+            if player.is_jumping or player.mario_y < FLOOR_LEVEL:
+                old_y = int(player.mario_y)
+                player.mario_velocity_y += GRAVITY
+                player.mario_y += player.mario_velocity_y
+                if player.mario_y >= FLOOR_LEVEL:
+                    player.mario_y = FLOOR_LEVEL
+                    player.mario_velocity_y = 0
+                    player.is_jumping = False
+                if int(player.mario_y) != old_y:
+                    delta.marios.append((player.id, int(player.mario_y)))
+
+        # Every snake's new head; a head on anything but a free cell, or on another head, dies
+        moving = []
+        heads = Counter()
+        free_cells = self.free_cells
+        for player in players:
+            if player.body is not None:
+                dx, dy = DIRECTIONS[player.direction]
+                x, y = player.body.head
+                head = ((x + dx) % width, (y + dy) % height)
+                moving.append((player, head))
+                heads[head] += 1
+        survivors = []
+        for player, head in moving:
+            if head not in free_cells or heads[head] > 1:
+                self._remove_body(player)
+                player.respawn_at = self.tick + RESPAWN_TICKS
+                delta.deaths.append(player.id)
+            else:
+                survivors.append((player, head))
+
+        # Moves, food and powerup
+        eaten = 0
+        for player, head in survivors:
+            body = player.body
+            body.push_head(head)
+            if head in self.foods:
+                self.foods.remove(head)
+                delta.food_removed.append(head)
+                player.score += 10
+                delta.scores.append((player.id, player.score))
+                delta.moves.append((player.id, player.direction, False))
+                eaten += 1
+            else:
+                body.pop_tail()
+                delta.moves.append((player.id, player.direction, True))
+            if head == self.powerup:
+                self.powerup = None
+                delta.powerup = POWERUP_REMOVED
+                body.grow(GROW_AMOUNT)
+                delta.grows.append((player.id, GROW_AMOUNT))
+                player.score += 30
+                delta.scores.append((player.id, player.score))
+        for _ in range(eaten):
+            self._place_food(delta.food_added)
+            if self.powerup is None and self.rng.randrange(POWERUP_CHANCE) == 0:
+                self.powerup = self._sample()
+                if self.powerup is not None:
+                    delta.powerup, delta.powerup_cell = POWERUP_PLACED, self.powerup
+
+        # New players and respawns
+        joined, self._joined = self._joined, []
+        for player in joined:
+            delta.scores.append((player.id, 0))
+        for player in players:
+            if player.body is None and (player in joined or player.respawn_at <= self.tick):
+                cell = self._sample()
+                if cell is None:
+                    continue  # The board is full; try again next tick
+                player.body = SnakeBody([cell], free_cells)
+                player.direction = RIGHT
+                if player.score:
+                    player.score = 0
+                    delta.scores.append((player.id, 0))
+                delta.spawns.append((player.id,) + cell)
+        return delta
+
+    def state(self):
+        """The board as plain values, comparable with Board.state()."""
+        return (self.tick, self.width, self.height, sorted(self.obstacles), sorted(self.foods), self.powerup,
+                sorted((p.id, p.score, int(p.mario_y), list(p.body) if p.body is not None else [])
+                       for p in self.players.values()))
+
+
+# --- Encoding ---
+
+def frame(kind, payload=b""):
+    return FRAME.pack(len(payload) + 1, kind) + payload
+
+
+def _pack(record, items):
+    return COUNT.pack(len(items)) + b"".join([record.pack(*item) for item in items])
+
+
+def _unpack(record, data, offset):
+    """Reads a counted section; returns (list of tuples, offset after it)."""
+    (count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    end = offset + count * record.size
+    return list(record.iter_unpack(data[offset:end])), end
+
+
+def encode_delta(delta):
+    """Tick, then counted sections: leaves, deaths, moves, grows, food removed, food added,
+    the powerup (kind byte, plus its cell if placed), spawns, Marios and scores."""
+    powerup = bytes([delta.powerup]) + (CELL.pack(*delta.powerup_cell) if delta.powerup == POWERUP_PLACED else b"")
+    return b"".join([
+        DELTA_HEADER.pack(delta.tick),
+        _pack(ID, [(i,) for i in delta.leaves]),
+        _pack(ID, [(i,) for i in delta.deaths]),
+        _pack(MOVE, [(i, code | removed << 2) for i, code, removed in delta.moves]),
+        _pack(GROW, delta.grows),
+        _pack(CELL, delta.food_removed),
+        _pack(CELL, delta.food_added),
+        powerup,
+        _pack(SPAWN, delta.spawns),
+        _pack(MARIO, delta.marios),
+        _pack(SCORE, delta.scores),
+    ])
+
+
+def encode_snapshot(arena, player_id=NO_PLAYER):
+    """Header, obstacles, foods, the powerup (a flag byte and its cell), then each player with its body."""
+    players = []
+    for player in arena.players.values():
+        body = list(player.body) if player.body is not None else []
+        players.append(PLAYER.pack(player.id, player.score, int(player.mario_y), len(body)))
+        players.append(b"".join([CELL.pack(*cell) for cell in body]))
+    powerup = arena.powerup
+    return b"".join([
+        SNAPSHOT_HEADER.pack(arena.tick, arena.width, arena.height, player_id),
+        _pack(CELL, sorted(arena.obstacles)),
+        _pack(CELL, sorted(arena.foods)),
+        bytes([powerup is not None]) + (CELL.pack(*powerup) if powerup is not None else b""),
+        COUNT.pack(len(arena.players)),
+    ] + players)
+
+
+class Board:
+    """A client's mirror of the server's board, built from a snapshot and kept current with deltas."""
+
+    def __init__(self, payload):
+        tick, self.width, self.height, player_id = SNAPSHOT_HEADER.unpack_from(payload)
+        self.tick = tick
+        self.player_id = None if player_id == NO_PLAYER else player_id
+        offset = SNAPSHOT_HEADER.size
+        obstacles, offset = _unpack(CELL, payload, offset)
+        foods, offset = _unpack(CELL, payload, offset)
+        self.obstacles, self.foods = set(obstacles), set(foods)
+        self.powerup = None
+        if payload[offset]:
+            self.powerup = CELL.unpack_from(payload, offset + 1)
+            offset += CELL.size
+        offset += 1
+        (count,) = COUNT.unpack_from(payload, offset)
+        offset += COUNT.size
+        self.snakes = {}  # Player id -> deque of cells, head first (empty while dead)
+        self.scores = {}
+        self.marios = {}
+        self.occupied = Counter()  # Snake segments per cell
+        for _ in range(count):
+            player_id, score, mario_y, length = PLAYER.unpack_from(payload, offset)
+            offset += PLAYER.size
+            body = deque(CELL.iter_unpack(payload[offset:offset + length * CELL.size]))
+            offset += length * CELL.size
+            self.snakes[player_id] = body
+            self.scores[player_id] = score
+            self.marios[player_id] = mario_y
+            self.occupied.update(body)
+
+    def _clear(self, player_id):
+        body = self.snakes.get(player_id)
+        if body:
+            self.occupied.subtract(body)
+            body.clear()
+
+    def apply(self, payload):
+        """Applies one delta; returns whether it spawned this client's own snake."""
+        (self.tick,) = DELTA_HEADER.unpack_from(payload)
+        offset = DELTA_HEADER.size
+        leaves, offset = _unpack(ID, payload, offset)
+        for (player_id,) in leaves:
+            self._clear(player_id)
+            self.snakes.pop(player_id, None)
+            self.scores.pop(player_id, None)
+            self.marios.pop(player_id, None)
+        deaths, offset = _unpack(ID, payload, offset)
+        for (player_id,) in deaths:
+            self._clear(player_id)
+        moves, offset = _unpack(MOVE, payload, offset)
+        width, height, occupied = self.width, self.height, self.occupied
+        for player_id, flags in moves:
+            body = self.snakes[player_id]
+            dx, dy = DIRECTIONS[flags & 3]
+            x, y = body[0]
+            head = ((x + dx) % width, (y + dy) % height)
+            body.appendleft(head)
+            occupied[head] += 1
+            if flags & 4:
+                occupied[body.pop()] -= 1
+        grows, offset = _unpack(GROW, payload, offset)
+        for player_id, amount in grows:
+            body = self.snakes[player_id]
+            body.extend([body[-1]] * amount)
+            occupied[body[-1]] += amount
+        removed, offset = _unpack(CELL, payload, offset)
+        self.foods.difference_update(removed)
+        added, offset = _unpack(CELL, payload, offset)
+        self.foods.update(added)
+        kind = payload[offset]
+        offset += 1
+        if kind == POWERUP_REMOVED:
+            self.powerup = None
+        elif kind == POWERUP_PLACED:
+            self.powerup = CELL.unpack_from(payload, offset)
+            offset += CELL.size
+        spawns, offset = _unpack(SPAWN, payload, offset)
+        spawned = False
+        for player_id, x, y in spawns:
+            spawned = spawned or player_id == self.player_id
+            self.snakes.setdefault(player_id, deque()).append((x, y))
+            self.marios.setdefault(player_id, FLOOR_LEVEL)
+            occupied[(x, y)] += 1
+        marios, offset = _unpack(MARIO, payload, offset)
+        self.marios.update(marios)
+        scores, offset = _unpack(SCORE, payload, offset)
+        for player_id, score in scores:
+            self.scores[player_id] = score
+            self.snakes.setdefault(player_id, deque())
+            self.marios.setdefault(player_id, FLOOR_LEVEL)
+        return spawned
+
+    def state(self):
+        """The board as plain values, comparable with Arena.state()."""
+        return (self.tick, self.width, self.height, sorted(self.obstacles), sorted(self.foods), self.powerup,
+                sorted((i, self.scores[i], self.marios[i], list(body)) for i, body in self.snakes.items()))
+
+    def steer(self, direction):
+        """A bot's input for its snake heading `direction`: toward the nearest food, avoiding blocked cells.
+
+        Returns a direction code, or None to keep going.
+        """
+        body = self.snakes.get(self.player_id)
+        if not body:
+            return None
+        x, y = body[0]
+        width, height = self.width, self.height
+        best = None
+        for code in (direction, UP, DOWN, LEFT, RIGHT):
+            if code == OPPOSITE[direction]:
+                continue
+            dx, dy = DIRECTIONS[code]
+            cell = ((x + dx) % width, (y + dy) % height)
+            if self.occupied[cell] > 0 or cell in self.obstacles:
+                continue
+            distance = min((min(abs(fx - cell[0]), width - abs(fx - cell[0]))
+                            + min(abs(fy - cell[1]), height - abs(fy - cell[1])) for fx, fy in self.foods),
+                           default=0)
+            if best is None or distance < best[0]:
+                best = (distance, code)
+        if best is None or best[1] == direction:
+            return None
+        return best[1]
+
+
+# --- Networking ---
+
+async def read_message(reader, max_length=MAX_MESSAGE):
+    """Returns (type, payload) of the next message; raises asyncio.IncompleteReadError at the end.
+
+    Raises ValueError, before reading the payload, for a frame longer than
+    `max_length` or too short to hold its type.
+    """
+    length, kind = FRAME.unpack(await reader.readexactly(FRAME.size))
+    if not 1 <= length <= max_length:
+        raise ValueError(f"frame length {length} outside 1..{max_length}")
+    return kind, await reader.readexactly(length - 1)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list (0 if empty)."""
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class Server:
+    """Runs an Arena at `rate` ticks per second and serves it to TCP clients."""
+
+    def __init__(self, arena, rate=FPS):
+        self.arena = arena
+        self.rate = rate
+        self.clients = {}  # Player id -> StreamWriter
+        self.lateness = []  # Seconds each tick started after its scheduled time
+        self.work = []  # Seconds spent stepping, encoding and sending each tick
+        self.delta_bytes = 0
+        self.sent_bytes = 0
+        self.client_ticks = 0  # Sum over ticks of the clients sent to
+        self.peak_clients = 0
+        self.dropped = 0
+        self.handlers = {}  # Task reading a client's inputs -> the client's StreamWriter
+
+    async def handle(self, reader, writer):
+        self.handlers[asyncio.current_task()] = writer
+        player = self.arena.join()
+        writer.write(frame(SNAPSHOT, encode_snapshot(self.arena, player.id)))
+        self.clients[player.id] = writer
+        self.peak_clients = max(self.peak_clients, len(self.clients))
+        try:
+            while True:
+                kind, payload = await read_message(reader, INPUT_LENGTH)
+                if kind != INPUT or len(payload) != 1 or payload[0] > JUMP:
+                    break  # Clients only send inputs; anything else is a broken or hostile client
+                self.arena.press(player.id, payload[0])
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            if self.clients.pop(player.id, None) is not None:
+                self.arena.leave(player.id)
+            writer.close()
+            self.handlers.pop(asyncio.current_task(), None)
+
+    async def run(self, ticks=0, wait_for=0):
+        """Ticks until `ticks` have run (forever if 0), starting once `wait_for` clients have joined."""
+        while len(self.clients) < wait_for:
+            await asyncio.sleep(0.01)
+        loop = asyncio.get_running_loop()
+        period = 1 / self.rate
+        start = loop.time()
+        tick = 0
+        while not ticks or tick < ticks:
+            tick += 1
+            deadline = start + tick * period
+            await asyncio.sleep(deadline - loop.time())
+            began = loop.time()
+            self.lateness.append(began - deadline)
+            data = frame(DELTA, encode_delta(self.arena.step()))
+            for player_id, writer in list(self.clients.items()):
+                if writer.transport.get_write_buffer_size() > MAX_BUFFERED:
+                    # Too slow to keep up; it can reconnect for a new snapshot
+                    del self.clients[player_id]
+                    self.arena.leave(player_id)
+                    writer.close()
+                    self.dropped += 1
+                else:
+                    writer.write(data)
+            self.delta_bytes += len(data)
+            self.sent_bytes += len(data) * len(self.clients)
+            self.client_ticks += len(self.clients)
+            self.work.append(loop.time() - began)
+
+    async def finish(self, timeout=5):
+        """Sends every client a final snapshot, disconnects it, and waits for its handler to end."""
+        for player_id, writer in list(self.clients.items()):
+            writer.write(frame(SNAPSHOT, encode_snapshot(self.arena, player_id)))
+            writer.close()
+        self.clients.clear()
+        if self.handlers:
+            _, pending = await asyncio.wait(list(self.handlers), timeout=timeout)
+            # Clients too slow to take their last snapshot are cut off, which ends their handlers
+            for task in pending:
+                self.handlers[task].transport.abort()
+            if pending:
+                await asyncio.wait(pending)
+
+    def report(self):
+        ticks = len(self.lateness)
+        lateness, work = sorted(self.lateness), sorted(self.work)
+        return {
+            "ticks": ticks,
+            "rate": self.rate,
+            "peak_clients": self.peak_clients,
+            "dropped_clients": self.dropped,
+            "lateness_p50_ms": percentile(lateness, 0.5) * 1e3,
+            "lateness_p99_ms": percentile(lateness, 0.99) * 1e3,
+            "lateness_max_ms": (lateness[-1] if lateness else 0) * 1e3,
+            "work_mean_ms": sum(work) / max(ticks, 1) * 1e3,
+            "work_p99_ms": percentile(work, 0.99) * 1e3,
+            "delta_bytes_per_tick": self.delta_bytes / max(ticks, 1),
+            "bytes_per_tick_per_client": self.sent_bytes / max(self.client_ticks, 1),
+        }
+
+
+async def serve(host, port, arena, rate=FPS, ticks=0, wait_for=0, ready=None):
+    """Runs a server; `ready` is called with the bound port. Returns the server's report()."""
+    server = Server(arena, rate)
+    listener = await asyncio.start_server(server.handle, host, port, backlog=1024)
+    if ready is not None:
+        ready(listener.sockets[0].getsockname()[1])
+    try:
+        await server.run(ticks, wait_for)
+    finally:
+        listener.close()
+        await server.finish()
+        await listener.wait_closed()
+    return server.report()
+
+
+async def play(host, port, mirror=True, ticks=0, seed=None):
+    """Connects a headless bot client and plays until the server stops (or `ticks` deltas).
+
+    With `mirror`, the bot keeps a Board, steers toward food with it, and
+    checks it against the server's final snapshot; without, it turns at
+    random. Returns a dict of what it saw.
+    """
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    board = final = None
+    direction = RIGHT
+    received = deltas = 0
+    arrivals = []
+    try:
+        while not ticks or deltas < ticks:
+            kind, payload = await read_message(reader)
+            received += FRAME.size + len(payload)
+            if kind == SNAPSHOT:
+                if board is None:
+                    board = Board(payload)
+                else:
+                    final = Board(payload)
+            elif kind == DELTA:
+                deltas += 1
+                arrivals.append(time.perf_counter())
+                code = None
+                if mirror:
+                    if board.apply(payload):
+                        direction = RIGHT  # The server starts every new snake heading right
+                    code = board.steer(direction)
+                elif rng.randrange(8) == 0:
+                    code = rng.randrange(JUMP + 1)
+                if code is not None:
+                    writer.write(frame(INPUT, bytes([code])))
+                    if code != JUMP and code != OPPOSITE[direction]:
+                        direction = code
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+    return {
+        "deltas": deltas,
+        "bytes": received,
+        "intervals": [b - a for a, b in zip(arrivals, arrivals[1:])],
+        "matches": None if final is None or not mirror else board.state() == final.state(),
+        "board": board,
+    }
+
+
+# --- Load test ---
+
+def _serve_process(conn, width, height, food, rate, ticks, wait_for, seed):
+    arena = Arena(width, height, obstacles=width * height // 120, food=food, seed=seed)
+    report = asyncio.run(serve("127.0.0.1", 0, arena, rate, ticks, wait_for, ready=conn.send))
+    conn.send(report)
+    conn.close()
+
+
+async def _bots(port, clients, verify, seed):
+    return await asyncio.gather(*[play("127.0.0.1", port, mirror=i < verify, seed=seed + i) for i in range(clients)])
+
+
+def loadtest(clients, verify, ticks, rate, width, height, seed=0):
+    """Runs a server process and `clients` bots; returns (server report, client results)."""
+    import multiprocessing
+
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    food = max(1, clients // 4)
+    process = context.Process(target=_serve_process,
+                              args=(sender, width, height, food, rate, ticks, clients, seed))
+    process.start()
+    sender.close()
+    try:
+        port = receiver.recv()
+        results = asyncio.run(_bots(port, clients, verify, seed))
+        report = receiver.recv()
+    except EOFError:
+        raise RuntimeError("the server process failed") from None
+    finally:
+        process.join()
+    return report, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def size(text):
+        width, height = text.lower().split("x")
+        return int(width), int(height)
+
+    p = sub.add_parser("serve", help="run a server")
+    p.add_argument("--host", default="0.0.0.0")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--rate", type=float, default=FPS, help="ticks per second")
+    p.add_argument("--size", type=size, default=(GRID_WIDTH, GRID_HEIGHT), help="board size in cells, WxH")
+    p.add_argument("--food", type=int, default=1)
+    p.add_argument("--ticks", type=int, default=0, help="stop after this many ticks (0: run until interrupted)")
+    p.add_argument("--seed", type=int)
+    p = sub.add_parser("client", help="connect a headless bot client")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--ticks", type=int, default=0, help="leave after this many ticks (0: until the server stops)")
+    p = sub.add_parser("loadtest", help="a server process and many bot clients on this machine")
+    p.add_argument("--clients", type=int, default=200)
+    p.add_argument("--verify", type=int, default=5, help="how many of the bots mirror the board and check it")
+    p.add_argument("--ticks", type=int, default=200)
+    p.add_argument("--rate", type=float, default=20, help="ticks per second")
+    p.add_argument("--size", type=size, default=(160, 120), help="board size in cells, WxH")
+    p.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        width, height = args.size
+        arena = Arena(width, height, food=args.food, seed=args.seed)
+        ready = lambda port: print(f"serving a {width}x{height} board on {args.host}:{port} at {args.rate:g} ticks/s")
+        try:
+            report = asyncio.run(serve(args.host, args.port, arena, args.rate, args.ticks, ready=ready))
+        except KeyboardInterrupt:
+            return
+        print(report)
+    elif args.command == "client":
+        result = asyncio.run(play(args.host, args.port, ticks=args.ticks))
+        board = result["board"]
+        print(f"{result['deltas']} ticks, {result['bytes'] / max(result['deltas'], 1):,.0f} bytes/tick, "
+              f"score {board.scores.get(board.player_id, 0) if board else 0}, mirror matches: {result['matches']}")
+    else:
+        width, height = args.size
+        start = time.perf_counter()
+        report, results = loadtest(args.clients, args.verify, args.ticks, args.rate, width, height, args.seed)
+        elapsed = time.perf_counter() - start
+        intervals = sorted(abs(i - 1 / args.rate) for r in results for i in r["intervals"])
+        checked = [r["matches"] for r in results if r["matches"] is not None]
+        print(f"{args.clients} clients on a {width}x{height} board, {report['ticks']} ticks at {args.rate:g}/s "
+              f"in {elapsed:.1f}s")
+        print(f"server tick lateness: p50 {report['lateness_p50_ms']:.2f} ms, p99 {report['lateness_p99_ms']:.2f} ms, "
+              f"max {report['lateness_max_ms']:.2f} ms; work per tick: mean {report['work_mean_ms']:.2f} ms, "
+              f"p99 {report['work_p99_ms']:.2f} ms")
+        print(f"bytes per tick per client: {report['bytes_per_tick_per_client']:,.0f} sent "
+              f"(received incl. snapshots: {sum(r['bytes'] for r in results) / max(sum(r['deltas'] for r in results), 1):,.0f}); "
+              f"dropped clients: {report['dropped_clients']}")
+        print(f"client arrival jitter: p50 {percentile(intervals, 0.5) * 1e3:.2f} ms, "
+              f"p99 {percentile(intervals, 0.99) * 1e3:.2f} ms")
+        print(f"mirrors matching the server's final board: {sum(checked)}/{len(checked)}")
+        if not all(checked):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Per-phase frame profiler for the game loops.
+
+A loop calls `lap(phase)` at the end of each phase (events, physics,
+collision, enemies, draw, display, ...) and `end_frame()` once per frame;
+each lap charges the time since the previous lap to that phase. Per-frame
+phase times go into fixed-size ring buffers, one per phase, so memory stays
+constant however long the game runs. Games use NULL_PROFILER, whose methods
+do nothing, unless a profiler is passed to their main().
+
+F3 toggles an overlay with each phase's mean and p99 time. dump() writes the
+buffered frames as CSV or JSONL, chosen by the file extension.
+
+Usage:
+    python profiler.py GAME [--dump trace.csv|trace.jsonl] [--frames N] [--overlay]
+"""
+import argparse
+import importlib
+import json
+from array import array
+from time import perf_counter
+
+import pygame
+
+from textcache import get_font
+
+# Upper bucket edges in milliseconds for histogram()
+HISTOGRAM_EDGES_MS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 33, float("inf"))
+OVERLAY_REFRESH = 30  # Frames between overlay redraws
+
+
+class NullProfiler:
+    """Stands in for a FrameProfiler when profiling is off; every method is a no-op."""
+
+    def lap(self, phase):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def toggle_overlay(self):
+        pass
+
+    def draw_overlay(self, surface):
+        return []
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class FrameProfiler:
+    """Records per-phase frame times into ring buffers of the last `capacity` frames."""
+
+    def __init__(self, capacity=600):
+        self.capacity = capacity
+        self.rings = {}  # Phase -> array('d') of seconds, indexed by frame % capacity
+        self.frame = 0
+        self.last = perf_counter()
+        self.show_overlay = False
+        self._overlay = None
+        self._overlay_frame = -OVERLAY_REFRESH
+
+    def lap(self, phase):
+        """Charges the time since the previous lap to `phase` in the current frame."""
+        now = perf_counter()
+        ring = self.rings.get(phase)
+        if ring is None:
+            ring = self.rings[phase] = array("d", bytes(8 * self.capacity))
+        ring[self.frame % self.capacity] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        self.frame += 1
+        slot = self.frame % self.capacity
+        for ring in self.rings.values():
+            ring[slot] = 0.0
+
+    def frames(self):
+        """Returns the buffered frame numbers, oldest first (the current frame excluded)."""
+        return range(max(0, self.frame - self.capacity + 1), self.frame)
+
+    def samples(self, phase):
+        ring = self.rings[phase]
+        return [ring[frame % self.capacity] for frame in self.frames()]
+
+    def summary(self):
+        """Returns {phase: {"mean_ms", "p50_ms", "p99_ms", "max_ms"}} over the buffered frames."""
+        stats = {}
+        for phase in self.rings:
+            values = sorted(self.samples(phase))
+            if not values:
+                continue
+            stats[phase] = {
+                "mean_ms": sum(values) / len(values) * 1e3,
+                "p50_ms": values[len(values) // 2] * 1e3,
+                "p99_ms": values[min(len(values) - 1, int(len(values) * 0.99))] * 1e3,
+                "max_ms": values[-1] * 1e3,
+            }
+        return stats
+
+    def histogram(self, phase):
+        """Counts the buffered frame times of `phase` per HISTOGRAM_EDGES_MS bucket."""
+        counts = [0] * len(HISTOGRAM_EDGES_MS)
+        for seconds in self.samples(phase):
+            ms = seconds * 1e3
+            for i, edge in enumerate(HISTOGRAM_EDGES_MS):
+                if ms <= edge:
+                    counts[i] += 1
+                    break
+        return counts
+
+    def dump(self, path):
+        """Writes the buffered frames to `path` as JSONL, or as CSV unless it ends in .jsonl."""
+        phases = list(self.rings)
+        with open(path, "w") as f:
+            if path.endswith(".jsonl"):
+                for frame in self.frames():
+                    slot = frame % self.capacity
+                    row = {phase: self.rings[phase][slot] * 1e3 for phase in phases}
+                    f.write(json.dumps({"frame": frame, "ms": row}) + "\n")
+            else:
+                f.write(",".join(["frame"] + [f"{phase}_ms" for phase in phases]) + "\n")
+                for frame in self.frames():
+                    slot = frame % self.capacity
+                    f.write(",".join([str(frame)] + [f"{self.rings[phase][slot] * 1e3:.4f}" for phase in phases]) + "\n")
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+        self._overlay_frame = -OVERLAY_REFRESH
+
+    def draw_overlay(self, surface):
+        """Draws the overlay in the top-left corner if it is shown; returns the rects drawn."""
+        if not self.show_overlay:
+            return []
+        if self.frame - self._overlay_frame >= OVERLAY_REFRESH:
+            self._overlay = self._render_overlay()
+            self._overlay_frame = self.frame
+        return [surface.blit(self._overlay, (4, 4))]
+
+    def _render_overlay(self):
+        font = get_font(None, 18)
+        stats = self.summary()
+        rows = [("phase", "mean ms", "p99 ms")]
+        rows += [(phase, f"{s['mean_ms']:.2f}", f"{s['p99_ms']:.2f}") for phase, s in stats.items()]
+        rows.append(("frame", f"{sum(s['mean_ms'] for s in stats.values()):.2f}", ""))
+        line_height = font.get_linesize()
+        overlay = pygame.Surface((220, line_height * len(rows) + 8))
+        overlay.fill((0, 0, 0))
+        for i, row in enumerate(rows):
+            for text, x in zip(row, (6, 96, 160)):
+                overlay.blit(font.render(text, True, (255, 255, 255)), (x, 4 + i * line_height))
+        return overlay
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("game", choices=["chatgpt", "claude", "deepseek", "gemini"])
+    parser.add_argument("--dump", help="write the buffered frames here on exit (.csv or .jsonl)")
+    parser.add_argument("--frames", type=int, default=600, help="frames kept in the ring buffers")
+    parser.add_argument("--overlay", action="store_true", help="start with the overlay shown")
+    args = parser.parse_args(argv)
+
+    profiler = FrameProfiler(args.frames)
+    if args.overlay:
+        profiler.toggle_overlay()
+    module = importlib.import_module(args.game)
+    try:
+        module.main(profiler=profiler)
+    finally:
+        if args.dump:
+            profiler.dump(args.dump)
+        for phase, s in profiler.summary().items():
+            print(f"{phase:<10} mean {s['mean_ms']:7.3f} ms  p50 {s['p50_ms']:7.3f} ms  "
+                  f"p99 {s['p99_ms']:7.3f} ms  max {s['max_ms']:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""Deterministic input recording and max-speed replay for the four games.
+
+A recording is the seed the global `random` module was seeded with plus the
+keys given to the game's `step()` on every tick (pressed keys, or for
+chatgpt.py the keys held down). Replaying seeds `random` the same way and
+feeds the input back through the same `step()` calls with no drawing and no
+clock, so it reproduces the run exactly and gives a fixed workload for
+profiling. The log stores a digest of the final game state, which replay
+checks; `play` exits with status 1 if the state differs.
+
+Log format (little-endian):
+    magic b"MSRP", version (B), game name (B length + ASCII), seed (Q),
+    key table (B count + count * I key codes), tick count (I),
+    final state digest (20-byte SHA-1, zeros if unknown),
+    then runs of identical ticks: run length (varint), key count (B),
+    key indices into the table (count * B).
+
+Usage:
+    python replay.py record GAME LOG [--seed S]
+    python replay.py generate GAME LOG [--ticks N] [--seed S]
+    python replay.py play LOG [--repeat N]
+"""
+import argparse
+import hashlib
+import importlib
+import random
+import struct
+import time
+
+MAGIC = b"MSRP"
+VERSION = 1
+NO_DIGEST = bytes(20)
+
+# Game name -> (class in the module, keys the game responds to,
+# whether main() stops once step() returns True)
+GAMES = {
+    "chatgpt": ("Game", ("K_LEFT", "K_RIGHT", "K_SPACE"), False),
+    "claude": ("MarioSnake", ("K_UP", "K_LEFT", "K_RIGHT"), False),
+    "deepseek": ("Game", ("K_UP", "K_LEFT", "K_RIGHT"), True),
+    "gemini": ("SnakeGame", ("K_UP", "K_DOWN", "K_LEFT", "K_RIGHT", "K_SPACE"), True),
+}
+
+
+def game_keys(name):
+    """Returns the pygame key codes game `name` responds to."""
+    import pygame
+
+    return tuple(getattr(pygame, key) for key in GAMES[name][1])
+
+
+def new_game(name):
+    """Imports the game module and creates a fresh game; seed `random` first."""
+    module = importlib.import_module(name)
+    return getattr(module, GAMES[name][0])()
+
+
+def game_state(name, game):
+    """Returns the game's simulation state as plain values (no caches or surfaces)."""
+    if name == "claude":
+        return (game.positions, game.length, game.direction, game.score, game.jumping, game.jump_count,
+                game.on_ground, sorted(game.level), sorted(game.coins), sorted(game.mushrooms), game.enemies.tolist())
+    if name == "gemini":
+        return (list(game.snake_body), game.snake_direction, game.food_pos, game.powerup_pos, game.obstacles,
+                game.score, game.level, game.snake_speed, game.powerup_active, game.powerup_timer,
+                game.mario_pos, game.mario_velocity_y, game.is_jumping, game.game_over)
+    if name == "deepseek":
+        player = game.player
+        return (player.x, player.y, player.velocity_y, player.on_ground, player.direction, player.tail_length,
+                list(player.tail_positions), game.camera_offset, game.world_seed, sorted(game.chunks),
+                [(enemy.rect.x, enemy.rect.y, enemy.direction) for enemy in game.enemies],
+                [(item.rect.x, item.rect.y, item.active) for item in game.collectibles])
+    if name == "chatgpt":
+        player = game.player
+        return (tuple(player.rect), player.vel_y, player.on_ground, game.snake.body, game.snake.direction,
+                [tuple(item.rect) for item in game.items])
+    raise KeyError(name)
+
+
+def state_digest(name, game):
+    """Returns a SHA-1 digest of game_state()."""
+    return hashlib.sha1(repr(game_state(name, game)).encode()).digest()
+
+
+class Recording:
+    """A seed and per-tick input for one game, stored as runs of identical ticks."""
+
+    def __init__(self, game, seed, keys, runs=None, digest=NO_DIGEST):
+        self.game = game
+        self.seed = seed
+        self.keys = tuple(keys)  # Key table; ticks refer to keys by index
+        self.runs = runs if runs is not None else []  # [count, key tuple] pairs
+        self.digest = digest
+
+    @property
+    def ticks(self):
+        return sum(count for count, _ in self.runs)
+
+    def append(self, keys):
+        keys = tuple(keys)
+        if self.runs and self.runs[-1][1] == keys:
+            self.runs[-1][0] += 1
+        else:
+            self.runs.append([1, keys])
+
+    def save(self, path):
+        index = {key: i for i, key in enumerate(self.keys)}
+        name = self.game.encode("ascii")
+        out = bytearray(MAGIC)
+        out += struct.pack("<BB", VERSION, len(name)) + name
+        out += struct.pack("<QB", self.seed, len(self.keys))
+        out += struct.pack(f"<{len(self.keys)}I", *self.keys)
+        out += struct.pack("<I", self.ticks) + self.digest
+        for count, keys in self.runs:
+            _write_varint(out, count)
+            out.append(len(keys))
+            out += bytes(index[key] for key in keys)
+        with open(path, "wb") as f:
+            f.write(out)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:4] != MAGIC:
+            raise ValueError(f"{path} is not a replay log")
+        version, length = struct.unpack_from("<BB", data, 4)
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported log version {version}")
+        pos = 6
+        game = data[pos:pos + length].decode("ascii")
+        pos += length
+        seed, count = struct.unpack_from("<QB", data, pos)
+        pos += 9
+        keys = struct.unpack_from(f"<{count}I", data, pos)
+        pos += 4 * count
+        (ticks,) = struct.unpack_from("<I", data, pos)
+        pos += 4
+        digest = data[pos:pos + 20]
+        pos += 20
+        runs = []
+        while pos < len(data):
+            run, pos = _read_varint(data, pos)
+            n = data[pos]
+            runs.append([run, tuple(keys[i] for i in data[pos + 1:pos + 1 + n])])
+            pos += 1 + n
+        recording = cls(game, seed, keys, runs, digest)
+        if recording.ticks != ticks:
+            raise ValueError(f"{path} is truncated: {recording.ticks} of {ticks} ticks")
+        return recording
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Recorder:
+    """Passed to a game's main(): records the input of every tick and the final state."""
+
+    def __init__(self, name, seed):
+        self.name = name
+        self.recording = Recording(name, seed, game_keys(name))
+        self.keys = set(self.recording.keys)
+        self.game = None
+
+    def start(self, game):
+        self.game = game
+
+    def tick(self, keys):
+        # Other keys are ignored by the game and have no index in the key table
+        self.recording.append([key for key in keys if key in self.keys])
+
+    def save(self, path):
+        if self.game is not None:
+            self.recording.digest = state_digest(self.name, self.game)
+        self.recording.save(path)
+
+
+def record(name, path, seed=None):
+    """Plays game `name` interactively, seeded with `seed`, and saves the log to `path` on exit."""
+    if seed is None:
+        seed = random.getrandbits(64)
+    module = importlib.import_module(name)
+    recorder = Recorder(name, seed)
+    random.seed(seed)
+    try:
+        module.main(recorder)
+    finally:
+        recorder.save(path)
+    return recorder.recording
+
+
+def generate(name, path, ticks, seed=0):
+    """Records `ticks` ticks of scripted random input without a window (a fixed profiling workload).
+
+    Like main(), recording stops early if the game ends.
+    """
+    import headless
+
+    recording = Recording(name, seed, game_keys(name))
+    random.seed(seed)
+    game = new_game(name)
+    for keys in headless.scripted_ticks(headless.random_script(recording.keys, seed), ticks):
+        recording.append(keys)
+        if game.step(keys) and GAMES[name][2]:
+            break
+    recording.digest = state_digest(name, game)
+    recording.save(path)
+    return recording
+
+
+def replay(recording):
+    """Runs a recording at full speed without drawing; returns the game in its final state."""
+    random.seed(recording.seed)
+    game = new_game(recording.game)
+    step = game.step
+    for count, keys in recording.runs:
+        for _ in range(count):
+            step(keys)
+    return game
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("record", help="play a game and record its input")
+    p.add_argument("game", choices=sorted(GAMES))
+    p.add_argument("log")
+    p.add_argument("--seed", type=int, default=None)
+
+    p = sub.add_parser("generate", help="record scripted random input headlessly")
+    p.add_argument("game", choices=sorted(GAMES))
+    p.add_argument("log")
+    p.add_argument("--ticks", type=int, default=10000)
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("play", help="replay a log at full speed and check the final state")
+    p.add_argument("log")
+    p.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        recording = record(args.game, args.log, args.seed)
+        print(f"recorded {recording.ticks} ticks of {args.game} (seed {recording.seed}) to {args.log}")
+    elif args.command == "generate":
+        recording = generate(args.game, args.log, args.ticks, args.seed)
+        print(f"generated {recording.ticks} ticks of {args.game} (seed {recording.seed}) to {args.log}")
+    else:
+        import headless  # noqa: F401  (selects the dummy SDL drivers before the game is imported)
+
+        recording = Recording.load(args.log)
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            game = replay(recording)
+            elapsed = time.perf_counter() - start
+            digest = state_digest(recording.game, game)
+            if recording.digest == NO_DIGEST:
+                check = "no digest recorded"
+            else:
+                check = "final state matches" if digest == recording.digest else "FINAL STATE DIFFERS"
+            print(f"{recording.game}: {recording.ticks} ticks in {elapsed:.3f}s "
+                  f"({recording.ticks / elapsed:,.0f} ticks/sec), {check}")
+            if recording.digest != NO_DIGEST and digest != recording.digest:
+                raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Parallel evaluation rollouts over a multiprocessing pool.
+
+Each worker process runs its own headless pygame (SDL dummy drivers) and
+keeps one environment per game, so episodes are spread across cores with no
+shared state. Episode i of a sweep is seeded with `seed + i`, which makes
+results independent of how episodes land on workers.
+
+Usage:
+    python rollouts.py GAME [--episodes N] [--max-steps N] [--processes N] [--seed S]
+"""
+import argparse
+import multiprocessing
+import random
+import time
+
+_envs = {}
+
+
+def random_policy(observation, env, rng):
+    """Picks a uniformly random action."""
+    return rng.randrange(len(env.ACTIONS))
+
+
+def _init_worker():
+    import headless  # noqa: F401  (selects the dummy SDL drivers before any game is imported)
+
+
+def run_episode(task):
+    """Plays one episode; `task` is (game, seed, max_steps, policy). Returns a result dict."""
+    import envs
+
+    name, seed, max_steps, policy = task
+    env = _envs.get(name)
+    if env is None:
+        env = _envs[name] = envs.make(name)
+    env.max_steps = max_steps
+    rng = random.Random(seed)
+    observation = env.reset(seed)
+    total_reward = 0
+    done = False
+    while not done:
+        observation, reward, done = env.step(policy(observation, env, rng))
+        total_reward += reward
+    return {"game": name, "seed": seed, "return": total_reward, "steps": env.steps}
+
+
+def run_rollouts(name, episodes, max_steps=1000, processes=None, policy=random_policy, seed=0):
+    """Runs `episodes` episodes of a game across a process pool; returns results in seed order.
+
+    `policy(observation, env, rng)` must be picklable (a module-level function).
+    With processes=1 the episodes run in this process.
+    """
+    tasks = [(name, seed + i, max_steps, policy) for i in range(episodes)]
+    if processes == 1:
+        _init_worker()
+        return [run_episode(task) for task in tasks]
+    processes = processes or multiprocessing.cpu_count()
+    pool = multiprocessing.Pool(processes, initializer=_init_worker)
+    try:
+        return pool.map(run_episode, tasks, chunksize=max(1, episodes // (4 * processes)))
+    finally:
+        # close/join rather than the context manager's terminate(): workers that
+        # have initialized pygame don't exit on the SIGTERM it sends
+        pool.close()
+        pool.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("game", choices=["chatgpt", "claude", "deepseek", "gemini"])
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--max-steps", type=int, default=1000)
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = run_rollouts(args.game, args.episodes, args.max_steps, args.processes, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    steps = sum(result["steps"] for result in results)
+    mean_return = sum(result["return"] for result in results) / len(results)
+    print(f"{args.game}: {len(results)} episodes, {steps} steps in {elapsed:.2f}s "
+          f"({len(results) / elapsed:,.1f} episodes/sec, {steps / elapsed:,.0f} steps/sec), mean return {mean_return:.2f}")
+
+
+if __name__ == "__main__":
+    main()
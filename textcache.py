@@ -0,0 +1,51 @@
+"""Shared font and rendered-text cache for score and HUD drawing.
+
+Fonts are loaded once per (name, size). Rendered text surfaces are memoized
+on (text, font, color) with least-recently-used eviction, so redrawing an
+unchanged HUD costs a dictionary lookup and a blit.
+"""
+from collections import OrderedDict
+
+import pygame
+
+_fonts = {}
+
+
+def get_font(name, size, system=False):
+    """Returns a font loaded from a file (or a system font if `system`), loading it only once."""
+    key = (name, size, system)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.SysFont(name, size) if system else pygame.font.Font(name, size)
+        _fonts[key] = font
+    return font
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed on (text, font, color, antialias)."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+
+    def render(self, text, font, color, antialias=True):
+        key = (text, font, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+
+text_cache = TextCache()
+
+
+def render_text(text, font, color, antialias=True):
+    """Renders text through the shared cache."""
+    return text_cache.render(text, font, color, antialias)
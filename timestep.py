@@ -0,0 +1,59 @@
+"""Fixed-timestep scheduling for the game loops.
+
+The simulation advances in ticks of a fixed length while frames are drawn
+as fast as the display rate allows. Each frame, FixedTimestep adds the real
+time that has passed to an accumulator and hands it out as whole ticks; the
+leftover fraction of a tick (`alpha`) lets the frame interpolate moving
+things between the state before and after the last tick. When frames are too
+slow to keep up, at most `max_ticks` run per frame and the rest of the
+backlog is dropped, so the game slows down instead of stalling.
+"""
+from time import perf_counter
+
+
+class FixedTimestep:
+    """Turns elapsed real time into a number of fixed-length simulation ticks."""
+
+    def __init__(self, tick_rate, max_ticks=5, timer=perf_counter):
+        self.tick_time = 1.0 / tick_rate
+        self.max_ticks = max_ticks
+        self.timer = timer
+        self.accumulator = 0.0
+        self.last = None
+
+    def ticks(self):
+        """Returns how many ticks to run before drawing this frame; call once per frame."""
+        now = self.timer()
+        if self.last is None:
+            self.last = now
+            return 0
+        self.accumulator += now - self.last
+        self.last = now
+        ticks = int(self.accumulator / self.tick_time)
+        if ticks > self.max_ticks:
+            ticks = self.max_ticks
+            self.accumulator = ticks * self.tick_time  # Drop the backlog we can't catch up on
+        self.accumulator -= ticks * self.tick_time
+        return ticks
+
+    @property
+    def alpha(self):
+        """How far the current frame is between the last tick and the next one, in [0, 1)."""
+        return self.accumulator / self.tick_time
+
+
+def lerp_points(previous, current, alpha, max_step):
+    """Interpolates each point of `current` from the same index in `previous`.
+
+    Points without a predecessor, or that moved more than `max_step` along
+    an axis (a wrap-around or a respawn), are drawn where they are now.
+    """
+    points = []
+    for i, (x, y) in enumerate(current):
+        if i < len(previous):
+            px, py = previous[i]
+            if abs(x - px) <= max_step and abs(y - py) <= max_step:
+                x = px + (x - px) * alpha
+                y = py + (y - py) * alpha
+        points.append((x, y))
+    return points
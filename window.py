@@ -0,0 +1,21 @@
+"""The one display window, shared by whichever game is running.
+
+Game modules have no import-time side effects; their main() calls
+open_window() (or is handed the surface by launcher.py), which initializes
+pygame and creates the window the first time and reuses it afterwards.
+"""
+import pygame
+
+SIZE = (800, 600)  # All four games use the same window size
+
+
+def open_window(caption=None, size=SIZE):
+    """Initializes pygame if needed and returns the display surface, creating or resizing the window."""
+    if not pygame.get_init():
+        pygame.init()
+    surface = pygame.display.get_surface()
+    if surface is None or surface.get_size() != size:
+        surface = pygame.display.set_mode(size)
+    if caption is not None:
+        pygame.display.set_caption(caption)
+    return surface